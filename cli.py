@@ -2,16 +2,15 @@ import argparse
 import sys
 from pathlib import Path
 
-# --- Path setup so we can import from src/ ---
+# --- Path setup so the src.* packages import from the project root ---
 PROJECT_ROOT = Path(__file__).resolve().parent
-SRC_DIR = PROJECT_ROOT / "src"
-if str(SRC_DIR) not in sys.path:
-    sys.path.insert(0, str(SRC_DIR))
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
 
 def get_recommendations(args):
     """Fetch and display sentiment-based recommendations."""
     print("Fetching recommendations...")
-    from sentiment.main import CryptoBot
+    from src.sentiment.main import CryptoBot
 
     bot = CryptoBot()
     results = bot.run_pipeline()
@@ -41,18 +40,25 @@ def get_recommendations(args):
 def detect_iceberg_orders(args):
     """Run the iceberg order detector."""
     print(f"Detecting iceberg orders for {args.symbol}...")
-    from iceberg import iceberg_detector
+    from src.iceberg import iceberg_detector
+    iceberg_detector.setup_logging()
     iceberg_detector.predict_iceberg(args.symbol)
 
 def check_arbitrage(args):
     """Check for arbitrage opportunities."""
     print(f"Checking for arbitrage opportunities on {', '.join(args.exchanges)}...")
-    # TODO: Integrate with arbitrage module
-    from arbitrage import arbitrage_checker
-    arbitrage_checker.main()
+    from dataclasses import replace
+    from src.arbitrage import arbitrage_checker
+    from src.arbitrage.config import RISK_LIMITS
+    limits = replace(RISK_LIMITS, max_notional=args.max_notional, max_open_exposure=args.max_exposure,
+                     min_net_edge=args.min_edge)
+    arbitrage_checker.main(min_interval=args.min_interval, record_path=args.record, auto=args.auto,
+                           risk_limits=limits)
     
 def main():
     """Main function to run the CLI."""
+    from src.arbitrage.config import MIN_EVAL_INTERVAL, RISK_LIMITS
+
     parser = argparse.ArgumentParser(description="Crypto Bot CLI")
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
 
@@ -71,6 +77,16 @@ def main():
     # Arbitrage command
     parser_arbitrage = subparsers.add_parser("arbitrage", help="Check for arbitrage opportunities.")
     parser_arbitrage.add_argument("--exchanges", nargs='+', default=["binance", "kraken"], help="List of exchanges to check.")
+    parser_arbitrage.add_argument("--min_interval", type=float, default=MIN_EVAL_INTERVAL,
+                                  help="Minimum seconds between arbitrage evaluations.")
+    parser_arbitrage.add_argument("--record", type=str, default=None, help="Append raw feed messages to this tick log for replay.")
+    parser_arbitrage.add_argument("--auto", action="store_true", help="Execute approved opportunities without confirmation.")
+    parser_arbitrage.add_argument("--max_notional", type=float, default=RISK_LIMITS.max_notional,
+                                  help="Maximum quote notional per trade in --auto mode.")
+    parser_arbitrage.add_argument("--max_exposure", type=float, default=RISK_LIMITS.max_open_exposure,
+                                  help="Maximum quote notional in flight in --auto mode.")
+    parser_arbitrage.add_argument("--min_edge", type=float, default=RISK_LIMITS.min_net_edge,
+                                  help="Minimum net profit / cost in --auto mode.")
     parser_arbitrage.set_defaults(func=check_arbitrage)
 
     args = parser.parse_args()
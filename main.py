@@ -1,22 +1,42 @@
 import sys
+import json
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 from fastapi import FastAPI
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from pydantic import BaseModel
 
-# --- Path setup so we can import from src/ ---
+# --- Path setup so the src.* packages import from the project root ---
 PROJECT_ROOT = Path(__file__).resolve().parent
-SRC_DIR = PROJECT_ROOT / "src"
-if str(SRC_DIR) not in sys.path:
-    sys.path.insert(0, str(SRC_DIR))
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
 
 # Lazy imports inside route handlers so that missing credentials
 # (AWS, CMC, Binance, etc.) don\'t break app startup.
 
-app = FastAPI(title="Crypto Bot Demo", version="1.0.0")
+
+def _warm_iceberg_model() -> None:
+    try:
+        from src.iceberg.model_registry import get_model_registry  # type: ignore[import]
+
+        get_model_registry().start()
+    except Exception as exc:  # noqa: BLE001
+        logging.info("Iceberg model not preloaded: %s", exc)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load and warm the iceberg model in the background so requests only pay the forward pass."""
+    asyncio.get_running_loop().run_in_executor(None, _warm_iceberg_model)
+    yield
+
+
+app = FastAPI(title="Crypto Bot Demo", version="1.0.0", lifespan=lifespan)
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -99,8 +119,10 @@ async def index() -> str:
         <div class=\"badge\">Module · Arbitrage Logic</div>
         <h3>How the Arbitrage Scanner Works</h3>
         <p>Streams live order books from Binance &amp; Kraken, surfaces cross-exchange spreads, and lets a human confirm execution.</p>
+        <button class=\"btn btn-primary\" onclick=\"toggleArbStream()\" id=\"arb-stream-btn\">▶ Watch Live Spreads</button>
         <button class=\"btn btn-secondary\" onclick=\"showArbInfo()\">ℹ View Architecture Notes</button>
         <div id=\"arb-info\" class=\"status\"></div>
+        <div id=\"arb-live\"></div>
       </section>
     </div>
 
@@ -211,13 +233,65 @@ async def index() -> str:
       }
     }
 
+    let arbSource = null;
+
+    function renderArbSnapshot(data) {
+      const live = document.getElementById('arb-live');
+      const rows = Object.entries(data.quotes || {}).flatMap(([symbol, venues]) =>
+        Object.entries(venues).map(([venue, q]) => `
+          <tr><td>${symbol}</td><td>${venue}</td><td>${q.bid.toFixed(2)}</td><td>${q.ask.toFixed(2)}</td></tr>`)).join('');
+      const spreads = Object.entries(data.spreads || {}).map(([symbol, s]) =>
+        `${symbol}: buy ${s.buy_venue} / sell ${s.sell_venue} at ${s.spread_bps.toFixed(2)} bps`).join('<br>');
+      const opp = data.last_opportunity;
+      const oppText = opp
+        ? `Last opportunity: buy ${opp.size} ${opp.symbol} on ${opp.buy_venue}, sell on ${opp.sell_venue}, net ${opp.net_profit.toFixed(2)} after fees`
+        : 'No fee-positive opportunity yet.';
+      live.innerHTML = `
+        <table>
+          <thead><tr><th>Symbol</th><th>Venue</th><th>Bid</th><th>Ask</th></tr></thead>
+          <tbody>${rows}</tbody>
+        </table>
+        <div class=\"status\">${spreads || 'Waiting for both books…'}</div>
+        <div class=\"status ok\">${oppText}</div>`;
+    }
+
+    function toggleArbStream() {
+      const btn = document.getElementById('arb-stream-btn');
+      const status = document.getElementById('arb-info');
+      if (arbSource) {
+        arbSource.close();
+        arbSource = null;
+        btn.textContent = '▶ Watch Live Spreads';
+        status.textContent = 'Live stream stopped.';
+        return;
+      }
+      arbSource = new EventSource('/api/arbitrage/stream');
+      btn.textContent = '■ Stop Live Spreads';
+      status.className = 'status';
+      status.textContent = 'Connecting to the shared arbitrage stream…';
+      arbSource.addEventListener('spreads', (e) => {
+        status.textContent = 'Live: one engine feeds every connected dashboard.';
+        renderArbSnapshot(JSON.parse(e.data));
+      });
+      arbSource.addEventListener('opportunity', (e) => {
+        const opp = JSON.parse(e.data);
+        status.className = 'status ok';
+        status.textContent = `💰 Buy on ${opp.buy_venue}, sell on ${opp.sell_venue}: net ${opp.net_profit.toFixed(2)} (${opp.spread_bps.toFixed(2)} bps)`;
+      });
+      arbSource.onerror = () => {
+        status.className = 'status error';
+        status.textContent = 'Stream interrupted; the browser will retry automatically.';
+      };
+    }
+
     function showArbInfo() {
       const el = document.getElementById('arb-info');
       el.className = 'status';
       el.innerHTML = `
         <strong>Design:</strong> <code>src/arbitrage/arbitrage_checker.py</code> maintains WebSocket connections to
-        Binance and Kraken, continuously watches the spread on BTC/USDT, then asks the human whether to execute the
-        paired limit orders when a profitable opportunity appears. Credentials are pulled securely from AWS Secrets Manager.
+        Binance and Kraken, keeps full-depth books in sync, and sizes every fee-positive cross by walking both books.
+        Plans are confirmed by a human or, with <code>--auto</code>, sent immediately once they pass the pre-trade
+        risk gates. This page subscribes to the same engine running inside the web server via Server-Sent Events.
       `;
     }
   </script>
@@ -285,7 +359,7 @@ async def api_recommendations(payload: RecommendationRequest) -> JSONResponse:
 
     # Attempt live pipeline first
     try:
-        from sentiment.main import CryptoBot  # type: ignore[import]
+        from src.sentiment.main import CryptoBot  # type: ignore[import]
 
         bot = CryptoBot()
         results: Dict[str, Any] = bot.run_pipeline()
@@ -363,15 +437,20 @@ async def api_iceberg_demo() -> JSONResponse:
     """
 
     try:
-        from iceberg import iceberg_detector  # type: ignore[import]
+        from src.iceberg import iceberg_detector  # type: ignore[import]
         import io
         import contextlib
 
-        buf = io.StringIO()
-        # Capture stdout so we can surface the pretty CLI output in the UI
-        with contextlib.redirect_stdout(buf):
-            iceberg_detector.predict_iceberg("BTCUSDT")
-        output = buf.getvalue().strip() or "Iceberg detector ran, but produced no output."
+        def run_detector() -> str:
+            buf = io.StringIO()
+            # Capture stdout so we can surface the pretty CLI output in the UI
+            with contextlib.redirect_stdout(buf):
+                iceberg_detector.predict_iceberg("BTCUSDT")
+            return buf.getvalue().strip()
+
+        # The detector makes blocking HTTP calls (and may collect training data); keep them
+        # off the event loop that serves the arbitrage stream
+        output = await run_in_threadpool(run_detector) or "Iceberg detector ran, but produced no output."
 
         return JSONResponse({"status": "ok", "output": output})
     except Exception as exc:  # noqa: BLE001
@@ -387,3 +466,70 @@ async def api_iceberg_demo() -> JSONResponse:
             },
             status_code=500,
         )
+
+
+ARBITRAGE_KEEPALIVE_SECONDS = 15.0
+
+
+@app.get("/api/arbitrage/stream")
+async def api_arbitrage_stream(symbol: str = "BTC/USDT"):
+    """Server-Sent Events with live spreads and opportunities.
+
+    Every client shares one background engine (started by the first
+    subscriber), so adding dashboards or symbols never adds exchange
+    connections. Each client has a bounded queue; a slow reader drops its
+    oldest events. Only symbols in the configured list are accepted.
+    """
+    from src.arbitrage.live_stream import get_stream  # type: ignore[import]
+
+    try:
+        stream = get_stream(symbol)
+    except ValueError as exc:
+        return JSONResponse({"status": "error", "message": str(exc)}, status_code=400)
+    queue = stream.subscribe()
+
+    async def events():
+        try:
+            yield f"event: spreads\ndata: {json.dumps(stream.snapshot())}\n\n"
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), ARBITRAGE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+        finally:
+            stream.unsubscribe(queue)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.get("/api/arbitrage/feed-stats")
+async def api_arbitrage_feed_stats(symbol: str = "BTC/USDT") -> JSONResponse:
+    """Per-venue exchange-to-receive latency percentiles, quote age and staleness for monitoring.
+
+    Read-only: it reports on ``symbol`` but never subscribes the engine to it.
+    """
+    from src.arbitrage.config import validate_symbol  # type: ignore[import]
+    from src.arbitrage.live_stream import get_stream  # type: ignore[import]
+
+    try:
+        symbol = validate_symbol(symbol)
+    except ValueError as exc:
+        return JSONResponse({"status": "error", "message": str(exc)}, status_code=400)
+    stream = get_stream()
+    summary = stream.feed_stats.summary()
+    summary["feeds"] = {key: feed for key, feed in summary["feeds"].items() if key.endswith(f":{symbol}")}
+    return JSONResponse(dict(summary, running=stream.running))
+
+
+@app.get("/api/arbitrage/snapshot")
+async def api_arbitrage_snapshot(symbol: str = "BTC/USDT") -> JSONResponse:
+    """Latest spreads and opportunity from the shared engine, without subscribing to it."""
+    from src.arbitrage.config import validate_symbol  # type: ignore[import]
+    from src.arbitrage.live_stream import get_stream  # type: ignore[import]
+
+    try:
+        symbol = validate_symbol(symbol)
+    except ValueError as exc:
+        return JSONResponse({"status": "error", "message": str(exc)}, status_code=400)
+    return JSONResponse(get_stream().snapshot(symbol))
@@ -1,118 +1,112 @@
-import ccxt
-import os
-import websocket
-import json
+import asyncio
+import queue
 import threading
-import boto3
-from botocore.exceptions import ClientError
-
-# Function to fetch secrets from AWS Secrets Manager
-def get_secret():
-    secret_name = "arn:aws:secretsmanager:us-east-1:799854597846:secret:prod/cryptopilot-MA71Q3"
-    region_name = "us-east-1"
-
-    # Create a Secrets Manager client
-    session = boto3.session.Session()
-    client = session.client(
-        service_name='secretsmanager',
-        region_name=region_name
-    )
 
+from .config import (DEPTH_LEVELS, MAX_QUOTE_AGE, MAX_TRADE_SIZE, MIN_EVAL_INTERVAL, MIN_SPREAD, RISK_LIMITS,
+                     SYMBOL, TAKER_FEES, make_feeds)
+from .credentials import default_provider
+from .evaluator import ArbitrageEvaluator
+from .exchange_registry import get_registry
+from .execution import PairedExecutor
+from .feed_engine import BinanceTradeFeed, FeedEngine, KrakenTradeFeed
+from .feed_stats import FeedStats
+from .profit import find_best_plan
+from .risk import RiskGate
+from .spread_scanner import SpreadScanner
+from .tick_recorder import TickRecorder
+
+# Secrets are resolved on first use (env, then config/.env.arbitrage, then
+# AWS Secrets Manager) and cached, so importing this module never blocks.
+credentials = default_provider()
+
+CREDENTIAL_KEYS = ('BINANCE_API_KEY', 'BINANCE_SECRET_KEY', 'KRAKEN_API_KEY', 'KRAKEN_API_SECRET')
+
+_exchanges = None
+_executor = None
+
+def get_exchanges():
+    """Trading clients for each venue, built on first use."""
+    global _exchanges
+    if _exchanges is None:
+        secrets = credentials.require(*CREDENTIAL_KEYS)
+        registry = get_registry()
+        _exchanges = {
+            # Binance and Kraken clients for placing trades, shared process-wide
+            # and paced against each venue's request-weight budget
+            'binance': registry.client('binance', secrets['BINANCE_API_KEY'], secrets['BINANCE_SECRET_KEY'],
+                                       async_=True),
+            'kraken': registry.client('kraken', secrets['KRAKEN_API_KEY'], secrets['KRAKEN_API_SECRET'],
+                                      async_=True),
+        }
+    return _exchanges
+
+def get_executor():
+    """Submits both legs at once on the async clients."""
+    global _executor
+    if _executor is None:
+        _executor = PairedExecutor(get_exchanges())
+    return _executor
+
+# Full-depth books per venue, seeded once and kept current from diff streams
+FEEDS = make_feeds([SYMBOL])
+
+# One event loop owns every venue connection; quotes are published as immutable
+# Quote objects so a bid/ask pair is always read together.
+engine = FeedEngine(FEEDS.values())
+
+# Exchange-to-receive latency and quote age per venue and symbol
+feed_stats = FeedStats(max_age=MAX_QUOTE_AGE)
+engine.add_listener(feed_stats)
+
+# Best bid/ask for every venue and symbol, refreshed on each quote; stale quotes are masked
+scanner = SpreadScanner(FEEDS.keys(), [SYMBOL], max_age=MAX_QUOTE_AGE)
+engine.add_listener(scanner.update_quote)
+
+def get_book(venue, symbol=SYMBOL):
+    return FEEDS[venue].books[symbol]
+
+def report_result(result):
+    for leg in (result.buy, result.sell, *result.recovery):
+        if leg.ok:
+            print(f"✅ {leg.side.upper()} order placed on {leg.venue} at {leg.price}, filled {leg.filled} "
+                  f"(ack in {leg.latency * 1000:.1f} ms): {leg.order}")
+        else:
+            print(f"❌ Error placing {leg.side} order on {leg.venue}: {leg.error}")
+    for leg in result.unresolved:
+        print(f"⚠️ {leg.side.upper()} order {leg.client_order_id} on {leg.venue} timed out and could not be "
+              f"checked; verify it on the venue")
+    print(f"⏱ Legs sent {result.send_skew * 1000:.2f} ms apart")
+
+# Place both legs concurrently and report per-leg timing
+def execute_plan(plan):
+    result = engine.run_coroutine_threadsafe(get_executor().submit_plan(plan)).result()
+    report_result(result)
+    return result
+
+# Check for arbitrage opportunity, sized by walking both books after fees
+def check_arbitrage(symbol=SYMBOL):
+    best = find_best_plan(scanner, get_book, symbol, threshold=MIN_SPREAD, fees=TAKER_FEES,
+                          max_size=MAX_TRADE_SIZE, depth=DEPTH_LEVELS)
+    if best is None:
+        return None
+    opportunity = best.opportunity
+    print(f"💰 Arbitrage Opportunity: Buy {best.size} on {opportunity.buy_venue.title()} at {best.buy_vwap:.2f} and sell on "
+          f"{opportunity.sell_venue.title()} at {best.sell_vwap:.2f} (Net profit after fees: {best.net_profit:.2f} USDT)")
+    return best
+
+# Latest opportunity found by the evaluator, waiting for the user
+opportunities = queue.Queue(maxsize=1)
+
+def _offer_opportunity(opportunity):
     try:
-        get_secret_value_response = client.get_secret_value(
-            SecretId=secret_name
-        )
-    except ClientError as e:
-        raise e
-
-    # Parse and return the secret as a dictionary
-    return json.loads(get_secret_value_response['SecretString'])
-
-# Load secrets
-secrets = get_secret()
-
-# Initialize Binance (for placing trades)
-binance = ccxt.binance({
-    'apiKey': secrets['BINANCE_API_KEY'],  # Replace with the key from your secret
-    'secret': secrets['BINANCE_SECRET_KEY'],  # Replace with the key from your secret
-})
-
-# Initialize Kraken (for placing trades)
-kraken = ccxt.kraken({
-    'apiKey': secrets['KRAKEN_API_KEY'],  # Replace with the key from your secret
-    'apiSecret': secrets['KRAKEN_API_SECRET'],  # Replace with the key from your secret
-})
-
-# Global variables to store latest prices
-binance_bid, binance_ask = None, None
-kraken_bid, kraken_ask = None, None
-
-# Binance WebSocket URL
-BINANCE_WS_URL = "wss://stream.binance.com:9443/ws/btcusdt@depth5"
-KRAKEN_WS_URL = "wss://ws.kraken.com/v2"
-
-# WebSocket Handlers
-def binance_ws_message(ws, message):
-    global binance_bid, binance_ask
-    data = json.loads(message)
-    binance_bid = float(data['bids'][0][0])
-    binance_ask = float(data['asks'][0][0])
-
-def kraken_ws_message(ws, message):
-    global kraken_bid, kraken_ask
-    data = json.loads(message)
-    if isinstance(data, list) and len(data) > 1 and isinstance(data[1], dict):
-        order_book = data[1]
-        if 'b' in order_book and 'a' in order_book:
-            kraken_bid = float(order_book['b'][0][0])
-            kraken_ask = float(order_book['a'][0][0])
-
-# Start WebSockets
-def start_binance_ws():
-    ws = websocket.WebSocketApp(BINANCE_WS_URL, on_message=binance_ws_message)
-    ws.run_forever()
-
-def start_kraken_ws():
-    def on_open(ws):
-        ws.send(json.dumps({"event": "subscribe", "pair": ["BTC/USDT"], "subscription": {"name": "book"}}))
-    
-    ws = websocket.WebSocketApp(KRAKEN_WS_URL, on_message=kraken_ws_message, on_open=on_open)
-    ws.run_forever()
-
-# Fetch latest prices before arbitrage check
-def update_prices():
-    global binance_bid, binance_ask, kraken_bid, kraken_ask
-    try:
-        binance_order_book = binance.fetch_order_book('BTC/USDT')
-        binance_bid = binance_order_book['bids'][0][0] if binance_order_book['bids'] else None
-        binance_ask = binance_order_book['asks'][0][0] if binance_order_book['asks'] else None
-
-        kraken_order_book = kraken.fetch_order_book('BTC/USDT')
-        kraken_bid = kraken_order_book['bids'][0][0] if kraken_order_book['bids'] else None
-        kraken_ask = kraken_order_book['asks'][0][0] if kraken_order_book['asks'] else None
-    except Exception as e:
-        print(f"❌ Error fetching prices: {e}")
-
-# Place limit orders
-def place_limit_order(exchange, symbol, side, amount, price):
-    try:
-        order = exchange.create_limit_order(symbol, side, amount, price)
-        print(f"✅ {side.upper()} limit order placed on {exchange.name} at {price}: {order}")
-    except Exception as e:
-        print(f"❌ Error placing {side} limit order on {exchange.name}: {e}")
-
-# Check for arbitrage opportunity
-def check_arbitrage():
-    if binance_bid and binance_ask and kraken_bid and kraken_ask:
-        if binance_ask < kraken_bid:
-            profit = kraken_bid - binance_ask
-            print(f"💰 Arbitrage Opportunity: Buy on Binance at {binance_ask} and sell on Kraken at {kraken_bid} (Profit: {profit:.2f} USDT)")
-            return ('binance', 'buy', binance_ask, 'kraken', 'sell', kraken_bid)
-        elif kraken_ask < binance_bid:
-            profit = binance_bid - kraken_ask
-            print(f"💰 Arbitrage Opportunity: Buy on Kraken at {kraken_ask} and sell on Binance at {binance_bid} (Profit: {profit:.2f} USDT)")
-            return ('kraken', 'buy', kraken_ask, 'binance', 'sell', binance_bid)
-    return None
+        opportunities.put_nowait(opportunity)
+    except queue.Full:
+        # Replace the stale opportunity with the fresh one
+        try:
+            opportunities.get_nowait()
+        except queue.Empty:
+            pass
+        opportunities.put_nowait(opportunity)
 
 # Main user-interaction loop
 def main_loop():
@@ -123,24 +117,96 @@ def main_loop():
     
     print("🔄 Arbitrage Scanner Started!")
 
+    # Discard anything found before the user started
+    while not opportunities.empty():
+        opportunities.get_nowait()
+
     while True:
-        update_prices()  # Fetch latest prices
-        opportunity = check_arbitrage()
-        
-        if opportunity:
-            ex_buy, side_buy, price_buy, ex_sell, side_sell, price_sell = opportunity
-            key = input("Execute trade? (y/n): ").strip().lower()  # Get user input for execution
-            
-            if key == 'y':
-                print("⚡ Executing trades...")
-                place_limit_order(globals()[ex_buy], 'BTC/USDT', side_buy, 0.0001, price_buy)
-                place_limit_order(globals()[ex_sell], 'BTC/USDT', side_sell, 0.0001, price_sell)
-
-# Run WebSocket Threads and Main Loop
+        plan = opportunities.get()  # Wait for the next book-driven opportunity
+        key = input("Execute trade? (y/n): ").strip().lower()  # Get user input for execution
+
+        if key == 'y':
+            print("⚡ Executing trades...")
+            execute_plan(plan)
+
+# Unattended mode: plans that pass the risk gate are sent straight from the engine loop
+def auto_executor(gate):
+    def on_done(plan, task):
+        # IOC legs are filled or cancelled by the time submit_plan returns; a leg whose state
+        # is unknown keeps its exposure booked
+        failed = task.cancelled() or task.exception() is not None
+        gate.release(plan, settled=not failed and not task.result().unresolved)
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            print(f"❌ Execution failed: {task.exception()}")
+        else:
+            report_result(task.result())
+        # Pick up what actually filled before the next plan is checked
+        asyncio.get_running_loop().create_task(gate.refresh_balances(get_exchanges()))
+
+    def on_opportunity(plan):
+        if gate.in_flight(plan):
+            return  # the same opportunity is still executing
+        reason = gate.check(plan)
+        if reason is not None:
+            print(f"🛑 Skipped by risk gate ({reason})")
+            return
+        gate.reserve(plan)
+        print("⚡ Executing trades...")
+        task = asyncio.get_running_loop().create_task(get_executor().submit_plan(plan))
+        task.add_done_callback(lambda t: on_done(plan, t))
+
+    return on_opportunity
+
+def auto_loop(gate):
+    # Load balances before the first plan is checked, then run until interrupted
+    engine.run_coroutine_threadsafe(gate.refresh_balances(get_exchanges())).result()
+    print("🤖 Auto-execution started; press Ctrl+C to stop.")
+    threading.Event().wait()
+
+def main(min_interval=MIN_EVAL_INTERVAL, record_path=None, auto=False, risk_limits=RISK_LIMITS):
+    # Warm the credential cache off the hot path while feeds connect
+    credentials.prefetch(CREDENTIAL_KEYS)
+    gate = RiskGate(risk_limits) if auto else None
+    # Evaluate on every book update instead of polling
+    on_opportunity = auto_executor(gate) if auto else _offer_opportunity
+    evaluator = ArbitrageEvaluator(check_arbitrage, min_interval=min_interval, on_opportunity=on_opportunity)
+    engine.add_listener(evaluator)
+    recorder = None
+    if record_path:
+        # Keep every raw feed message so the session can be replayed offline
+        recorder = TickRecorder(record_path)
+        engine.set_recorder(recorder)
+        # Public trades are only recorded, so the session can be paper traded later
+        engine.add_feed(BinanceTradeFeed([SYMBOL]))
+        engine.add_feed(KrakenTradeFeed([SYMBOL]))
+    engine_thread = engine.start_in_thread()
+    try:
+        if auto:
+            auto_loop(gate)
+        else:
+            main_loop()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # Nothing may dispatch (and so record) once the recorder is closed below
+        engine.stop_threadsafe()
+        engine_thread.join(timeout=5.0)
+        if gate is not None:
+            stats = gate.summary()
+            print(f"🛡 Risk gate approved {stats['approved']} plans, rejected {stats['rejected']}")
+        if recorder is not None:
+            recorder.close()
+            print(f"📼 Recorded {recorder.messages} feed messages to {record_path}")
+        stats = evaluator.histogram.summary()
+        print(f"⏱ Update-to-decision latency over {stats['count']} evaluations: "
+              f"p50 {stats['p50_ms']:.3f} ms, p99 {stats['p99_ms']:.3f} ms, max {stats['max_ms']:.3f} ms")
+        for feed, feed_summary in feed_stats.summary()['feeds'].items():
+            latency = feed_summary['feed_latency']
+            print(f"📡 {feed}: {feed_summary['messages']} quotes, exchange-to-receive "
+                  f"p50 {latency['p50_ms']:.1f} ms, p99 {latency['p99_ms']:.1f} ms")
+
+# Run the feed engine and main loop
 if __name__ == "__main__":
-    binance_thread = threading.Thread(target=start_binance_ws, daemon=True)
-    kraken_thread = threading.Thread(target=start_kraken_ws, daemon=True)
-    binance_thread.start()
-    kraken_thread.start()
-    
-    main_loop()
+    main()
@@ -0,0 +1,342 @@
+"""Benchmark the arbitrage decision path over recorded or synthetic order-book streams.
+
+Usage:
+    python -m src.arbitrage.benchmark --synthetic 200000
+    python -m src.arbitrage.benchmark --synthetic 200000 --symbols BTC/USDT ETH/USDT SOL/USDT XRP/USDT --workers 4
+    python -m src.arbitrage.benchmark --log data/ticks/session.bin --output bench.json
+    python -m src.arbitrage.benchmark --decode 20000
+
+Prints a JSON report (messages/sec, decision latency percentiles,
+opportunities found, simulated PnL after fees) so runs can be compared
+in CI.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .decoding import BinanceDepthDecoder, decode_binance_trade
+from .feed_engine import FeedEngine, Quote, VenueFeed
+from .latency import LatencyHistogram
+from .order_book import BinanceDepthFeed, KrakenBookFeed, L2Book
+from .profit import find_best_plan
+from .sharding import ShardSupervisor
+from .spread_scanner import SpreadScanner
+from .tick_recorder import ReplayEngine
+
+DEFAULT_FEES = {"binance": 0.001, "kraken": 0.0026}
+
+
+class SyntheticBookFeed(VenueFeed):
+    """Feed for generated messages: ``{"s": symbol, "E": ms, "b": [[p, q], ...], "a": [...]}``.
+
+    Each message replaces the top of the book, which is enough to drive the
+    scanner and depth walk with realistic shapes.
+    """
+
+    def __init__(self, venue: str, symbols: Iterable[str]):
+        super().__init__(symbols)
+        self.venue = venue
+        self.books: Dict[str, L2Book] = {s: L2Book(venue, s) for s in self.symbols}
+
+    @property
+    def url(self) -> str:
+        return ""
+
+    def handle(self, message, recv_ts: float) -> List[Quote]:
+        data = json.loads(message)
+        book = self.books[data["s"]]
+        book.clear()
+        book.apply(data["b"], data["a"])
+        book.recv_ts = recv_ts
+        book.exchange_ts = data["E"] / 1000
+        quote = book.to_quote()
+        return [quote] if quote else []
+
+
+def synthetic_messages(venues: List[str], symbols: List[str], count: int, levels: int = 10,
+                       dislocation: float = 0.0003, seed: int = 7) -> Iterator[Tuple[str, bytes]]:
+    """Random-walk books per venue whose mids occasionally drift far enough apart to cross."""
+    rng = random.Random(seed)
+    mids = {s: rng.uniform(10, 60000) for s in symbols}
+    offsets = {(v, s): 0.0 for v in venues for s in symbols}
+    for _ in range(count):
+        venue, symbol = rng.choice(venues), rng.choice(symbols)
+        mids[symbol] *= 1 + rng.gauss(0, 0.0002)
+        # Mean-reverting venue offset so crosses open and close
+        key = (venue, symbol)
+        offsets[key] = 0.9 * offsets[key] + rng.gauss(0, dislocation)
+        mid = mids[symbol] * (1 + offsets[key])
+        tick = mid * 0.0001
+        bids = [[round(mid - tick * (i + 1), 8), round(rng.expovariate(2.0), 6)] for i in range(levels)]
+        asks = [[round(mid + tick * (i + 1), 8), round(rng.expovariate(2.0), 6)] for i in range(levels)]
+        message = {"s": symbol, "E": int(time.time() * 1000), "b": bids, "a": asks}
+        yield venue, json.dumps(message).encode()
+
+
+class ArbitrageBenchmark:
+    """Engine listener that runs the production decision path and keeps score.
+
+    A crossed (symbol, buy venue, sell venue) counts as one opportunity
+    until it closes, and its PnL is the best net profit seen while open,
+    so a persistent cross is not booked on every tick.
+    """
+
+    def __init__(self, venues: List[str], symbols: List[str], books: Dict[str, Dict[str, L2Book]],
+                 threshold: float = 0.0, fees: Optional[Dict[str, float]] = None,
+                 max_size: Optional[float] = None, depth: int = 50):
+        self.scanner = SpreadScanner(venues, symbols)
+        self.books = books
+        self.threshold = threshold
+        self.fees = fees if fees is not None else DEFAULT_FEES
+        self.max_size = max_size
+        self.depth = depth
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget decisions, latency and PnL so far; books and quotes are kept (end of a warm-up)."""
+        self.histogram = LatencyHistogram()
+        self.decisions = 0
+        self.opportunities = 0
+        self.pnl = 0.0
+        self._open: Dict[Tuple[str, str, str], float] = {}
+
+    def _get_book(self, venue: str, symbol: str) -> L2Book:
+        return self.books[venue][symbol]
+
+    def __call__(self, quote: Quote) -> None:
+        self.scanner.update_quote(quote)
+        plan = find_best_plan(self.scanner, self._get_book, quote.symbol, self.threshold,
+                              self.fees, self.max_size, self.depth)
+        self.histogram.record(time.time() - quote.recv_ts)
+        self.decisions += 1
+        open_keys = [k for k in self._open if k[0] == quote.symbol]
+        key = None
+        if plan is not None:
+            o = plan.opportunity
+            key = (o.symbol, o.buy_venue, o.sell_venue)
+            if key not in self._open:
+                self.opportunities += 1
+                self._open[key] = 0.0
+            self._open[key] = max(self._open[key], plan.net_profit)
+        for k in open_keys:
+            if k != key:
+                self.pnl += self._open.pop(k)
+
+    def report(self, replay_stats: dict) -> dict:
+        pnl = self.pnl + sum(self._open.values())
+        latency = self.histogram.summary()
+        return {
+            "messages": replay_stats["messages"],
+            "elapsed_s": round(replay_stats["elapsed_s"], 6),
+            "messages_per_s": round(replay_stats["messages_per_s"], 1),
+            "decisions": self.decisions,
+            "decision_latency_us": {
+                "p50": round(latency["p50_ms"] * 1000, 1),
+                "p99": round(latency["p99_ms"] * 1000, 1),
+                "max": round(latency["max_ms"] * 1000, 1),
+            },
+            "opportunities": self.opportunities,
+            "simulated_pnl": round(pnl, 6),
+        }
+
+
+def _synthetic_setup(count: int, venues: List[str], symbols: List[str], **kwargs):
+    feeds = {v: SyntheticBookFeed(v, symbols) for v in venues}
+    engine = FeedEngine(feeds.values())
+    bench = ArbitrageBenchmark(venues, symbols, {v: f.books for v, f in feeds.items()}, **kwargs)
+    engine.add_listener(bench)
+    return feeds, engine, bench, list(synthetic_messages(venues, symbols, count))
+
+
+def _dispatch_all(engine: FeedEngine, feeds: Dict[str, VenueFeed], messages) -> None:
+    for venue, message in messages:
+        engine.dispatch(feeds[venue], message, time.time())
+
+
+def run_synthetic(count: int, venues: List[str], symbols: List[str], warmup: int = 0, **kwargs) -> dict:
+    """Time ``count`` messages through the decision path after ``warmup`` untimed ones."""
+    feeds, engine, bench, messages = _synthetic_setup(count + warmup, venues, symbols, **kwargs)
+    _dispatch_all(engine, feeds, messages[:warmup])
+    bench.reset()
+    start = time.perf_counter()
+    _dispatch_all(engine, feeds, messages[warmup:])
+    elapsed = time.perf_counter() - start
+    return bench.report({"messages": count, "elapsed_s": elapsed, "messages_per_s": count / elapsed})
+
+
+def synthetic_worker(shard: int, symbols: List[str], conn, count: int, venues: List[str], go=None,
+                     warmup: int = 0, **kwargs) -> None:
+    """``ShardSupervisor`` worker that benchmarks its own shard in steady state.
+
+    Messages are generated and ``warmup`` of them dispatched before the
+    worker reports ready; timing starts when the supervisor sets ``go``,
+    so process start-up and imports are not measured.
+    """
+    feeds, engine, bench, messages = _synthetic_setup(count + warmup, venues, symbols, **kwargs)
+    _dispatch_all(engine, feeds, messages[:warmup])
+    bench.reset()
+    conn.send(("ready", shard, None))
+    go.wait()
+    start = time.monotonic()  # system-wide clock, comparable across the worker processes
+    _dispatch_all(engine, feeds, messages[warmup:])
+    end = time.monotonic()
+    report = bench.report({"messages": count, "elapsed_s": end - start, "messages_per_s": count / (end - start)})
+    conn.send(("stats", shard, dict(report, start=start, end=end)))
+    conn.close()
+
+
+def run_sharded(count: int, venues: List[str], symbols: List[str], workers: int, warmup: int = 0, **kwargs) -> dict:
+    """Synthetic benchmark split across worker processes, ``count`` messages per symbol share.
+
+    Throughput is measured from the moment every worker is warm and told
+    to start until the last one finishes.
+    """
+    per_shard = count // max(1, min(workers, len(symbols)))
+    go = multiprocessing.Event()
+    supervisor = ShardSupervisor(symbols, workers, worker=synthetic_worker, restart=False,
+                                 count=per_shard, venues=venues, go=go, warmup=warmup, **kwargs)
+    supervisor.start()
+    try:
+        while len(supervisor.ready) < len(supervisor.shards) and supervisor.alive:
+            supervisor.poll(1.0)
+        go.set()
+        while supervisor.alive:
+            supervisor.poll()
+    finally:
+        supervisor.stop()
+    reports = list(supervisor.stats.values())
+    messages = sum(r["messages"] for r in reports)
+    elapsed = max(r["end"] for r in reports) - min(r["start"] for r in reports)
+    return {
+        "messages": messages,
+        "workers": len(reports),
+        "cpu_count": os.cpu_count(),
+        "elapsed_s": round(elapsed, 6),
+        "messages_per_s": round(messages / elapsed, 1),
+        "per_worker_messages_per_s": [r["messages_per_s"] for r in reports],
+        "decisions": sum(r["decisions"] for r in reports),
+        "opportunities": sum(r["opportunities"] for r in reports),
+        "simulated_pnl": round(sum(r["simulated_pnl"] for r in reports), 6),
+    }
+
+
+def run_recorded(path: str, symbols: List[str], **kwargs) -> dict:
+    feeds = {"binance": BinanceDepthFeed(symbols), "kraken": KrakenBookFeed(symbols)}
+    engine = FeedEngine(feeds.values())
+    bench = ArbitrageBenchmark(list(feeds), symbols, {v: f.books for v, f in feeds.items()}, **kwargs)
+    engine.add_listener(bench)
+    stats = ReplayEngine(engine, path).run(restamp=True)
+    return bench.report(stats)
+
+
+def decode_messages(levels: int, seed: int = 7) -> Dict[str, bytes]:
+    """One compact message per decoded type, shaped like the live Binance streams."""
+    rng = random.Random(seed)
+
+    def side(start, step):
+        return [[f"{start + step * i:.2f}", f"{rng.random():.8f}"] for i in range(levels)]
+
+    depth = {"stream": "btcusdt@depth@100ms", "data": {
+        "e": "depthUpdate", "E": 1700000000000, "s": "BTCUSDT", "U": 100, "u": 120,
+        "b": side(60000.0, -0.01), "a": side(60000.01, 0.01)}}
+    trade = {"stream": "btcusdt@trade", "data": {
+        "e": "trade", "E": 1700000000000, "s": "BTCUSDT", "t": 12345, "p": "60000.01", "q": "0.01500000",
+        "T": 1700000000000, "m": True, "M": True}}
+    return {name: json.dumps(m, separators=(",", ":")).encode() for name, m in
+            (("binance_depth", depth), ("binance_trade", trade))}
+
+
+def _json_decode(name: str, message: bytes):
+    """The generic path the feeds started from: ``json.loads`` then ``float`` per field."""
+    event = json.loads(message)["data"]
+    if name == "binance_depth":
+        return [(float(p), float(q)) for p, q in event["b"]], [(float(p), float(q)) for p, q in event["a"]]
+    return event["s"], event["T"] / 1000, float(event["p"]), float(event["q"]), event["m"]
+
+
+def _json_book_update(book: L2Book, message: bytes) -> None:
+    event = json.loads(message)["data"]
+    book.apply(event["b"], event["a"])
+
+
+def _typed_book_update(book: L2Book, decoder: BinanceDepthDecoder, message: bytes) -> None:
+    update = decoder.decode(message)
+    book.apply_arrays(update.bids, update.asks)
+
+
+def run_decode(count: int, levels: int = 100) -> dict:
+    """Time ``json.loads`` + ``float`` against the typed decoders, per message type.
+
+    ``binance_depth_book`` times the whole live path of ``BinanceDepthFeed``:
+    decoding a diff and applying it to an ``L2Book``.
+    """
+    messages = decode_messages(levels)
+    decoder = BinanceDepthDecoder()
+    json_book, typed_book = L2Book("binance", "BTC/USDT"), L2Book("binance", "BTC/USDT")
+    depth = messages["binance_depth"]
+    paths = {
+        "binance_depth": (lambda: _json_decode("binance_depth", depth), lambda: decoder.decode(depth)),
+        "binance_trade": (lambda: _json_decode("binance_trade", messages["binance_trade"]),
+                          lambda: decode_binance_trade(messages["binance_trade"])),
+        "binance_depth_book": (lambda: _json_book_update(json_book, depth),
+                               lambda: _typed_book_update(typed_book, decoder, depth)),
+    }
+    report = {"messages": count, "levels": levels}
+    for name, (json_path, typed_path) in paths.items():
+        timings = {}
+        for label, run in (("json_us", json_path), ("typed_us", typed_path)):
+            start = time.perf_counter()
+            for _ in range(count):
+                run()
+            timings[label] = round((time.perf_counter() - start) / count * 1e6, 2)
+        timings["speedup"] = round(timings["json_us"] / timings["typed_us"], 2)
+        report[name] = timings
+    return report
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Arbitrage scanner benchmark")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--log", type=str, help="Tick log written by TickRecorder.")
+    source.add_argument("--synthetic", type=int, help="Number of synthetic book messages to generate.")
+    source.add_argument("--decode", type=int, help="Messages per type for the decoding benchmark.")
+    parser.add_argument("--symbols", nargs="+", default=["BTC/USDT"], help="Symbols to evaluate.")
+    parser.add_argument("--venues", nargs="+", default=["binance", "kraken"], help="Venues for synthetic data.")
+    parser.add_argument("--threshold", type=float, default=0.0, help="Minimum relative spread.")
+    parser.add_argument("--max_size", type=float, default=None, help="Maximum size per trade.")
+    parser.add_argument("--levels", type=int, default=100, help="Book levels per side for --decode.")
+    parser.add_argument("--workers", type=int, default=1, help="Shard synthetic symbols across this many processes.")
+    parser.add_argument("--warmup", type=int, default=5000,
+                        help="Untimed synthetic messages per process before measuring.")
+    parser.add_argument("--output", type=str, default=None, help="Write the JSON report here as well.")
+    args = parser.parse_args(argv)
+
+    options = {"threshold": args.threshold, "max_size": args.max_size}
+    synthetic_options = dict(options, warmup=args.warmup)
+    if args.decode:
+        report = run_decode(args.decode, args.levels)
+        report["source"] = "decode"
+    elif args.log:
+        report = run_recorded(args.log, args.symbols, **options)
+        report["source"] = args.log
+    elif args.workers > 1:
+        report = run_sharded(args.synthetic, args.venues, args.symbols, args.workers, **synthetic_options)
+        report["source"] = "synthetic"
+    else:
+        report = run_synthetic(args.synthetic, args.venues, args.symbols, **synthetic_options)
+        report["source"] = "synthetic"
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
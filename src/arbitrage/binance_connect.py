@@ -1,19 +1,19 @@
 import os
-import ccxt
 from dotenv import load_dotenv
 
+from .exchange_registry import get_registry
+
 # Load API keys from .env
 load_dotenv()
 API_KEY = os.getenv("BINANCE_API_KEY")
 SECRET_KEY = os.getenv("BINANCE_SECRET_KEY")
 
-# Connect to Binance
-exchange = ccxt.binance({
-    'apiKey': API_KEY,
-    'secret': SECRET_KEY,
-    'options': {'adjustForTimeDifference': True}
-})
+# Connect to Binance through the shared registry
+exchange = get_registry().client('binance', API_KEY, SECRET_KEY, options={'adjustForTimeDifference': True})
 
-# Fetch live BTC/USDT price
-ticker = exchange.fetch_ticker('BTC/USDT')
-print(f"BTC/USDT Price: {ticker['last']}")
+# Fetch live prices for every watched symbol with one bulk ticker request
+SYMBOLS = ['BTC/USDT', 'ETH/USDT', 'ETH/BTC']
+tickers = exchange.fetch_tickers(SYMBOLS)
+for symbol in SYMBOLS:
+    if symbol in tickers:
+        print(f"{symbol} Price: {tickers[symbol]['last']}")
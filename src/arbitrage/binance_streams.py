@@ -0,0 +1,175 @@
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+from .feed_engine import BINANCE_STREAM_URL, FeedEngine, Quote, VenueFeed
+
+MAX_STREAMS_PER_CONNECTION = 1024  # Binance limit per combined-stream connection
+MAX_MESSAGES_PER_SECOND = 5  # Binance limit on control messages sent per connection
+MAX_CONNECTIONS = 5
+SUBSCRIBE_BATCH = 200  # streams per SUBSCRIBE message
+
+
+def stream_of(message) -> Optional[str]:
+    """Stream name of a combined-stream message, read without parsing the payload."""
+    if isinstance(message, bytes):
+        message = message.decode()
+    key = message.find('"stream"', 0, 64)
+    if key < 0:
+        return None
+    start = message.find('"', key + len('"stream"')) + 1
+    return message[start:message.find('"', start)]
+
+
+class BinanceStreamConnection(VenueFeed):
+    """One pooled combined-stream socket carrying streams for any number of feeds.
+
+    The engine connects it like any other feed. Streams are added and
+    removed with SUBSCRIBE/UNSUBSCRIBE on the open socket (paced to the
+    per-connection message limit), and each message is handed to the feed
+    that owns its stream.
+    """
+
+    venue = "binance"
+
+    def __init__(self, manager: "BinanceStreamManager", index: int):
+        super().__init__([])
+        self.manager = manager
+        self.index = index
+        self.streams: Set[str] = set()
+        self._ws = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._send_lock: Optional[asyncio.Lock] = None
+        self._sent: Deque[float] = deque()
+        self._next_id = 1
+
+    @property
+    def url(self) -> str:
+        return BINANCE_STREAM_URL
+
+    async def _send(self, method: str, params: List[str]) -> None:
+        async with self._send_lock:
+            now = time.monotonic()
+            while self._sent and now - self._sent[0] >= 1.0:
+                self._sent.popleft()
+            if len(self._sent) >= MAX_MESSAGES_PER_SECOND:
+                await asyncio.sleep(1.0 - (now - self._sent[0]))
+                self._sent.popleft()
+            self._sent.append(time.monotonic())
+            request_id, self._next_id = self._next_id, self._next_id + 1
+            await self._ws.send(json.dumps({"method": method, "params": params, "id": request_id}))
+
+    async def _update(self, method: str, streams: List[str]) -> None:
+        for i in range(0, len(streams), SUBSCRIBE_BATCH):
+            await self._send(method, streams[i:i + SUBSCRIBE_BATCH])
+        if method == "SUBSCRIBE":
+            for stream in streams:
+                self.manager.notify_open(stream)
+
+    def _schedule(self, method: str, streams: List[str]) -> None:
+        if self._ws is not None and self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self._update(method, streams), self._loop)
+
+    def add_stream(self, stream: str) -> None:
+        self.streams.add(stream)
+        self._schedule("SUBSCRIBE", [stream])
+
+    def remove_stream(self, stream: str) -> None:
+        self.streams.discard(stream)
+        self._schedule("UNSUBSCRIBE", [stream])
+
+    async def on_open(self, ws) -> None:
+        self._ws = ws
+        self._loop = asyncio.get_running_loop()
+        self._send_lock = asyncio.Lock()
+        self._sent.clear()
+        await self._update("SUBSCRIBE", sorted(self.streams))
+
+    def on_close(self) -> None:
+        self._ws = None
+        for stream in self.streams:
+            self.manager.notify_close(stream)
+
+    def handle(self, message, recv_ts: float) -> List[Quote]:
+        stream = stream_of(message)
+        if stream is None:
+            # Replies to SUBSCRIBE/UNSUBSCRIBE: {"result": null, "id": n} or an error
+            reply = json.loads(message)
+            if reply.get("error"):
+                logging.error(f"Binance stream connection {self.index}: {reply['error']}")
+            return []
+        owner = self.manager.owner(stream)
+        if owner is None:
+            return []  # still arriving after an unsubscribe
+        return owner[0].handle(message, recv_ts)
+
+
+class BinanceStreamManager:
+    """Multiplexes many Binance streams over a small pool of combined-stream sockets.
+
+    Streams fill the existing connections up to ``max_streams_per_connection``
+    before a new one is opened, so adding a symbol is one SUBSCRIBE message
+    on a socket that is already up. Feeds only parse messages; they need
+    ``stream_name``, ``add_symbol`` and, if they track sync state,
+    ``on_symbol_open``/``on_symbol_close``.
+    """
+
+    def __init__(self, engine: FeedEngine, max_streams_per_connection: int = MAX_STREAMS_PER_CONNECTION,
+                 max_connections: int = MAX_CONNECTIONS):
+        self.engine = engine
+        self.max_streams_per_connection = max_streams_per_connection
+        self.max_connections = max_connections
+        self.connections: List[BinanceStreamConnection] = []
+        self._owners: Dict[str, Tuple[VenueFeed, str]] = {}
+        self._assigned: Dict[str, BinanceStreamConnection] = {}
+
+    def _connection_with_capacity(self) -> BinanceStreamConnection:
+        for connection in self.connections:
+            if len(connection.streams) < self.max_streams_per_connection:
+                return connection
+        if len(self.connections) >= self.max_connections:
+            raise RuntimeError(f"All {self.max_connections} Binance stream connections are full")
+        connection = BinanceStreamConnection(self, len(self.connections))
+        self.connections.append(connection)
+        self.engine.add_feed(connection)
+        return connection
+
+    def add_symbol(self, feed: VenueFeed, symbol: str) -> BinanceStreamConnection:
+        stream = feed.stream_name(symbol)
+        connection = self._assigned.get(stream)
+        if connection is not None:
+            return connection
+        feed.add_symbol(symbol)
+        self._owners[stream] = (feed, symbol)
+        connection = self._connection_with_capacity()
+        self._assigned[stream] = connection
+        connection.add_stream(stream)
+        return connection
+
+    def remove_symbol(self, feed: VenueFeed, symbol: str) -> None:
+        stream = feed.stream_name(symbol)
+        connection = self._assigned.pop(stream, None)
+        if connection is None:
+            return
+        connection.remove_stream(stream)
+        self._owners.pop(stream, None)
+        feed.on_symbol_close(symbol)
+
+    def owner(self, stream: str) -> Optional[Tuple[VenueFeed, str]]:
+        return self._owners.get(stream)
+
+    def notify_open(self, stream: str) -> None:
+        owner = self._owners.get(stream)
+        if owner is not None:
+            owner[0].on_symbol_open(owner[1])
+
+    def notify_close(self, stream: str) -> None:
+        owner = self._owners.get(stream)
+        if owner is not None:
+            owner[0].on_symbol_close(owner[1])
+
+    def stream_counts(self) -> List[int]:
+        return [len(c.streams) for c in self.connections]
@@ -0,0 +1,41 @@
+"""Arbitrage strategy settings shared by the CLI, the web stream, the shard workers and paper trading.
+
+Importing this module has no side effects: no credentials are read and
+no feeds or engines are built.
+"""
+import os
+from typing import Dict, List
+
+from .risk import RiskLimits
+
+SYMBOL = 'BTC/USDT'
+
+# Symbols the shared web stream may subscribe to. ``ARBITRAGE_SYMBOLS``
+# (comma list) overrides; anything else is rejected before it reaches a feed.
+DEFAULT_SYMBOLS = ('BTC/USDT', 'ETH/USDT', 'SOL/USDT', 'XRP/USDT')
+SYMBOLS: List[str] = [s.strip().upper() for s in os.getenv('ARBITRAGE_SYMBOLS', ','.join(DEFAULT_SYMBOLS)).split(',')
+                      if s.strip()]
+
+VENUES = ('binance', 'kraken')
+MIN_EVAL_INTERVAL = 0.0  # minimum seconds between arbitrage evaluations
+MIN_SPREAD = 0.0  # relative spread (sell bid / buy ask - 1) an opportunity must exceed
+MAX_TRADE_SIZE = 0.01  # BTC per leg
+DEPTH_LEVELS = 50  # book levels walked when sizing a trade
+TAKER_FEES = {'binance': 0.001, 'kraken': 0.0026}
+MAX_QUOTE_AGE = 2.0  # seconds; older quotes are left out of evaluation
+RISK_LIMITS = RiskLimits(max_notional=1000.0, max_open_exposure=2000.0, min_net_edge=0.0005)
+
+
+def make_feeds(symbols: List[str]) -> Dict[str, object]:
+    """Full-depth book feeds per venue, seeded once and kept current from diff streams."""
+    from .order_book import BinanceDepthFeed, KrakenBookFeed
+
+    return {'binance': BinanceDepthFeed(symbols), 'kraken': KrakenBookFeed(symbols)}
+
+
+def validate_symbol(symbol: str) -> str:
+    """Normalised ``symbol`` if it is configured, otherwise ``ValueError``."""
+    normalised = symbol.strip().upper()
+    if normalised not in SYMBOLS:
+        raise ValueError(f"Unsupported symbol {symbol!r}; expected one of {', '.join(SYMBOLS)}")
+    return normalised
@@ -0,0 +1,181 @@
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+DEFAULT_SECRETS_FILE = PROJECT_ROOT / "config" / ".env.arbitrage"
+DEFAULT_AWS_SECRET_ID = "arn:aws:secretsmanager:us-east-1:799854597846:secret:prod/cryptopilot-MA71Q3"
+DEFAULT_AWS_REGION = "us-east-1"
+
+
+class SecretsBackend:
+    """Source of key/value secrets. ``load`` may be slow; callers cache it."""
+
+    name = "backend"
+
+    def load(self) -> Dict[str, str]:
+        raise NotImplementedError
+
+
+class EnvBackend(SecretsBackend):
+    """Secrets from process environment variables."""
+
+    name = "env"
+
+    def __init__(self, keys: Optional[Iterable[str]] = None):
+        self.keys = list(keys) if keys is not None else None
+
+    def load(self) -> Dict[str, str]:
+        if self.keys is None:
+            return dict(os.environ)
+        return {k: os.environ[k] for k in self.keys if k in os.environ}
+
+
+class FileBackend(SecretsBackend):
+    """Secrets from a JSON object file or a ``KEY=value`` dotenv file."""
+
+    name = "file"
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+
+    def load(self) -> Dict[str, str]:
+        if not self.path.exists():
+            return {}
+        text = self.path.read_text()
+        if text.lstrip().startswith("{"):
+            return {k: str(v) for k, v in json.loads(text).items()}
+        values = {}
+        for line in text.splitlines():
+            line = line.strip()
+            if not line or line.startswith("#") or "=" not in line:
+                continue
+            key, value = line.split("=", 1)
+            values[key.strip()] = value.strip().strip("'\"")
+        return values
+
+
+class AwsSecretsManagerBackend(SecretsBackend):
+    """A JSON secret in AWS Secrets Manager; boto3 is only imported on first load."""
+
+    name = "aws"
+
+    def __init__(self, secret_id: str = DEFAULT_AWS_SECRET_ID, region_name: str = DEFAULT_AWS_REGION):
+        self.secret_id = secret_id
+        self.region_name = region_name
+
+    def load(self) -> Dict[str, str]:
+        import boto3
+
+        client = boto3.session.Session().client(service_name="secretsmanager", region_name=self.region_name)
+        response = client.get_secret_value(SecretId=self.secret_id)
+        return json.loads(response["SecretString"])
+
+
+class _CachedBackend:
+    def __init__(self, backend: SecretsBackend):
+        self.backend = backend
+        self.values: Optional[Dict[str, str]] = None
+        self.loaded_at = 0.0
+        self.lock = threading.Lock()
+        self.refreshing = False
+
+
+class CredentialProvider:
+    """Lazily resolved, in-memory cached secrets with TTL and background refresh.
+
+    Nothing is loaded until a key is first requested. Backends are consulted
+    in order and a later one is only loaded when earlier ones lack the key,
+    so a key set in the environment never triggers a Secrets Manager call.
+    Values older than ``ttl`` are reloaded synchronously; values within
+    ``refresh_ahead`` of expiry are returned immediately while a daemon
+    thread reloads them, so steady-state lookups never block.
+    """
+
+    def __init__(self, backends: List[SecretsBackend], ttl: float = 3600.0, refresh_ahead: float = 300.0):
+        self._backends = [_CachedBackend(b) for b in backends]
+        self.ttl = ttl
+        self.refresh_ahead = refresh_ahead
+
+    def _load(self, cached: _CachedBackend) -> None:
+        try:
+            values = cached.backend.load()
+        except Exception as e:
+            logging.error(f"Loading secrets from {cached.backend.name} failed: {e}")
+            if cached.values is None:
+                raise
+            return  # keep serving the last good values
+        finally:
+            cached.refreshing = False
+        cached.values = values
+        cached.loaded_at = time.monotonic()
+
+    def _refresh(self, cached: _CachedBackend) -> None:
+        # Background reload under the same lock as the synchronous one, so values and
+        # loaded_at change together and an expired lookup waits for this load instead of repeating it
+        with cached.lock:
+            self._load(cached)
+
+    def _values(self, cached: _CachedBackend) -> Dict[str, str]:
+        age = time.monotonic() - cached.loaded_at
+        if cached.values is None or age >= self.ttl:
+            with cached.lock:
+                if cached.values is None or time.monotonic() - cached.loaded_at >= self.ttl:
+                    self._load(cached)
+        elif age >= self.ttl - self.refresh_ahead and not cached.refreshing:
+            cached.refreshing = True
+            threading.Thread(target=self._refresh, args=(cached,), daemon=True).start()
+        return cached.values
+
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        for cached in self._backends:
+            values = self._values(cached)
+            if key in values:
+                return values[key]
+        return default
+
+    def require(self, *keys: str) -> Dict[str, str]:
+        """Resolve several keys, raising ``KeyError`` naming any that are missing."""
+        values = {key: self.get(key) for key in keys}
+        missing = [key for key, value in values.items() if value is None]
+        if missing:
+            raise KeyError(f"Missing credentials: {', '.join(missing)}")
+        return values
+
+    def prefetch(self, keys: Iterable[str] = ()) -> threading.Thread:
+        """Resolve ``keys`` on a background thread so later lookups hit the cache."""
+        def run():
+            try:
+                for key in keys:
+                    self.get(key)
+            except Exception as e:
+                logging.error(f"Credential prefetch failed: {e}")
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+    def invalidate(self) -> None:
+        for cached in self._backends:
+            with cached.lock:
+                cached.values = None
+
+
+def default_provider() -> CredentialProvider:
+    """Environment first, then the secrets file, then AWS Secrets Manager.
+
+    ``ARBITRAGE_SECRETS_FILE``, ``ARBITRAGE_AWS_SECRET_ID`` and
+    ``ARBITRAGE_SECRETS_BACKENDS`` (comma list of env,file,aws) override
+    the defaults.
+    """
+    names = os.getenv("ARBITRAGE_SECRETS_BACKENDS", "env,file,aws").split(",")
+    available = {
+        "env": lambda: EnvBackend(),
+        "file": lambda: FileBackend(os.getenv("ARBITRAGE_SECRETS_FILE", str(DEFAULT_SECRETS_FILE))),
+        "aws": lambda: AwsSecretsManagerBackend(os.getenv("ARBITRAGE_AWS_SECRET_ID", DEFAULT_AWS_SECRET_ID)),
+    }
+    return CredentialProvider([available[n.strip()]() for n in names if n.strip() in available])
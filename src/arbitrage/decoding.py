@@ -0,0 +1,134 @@
+import re
+from typing import Optional, Tuple
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+# Header fields of a Binance depthUpdate, in the order Binance sends them
+_BINANCE_DEPTH_HEADER = re.compile(rb'"e":"depthUpdate","E":(\d+),"s":"([^"]+)","U":(\d+),"u":(\d+)')
+_BINANCE_TRADE = re.compile(rb'"e":"trade","E":(\d+),"s":"([^"]+)","t":(\d+),"p":"([^"]+)","q":"([^"]+)",'
+                            rb'.*?"T":(\d+),"m":(true|false)')
+_LEVEL_CHARS = b'[]" \n'
+
+
+def _parse_numbers(text: bytes, out: np.ndarray) -> int:
+    """Parse a comma separated run of numbers into ``out`` (flat); returns how many.
+
+    With orjson the run is read as one flat JSON array, otherwise
+    ``np.fromstring`` converts it in C; either way no per-level strings or
+    containers are built. Text that is not a plain number list returns ``-1``.
+    """
+    if not text:
+        return 0
+    try:
+        if orjson is not None:
+            values = np.array(orjson.loads(b"[" + text + b"]"), dtype=float)
+        else:
+            values = np.fromstring(text, sep=",")
+    except (TypeError, ValueError):
+        return -1
+    n = values.size
+    if values.ndim != 1 or n != text.count(b",") + 1 or n > out.size:
+        return -1
+    out[:n] = values
+    return n
+
+
+def _array_span(raw: bytes, key: bytes, close: bytes, start: int = 0) -> Optional[slice]:
+    """Byte span inside the JSON array for ``key`` (e.g. ``b'"b":'``), without brackets.
+
+    The arrays decoded here hold only leaf rows, so the first ``close``
+    (``]]`` for nested lists) ends the array and ``bytes.find`` locates it
+    without walking the message in Python.
+    """
+    i = raw.find(key, start)
+    if i < 0:
+        return None
+    i = raw.find(b"[", i + len(key))
+    if i < 0:
+        return None
+    if raw.startswith(b"]", i + 1):
+        return slice(i + 1, i + 1)
+    j = raw.find(close, i)
+    if j < 0:
+        return None
+    return slice(i + 1, j + 1)
+
+
+class DepthUpdate:
+    """Decoded book diff. ``bids``/``asks`` are views into the decoder's buffers.
+
+    The views are overwritten by the next ``decode`` call; use ``copy()`` to
+    keep an update around.
+    """
+
+    __slots__ = ("symbol", "event_time", "first_id", "final_id", "bids", "asks")
+
+    def __init__(self):
+        self.symbol = ""
+        self.event_time = 0
+        self.first_id = 0
+        self.final_id = 0
+        self.bids = np.empty((0, 2))
+        self.asks = np.empty((0, 2))
+
+    def copy(self) -> "DepthUpdate":
+        other = DepthUpdate()
+        for name in self.__slots__:
+            setattr(other, name, getattr(self, name))
+        other.bids = self.bids.copy()
+        other.asks = self.asks.copy()
+        return other
+
+
+class BinanceDepthDecoder:
+    """Decodes Binance ``depthUpdate`` messages into preallocated ``(levels, 2)`` arrays.
+
+    Header fields are read with one regex and the level arrays are converted
+    straight from the message bytes, so no dicts, lists or per-level
+    Python strings are created.
+    """
+
+    def __init__(self, max_levels: int = 5000):
+        self._bids = np.empty(max_levels * 2)
+        self._asks = np.empty(max_levels * 2)
+        self.update = DepthUpdate()
+
+    def decode(self, raw) -> Optional[DepthUpdate]:
+        if isinstance(raw, str):
+            raw = raw.encode()
+        header = _BINANCE_DEPTH_HEADER.search(raw)
+        if header is None:
+            return None
+        bid_span = _array_span(raw, b'"b":', b"]]", header.end())
+        ask_span = _array_span(raw, b'"a":', b"]]", bid_span.stop) if bid_span else None
+        if bid_span is None or ask_span is None:
+            return None
+        n_bids = _parse_numbers(raw[bid_span].translate(None, _LEVEL_CHARS), self._bids)
+        n_asks = _parse_numbers(raw[ask_span].translate(None, _LEVEL_CHARS), self._asks)
+        if n_bids < 0 or n_asks < 0:
+            return None
+        update = self.update
+        update.event_time = int(header.group(1))
+        update.symbol = header.group(2).decode()
+        update.first_id = int(header.group(3))
+        update.final_id = int(header.group(4))
+        update.bids = self._bids[:n_bids].reshape(-1, 2)
+        update.asks = self._asks[:n_asks].reshape(-1, 2)
+        return update
+
+
+def decode_binance_trade(raw) -> Optional[Tuple[str, float, float, float, bool]]:
+    """(exchange symbol, trade time in seconds, price, qty, buyer_maker) from a Binance
+    ``trade`` message, read with one regex; None for anything else."""
+    if isinstance(raw, str):
+        raw = raw.encode()
+    match = _BINANCE_TRADE.search(raw)
+    if match is None:
+        return None
+    return (match.group(2).decode(), int(match.group(6)) / 1000, float(match.group(4)), float(match.group(5)),
+            match.group(7) == b"true")
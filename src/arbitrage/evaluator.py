@@ -0,0 +1,57 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Optional
+
+from .feed_engine import Quote
+from .latency import LatencyHistogram
+
+
+class ArbitrageEvaluator:
+    """Runs an arbitrage check on every book update, at most once per ``min_interval``.
+
+    Register it with ``FeedEngine.add_listener``. Updates arriving inside
+    the interval are coalesced into one trailing evaluation so the latest
+    book state is never skipped. The time from the triggering quote being
+    received to the decision is recorded in ``histogram``.
+    """
+
+    def __init__(self, check: Callable[[str], Any], min_interval: float = 0.0,
+                 on_opportunity: Optional[Callable[[Any], None]] = None,
+                 histogram: Optional[LatencyHistogram] = None):
+        self.check = check
+        self.min_interval = min_interval
+        self.on_opportunity = on_opportunity
+        self.histogram = histogram or LatencyHistogram()
+        self._last_eval = 0.0
+        self._pending: dict = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def __call__(self, quote: Quote) -> None:
+        now = time.time()
+        wait = self._last_eval + self.min_interval - now
+        if wait <= 0:
+            self._evaluate(quote)
+            return
+        # Keep the earliest receive time per symbol so latency covers the wait
+        if quote.symbol not in self._pending:
+            self._pending[quote.symbol] = quote
+        if self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(wait, self._flush)
+
+    def _flush(self) -> None:
+        self._timer = None
+        pending, self._pending = self._pending, {}
+        for quote in pending.values():
+            self._evaluate(quote)
+
+    def _evaluate(self, quote: Quote) -> None:
+        self._last_eval = time.time()
+        try:
+            opportunity = self.check(quote.symbol)
+        except Exception as e:
+            logging.error(f"Arbitrage check failed for {quote.symbol}: {e}")
+            return
+        self.histogram.record(time.time() - quote.recv_ts)
+        if opportunity and self.on_opportunity:
+            self.on_opportunity(opportunity)
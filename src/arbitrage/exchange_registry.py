@@ -0,0 +1,243 @@
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class VenueLimit:
+    """Request-weight budget of one venue, shared by every client in the process."""
+    capacity: float  # burst allowance in weight units
+    refill_per_second: float
+    ccxt_cost_weight: float = 1.0  # venue weight per unit of ccxt's per-endpoint ``cost``
+
+
+VENUE_LIMITS: Dict[str, VenueLimit] = {
+    # 6000 weight per minute; ccxt prices Binance endpoints at weight / 5
+    "binance": VenueLimit(capacity=6000, refill_per_second=100, ccxt_cost_weight=5),
+    "binanceus": VenueLimit(capacity=1200, refill_per_second=20, ccxt_cost_weight=5),
+    # Kraken's public REST limit is about one call per second with a small burst
+    "kraken": VenueLimit(capacity=15, refill_per_second=1),
+}
+DEFAULT_LIMIT = VenueLimit(capacity=10, refill_per_second=1)
+
+REST_URLS = {
+    "binance": "https://api.binance.com",
+    "binanceus": "https://api.binance.us",
+    "kraken": "https://api.kraken.com",
+}
+
+
+def binance_depth_weight(limit: int) -> int:
+    """Request weight of ``GET /api/v3/depth`` for a given ``limit``."""
+    if limit <= 100:
+        return 5
+    if limit <= 500:
+        return 25
+    if limit <= 1000:
+        return 50
+    return 250
+
+
+class WeightBudget:
+    """Token bucket over request weight, safe to share between threads and event loops.
+
+    A caller reserves its weight up front, letting the balance go negative,
+    and then sleeps off its share of the debt. Concurrent callers therefore
+    queue behind each other in arrival order instead of all waking together
+    when the bucket refills.
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.refill_per_second)
+        self._updated = now
+
+    def reserve(self, weight: float = 1.0) -> float:
+        """Take ``weight`` from the bucket and return how long the caller must wait."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= weight
+            return max(0.0, -self._tokens / self.refill_per_second)
+
+    def acquire(self, weight: float = 1.0) -> None:
+        delay = self.reserve(weight)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, weight: float = 1.0) -> None:
+        delay = self.reserve(weight)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def observe_used(self, used: float, limit: Optional[float] = None) -> None:
+        """Align with the weight the venue reports as already used (e.g. ``X-MBX-USED-WEIGHT-1M``)."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, (limit or self.capacity) - used)
+
+    def pause(self, seconds: float) -> None:
+        """Block every caller for ``seconds``, e.g. after a 429/418 with ``Retry-After``."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, -seconds * self.refill_per_second)
+
+    @property
+    def available(self) -> float:
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+
+def credential_fingerprint(api_key: Optional[str], secret: Optional[str]) -> str:
+    """Short digest identifying a key pair without keeping the secret in a dict key."""
+    if not api_key and not secret:
+        return "public"
+    return hashlib.sha256(f"{api_key}:{secret}".encode()).hexdigest()[:16]
+
+
+def _share_budget(client, budget: WeightBudget, cost_weight: float, is_async: bool) -> None:
+    """Charge every ccxt request on ``client`` to the venue budget before ccxt's own pacing."""
+    throttle = client.throttle
+
+    if is_async:
+        async def shared_throttle(cost=None):
+            await budget.acquire_async((1 if cost is None else cost) * cost_weight)
+            return await throttle(cost)
+    else:
+        def shared_throttle(cost=None):
+            budget.acquire((1 if cost is None else cost) * cost_weight)
+            return throttle(cost)
+
+    client.throttle = shared_throttle
+
+
+class ExchangeRegistry:
+    """Process-wide pool of exchange clients and HTTP sessions.
+
+    ccxt clients are keyed by (venue, credential fingerprint, sync/async) so
+    every module asking for the same account gets the same instance, with
+    its connection pool and loaded markets. All clients and raw REST calls
+    for a venue draw from one ``WeightBudget``, so modules running side by
+    side stay inside the venue's limit together.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, VenueLimit]] = None):
+        self.limits = dict(VENUE_LIMITS if limits is None else limits)
+        self._budgets: Dict[str, WeightBudget] = {}
+        self._clients: Dict[Tuple[str, str, bool], object] = {}
+        self._sessions: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def limit(self, venue: str) -> VenueLimit:
+        return self.limits.get(venue, DEFAULT_LIMIT)
+
+    def budget(self, venue: str) -> WeightBudget:
+        with self._lock:
+            budget = self._budgets.get(venue)
+            if budget is None:
+                limit = self.limit(venue)
+                budget = self._budgets[venue] = WeightBudget(limit.capacity, limit.refill_per_second)
+            return budget
+
+    def client(self, venue: str, api_key: Optional[str] = None, secret: Optional[str] = None,
+               async_: bool = False, options: Optional[dict] = None):
+        """Shared ccxt client for a venue and key pair; ``options`` only apply on first creation."""
+        key = (venue, credential_fingerprint(api_key, secret), async_)
+        with self._lock:
+            client = self._clients.get(key)
+        if client is not None:
+            return client
+        if async_:
+            import ccxt.async_support as ccxt
+        else:
+            import ccxt
+
+        config = {"enableRateLimit": True}
+        if api_key:
+            config["apiKey"] = api_key
+        if secret:
+            config["secret"] = secret
+        if options:
+            config["options"] = options
+        client = getattr(ccxt, venue)(config)
+        _share_budget(client, self.budget(venue), self.limit(venue).ccxt_cost_weight, async_)
+        with self._lock:
+            # Another thread may have built the same client meanwhile; keep the first
+            client = self._clients.setdefault(key, client)
+        logging.info(f"Created {'async ' if async_ else ''}{venue} client ({key[1]})")
+        return client
+
+    def session(self, venue: str):
+        """Pooled ``requests.Session`` for raw REST calls to a venue."""
+        with self._lock:
+            session = self._sessions.get(venue)
+            if session is None:
+                import requests
+
+                session = self._sessions[venue] = requests.Session()
+            return session
+
+    def request(self, venue: str, method: str, url: str, weight: float = 1.0, **kwargs):
+        """Budgeted REST call on the venue's pooled session.
+
+        Binance's used-weight header keeps the local budget in step with the
+        server, and a 429/418 pauses every caller for the ``Retry-After``
+        period before the response is returned.
+        """
+        budget = self.budget(venue)
+        budget.acquire(weight)
+        response = self.session(venue).request(method, url, **kwargs)
+        used = response.headers.get("X-MBX-USED-WEIGHT-1M")
+        if used is not None:
+            budget.observe_used(float(used))
+        if response.status_code in (418, 429):
+            retry_after = float(response.headers.get("Retry-After", 60))
+            logging.warning(f"{venue} rate limit hit ({response.status_code}); pausing {retry_after}s")
+            budget.pause(retry_after)
+        return response
+
+    def close(self) -> None:
+        """Close sync clients and sessions; async clients must be closed with ``aclose``."""
+        with self._lock:
+            sessions, self._sessions = list(self._sessions.values()), {}
+            clients = [(k, c) for k, c in self._clients.items() if not k[2]]
+            for key, _ in clients:
+                del self._clients[key]
+        for session in sessions:
+            session.close()
+        for _, client in clients:
+            close = getattr(client, "close", None)
+            if close is not None:
+                close()
+
+    async def aclose(self) -> None:
+        with self._lock:
+            clients = [(k, c) for k, c in self._clients.items() if k[2]]
+            for key, _ in clients:
+                del self._clients[key]
+        for _, client in clients:
+            await client.close()
+
+
+_registry: Optional[ExchangeRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> ExchangeRegistry:
+    """The registry shared by every module in this process."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ExchangeRegistry()
+    return _registry
@@ -0,0 +1,239 @@
+import asyncio
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from .profit import ExecutionPlan
+
+# Venue parameter carrying the client order id. Kraken's cl_ord_id is sent as is:
+# older ccxt maps a unified clientOrderId to its integer userref.
+CLIENT_ID_PARAMS = {"kraken": "cl_ord_id"}
+# Order states after which an IOC leg's ``filled`` is final
+DONE_STATUSES = ("closed", "canceled", "expired", "rejected")
+FILL_TOLERANCE = 1e-9  # base units; fill differences below this are left alone
+
+
+def new_client_order_id(venue: str) -> str:
+    """A fresh client order id in a format ``venue`` accepts."""
+    if venue == "kraken":
+        return str(uuid.uuid4())  # a UUID, or free text of at most 18 characters
+    return f"arb{uuid.uuid4().hex[:24]}"  # Binance: up to 36 of [.A-Z:/a-z0-9_-]
+
+
+@dataclass
+class LegResult:
+    """One order submission with its send and acknowledgement times."""
+    venue: str
+    symbol: str
+    side: str
+    amount: float
+    price: Optional[float]
+    order: Optional[Dict[str, Any]] = None
+    error: Optional[Exception] = None
+    send_ts: float = 0.0
+    ack_ts: float = 0.0
+    client_order_id: str = ""
+    timed_out: bool = False
+    # True while a timed-out order could not be found or ruled out on the venue
+    unknown: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def latency(self) -> float:
+        return self.ack_ts - self.send_ts
+
+    @property
+    def filled(self) -> float:
+        return float((self.order or {}).get("filled") or 0.0)
+
+
+@dataclass
+class PairResult:
+    """Both legs of a paired submission plus any recovery orders."""
+    buy: LegResult
+    sell: LegResult
+    recovery: List[LegResult] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        """Both legs placed and filled the same amount."""
+        return self.buy.ok and self.sell.ok and abs(self.buy.filled - self.sell.filled) <= FILL_TOLERANCE
+
+    @property
+    def unresolved(self) -> List[LegResult]:
+        """Legs whose state on the venue is unknown and need checking by hand."""
+        return [leg for leg in (self.buy, self.sell) if leg.unknown]
+
+    @property
+    def send_skew(self) -> float:
+        """Seconds between the two legs leaving this process."""
+        return abs(self.buy.send_ts - self.sell.send_ts)
+
+
+class PairedExecutor:
+    """Submits both legs of an arbitrage concurrently on ccxt async clients.
+
+    ``clients`` maps venue names to objects with the ``ccxt.async_support``
+    order API (``create_limit_order``, ``cancel_order``, ``fetch_order``,
+    ``create_market_order``, ``fetch_open_orders``, ``fetch_closed_orders``),
+    so a ``FakeExchange`` can stand in offline.
+
+    Both legs are immediate-or-cancel limit orders, so neither is left
+    resting on a book; the acknowledgement, or a ``fetch_order`` after it,
+    gives each leg's final fill. If exactly one leg fails, the surviving
+    leg is cancelled and whatever it filled is unwound with a market order
+    on the same venue. If both are placed but fill different amounts, the
+    excess is flattened the same way on the venue that filled more, so the
+    executor never leaves an unhedged position behind.
+
+    A leg that times out may still have reached the venue. Every order
+    carries a client order id (``new_client_order_id``); a timed-out leg is given one more
+    ``timeout`` for its acknowledgement and is otherwise looked up by that
+    id among the open and closed orders. A leg found that way counts as
+    placed, one proven absent counts as failed, and one that cannot be
+    checked is reported in ``PairResult.unresolved``.
+    """
+
+    def __init__(self, clients: Dict[str, Any], timeout: float = 10.0):
+        self.clients = clients
+        self.timeout = timeout
+
+    async def _send(self, leg: LegResult, order_type: str = "limit") -> LegResult:
+        client = self.clients[leg.venue]
+        leg.client_order_id = leg.client_order_id or new_client_order_id(leg.venue)
+        params = {CLIENT_ID_PARAMS.get(leg.venue, "clientOrderId"): leg.client_order_id}
+        leg.send_ts = time.time()
+        if order_type == "limit":
+            params["timeInForce"] = "IOC"
+            call = client.create_limit_order(leg.symbol, leg.side, leg.amount, leg.price, params)
+        else:
+            call = client.create_market_order(leg.symbol, leg.side, leg.amount, None, params)
+        # Shielded so a slow acknowledgement can still be collected by _reconcile
+        task = asyncio.ensure_future(call)
+        try:
+            leg.order = await asyncio.wait_for(asyncio.shield(task), self.timeout)
+        except asyncio.TimeoutError:
+            leg.timed_out = True
+            leg.error = asyncio.TimeoutError(f"no acknowledgement within {self.timeout}s")
+            leg.ack_ts = time.time()
+            await self._reconcile(leg, task)
+            return leg
+        except Exception as e:
+            leg.error = e
+        leg.ack_ts = time.time()
+        return leg
+
+    async def _find_order(self, leg: LegResult) -> Optional[Dict[str, Any]]:
+        """The venue's order carrying ``leg.client_order_id``, or None if it has none."""
+        client = self.clients[leg.venue]
+        since = int(leg.send_ts * 1000) - 60_000
+        for fetch in (client.fetch_open_orders, client.fetch_closed_orders):
+            orders = await asyncio.wait_for(fetch(leg.symbol, since), self.timeout)
+            for order in orders:
+                info = order.get("info") or {}
+                if leg.client_order_id in (order.get("clientOrderId"), info.get("cl_ord_id")):
+                    return order
+        return None
+
+    async def _reconcile(self, leg: LegResult, task: "asyncio.Future") -> None:
+        """Settle a timed-out leg: late acknowledgement, lookup by client id, or unknown."""
+        try:
+            leg.order = await asyncio.wait_for(task, self.timeout)
+            logging.warning(f"{leg.side} leg on {leg.venue} acknowledged late")
+        except asyncio.TimeoutError:
+            pass
+        except Exception as e:
+            leg.error = e  # the venue answered, with a rejection
+            return
+        if leg.order is None:
+            try:
+                leg.order = await self._find_order(leg)
+            except Exception as e:
+                leg.unknown = True
+                logging.error(f"{leg.side} leg {leg.client_order_id} on {leg.venue} timed out and could not be "
+                              f"looked up; its state is unknown: {e}")
+                return
+            if leg.order is None:
+                logging.warning(f"{leg.side} leg {leg.client_order_id} on {leg.venue} timed out and never "
+                                f"reached the venue")
+                return
+            logging.warning(f"{leg.side} leg on {leg.venue} timed out but was found as order {leg.order['id']}")
+        leg.error = None
+
+    async def _settle(self, leg: LegResult) -> None:
+        """Replace a placed leg's acknowledgement with its final state if the ack lacks the fill."""
+        if leg.order.get("status") in DONE_STATUSES and leg.order.get("filled") is not None:
+            return
+        try:
+            leg.order = await asyncio.wait_for(self.clients[leg.venue].fetch_order(leg.order["id"], leg.symbol),
+                                               self.timeout)
+        except Exception as e:
+            leg.unknown = True
+            logging.error(f"Could not fetch {leg.side} leg {leg.order['id']} on {leg.venue}; its fill is unknown: {e}")
+
+    async def submit_pair(self, symbol: str, amount: float, buy_venue: str, buy_price: float,
+                          sell_venue: str, sell_price: float) -> PairResult:
+        buy = LegResult(buy_venue, symbol, "buy", amount, buy_price)
+        sell = LegResult(sell_venue, symbol, "sell", amount, sell_price)
+        await asyncio.gather(self._send(buy), self._send(sell))
+        if buy.ok and sell.ok:
+            await asyncio.gather(self._settle(buy), self._settle(sell))
+        result = PairResult(buy, sell)
+        if result.unresolved:
+            logging.error(f"Unresolved legs, check the venues by hand: "
+                          + ", ".join(f"{leg.side} {leg.client_order_id} on {leg.venue}" for leg in result.unresolved))
+        if buy.ok != sell.ok:
+            survivor, failed = (buy, sell) if buy.ok else (sell, buy)
+            logging.warning(f"{failed.side} leg on {failed.venue} failed ({failed.error}); unwinding {survivor.venue} leg")
+            result.recovery = await self._unwind(survivor)
+        elif buy.ok and not result.unresolved and not result.ok:
+            excess = buy.filled - sell.filled
+            leg = buy if excess > 0 else sell
+            logging.warning(f"Legs filled {buy.filled} bought / {sell.filled} sold; "
+                            f"flattening {abs(excess)} on {leg.venue}")
+            result.recovery = [await self._hedge(leg, abs(excess))]
+        return result
+
+    async def submit_plan(self, plan: ExecutionPlan) -> PairResult:
+        opportunity = plan.opportunity
+        return await self.submit_pair(opportunity.symbol, plan.size, opportunity.buy_venue, plan.buy_limit,
+                                      opportunity.sell_venue, plan.sell_limit)
+
+    async def _unwind(self, leg: LegResult) -> List[LegResult]:
+        """Cancel a leg whose partner failed and flatten anything it filled."""
+        client = self.clients[leg.venue]
+        order_id = leg.order["id"]
+        recovery = []
+        try:
+            await asyncio.wait_for(client.cancel_order(order_id, leg.symbol), self.timeout)
+        except Exception as e:
+            # Usually means the order already filled completely
+            logging.info(f"Cancel of {order_id} on {leg.venue} failed: {e}")
+        try:
+            order = await asyncio.wait_for(client.fetch_order(order_id, leg.symbol), self.timeout)
+            filled = float(order.get("filled") or 0.0)
+        except Exception as e:
+            logging.error(f"Could not fetch {order_id} on {leg.venue}; assuming fully filled: {e}")
+            filled = leg.amount
+        if filled > 0:
+            recovery.append(await self._hedge(leg, filled))
+        return recovery
+
+    async def _hedge(self, leg: LegResult, amount: float) -> LegResult:
+        """Market order on ``leg``'s venue that reverses ``amount`` of it."""
+        hedge = LegResult(leg.venue, leg.symbol, "sell" if leg.side == "buy" else "buy", amount, None)
+        await self._send(hedge, order_type="market")
+        if not hedge.ok:
+            logging.error(f"Hedge of {amount} {leg.symbol} on {leg.venue} failed: {hedge.error}")
+        return hedge
+
+    async def close(self) -> None:
+        for client in self.clients.values():
+            close = getattr(client, "close", None)
+            if close is not None:
+                await close()
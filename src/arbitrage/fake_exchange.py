@@ -0,0 +1,126 @@
+import asyncio
+import itertools
+import time
+from typing import Dict, List, Optional
+
+
+class FakeExchangeError(Exception):
+    pass
+
+
+class FakeExchange:
+    """In-process stand-in for a ``ccxt.async_support`` exchange.
+
+    Orders are acknowledged after ``latency`` seconds and immediately fill
+    ``fill_ratio`` of their amount; the rest of a ``timeInForce="IOC"``
+    limit order is cancelled, any other limit order rests open.
+    ``bare_acks`` acknowledges with only the order ids, as Kraken does, so
+    the fill has to be fetched. ``fail_next`` makes the next N order
+    submissions raise, which is how partial-failure handling is exercised
+    without touching a real venue. ``slow_next`` places the next N orders
+    at once but acknowledges them only after ``slow_latency`` seconds;
+    ``lose_next`` makes the next N submissions hang without ever reaching
+    the book; ``fail_lookups`` makes order listing raise. Every call is
+    appended to ``calls``.
+    """
+
+    def __init__(self, name: str = "fake", latency: float = 0.0, fill_ratio: float = 0.0):
+        self.id = name
+        self.name = name
+        self.latency = latency
+        self.fill_ratio = fill_ratio
+        self.fail_next = 0
+        self.slow_next = 0
+        self.slow_latency = 0.0
+        self.lose_next = 0
+        self.fail_lookups = False
+        self.bare_acks = False
+        self.orders: Dict[str, dict] = {}
+        self.calls: List[tuple] = []
+        self._ids = itertools.count(1)
+
+    async def _delay(self) -> None:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    def _check_failure(self) -> None:
+        if self.fail_next > 0:
+            self.fail_next -= 1
+            raise FakeExchangeError(f"{self.name}: order rejected")
+
+    async def _submit(self, symbol: str, side: str, amount: float, price: Optional[float],
+                      order_type: str, filled: float, params: Optional[dict]) -> dict:
+        if self.lose_next > 0:
+            self.lose_next -= 1
+            await asyncio.Event().wait()  # the request is lost and never answered
+        await self._delay()
+        self._check_failure()
+        order = self._new_order(symbol, side, amount, price, order_type, filled, params or {})
+        if self.slow_next > 0:
+            self.slow_next -= 1
+            await asyncio.sleep(self.slow_latency)
+        if self.bare_acks:
+            return {key: order[key] for key in ("id", "clientOrderId", "info")}
+        return order
+
+    def _new_order(self, symbol: str, side: str, amount: float, price: Optional[float],
+                   order_type: str, filled: float, params: Optional[dict] = None) -> dict:
+        params = params or {}
+        order = {
+            "id": str(next(self._ids)),
+            "clientOrderId": params.get("clientOrderId"),
+            "info": dict(params),  # the raw request parameters stand in for the venue payload
+            "symbol": symbol,
+            "side": side,
+            "type": order_type,
+            "amount": amount,
+            "price": price,
+            "filled": filled,
+            "remaining": amount - filled,
+            "status": "closed" if filled >= amount else "canceled" if params.get("timeInForce") == "IOC" else "open",
+            "timestamp": int(time.time() * 1000),
+        }
+        self.orders[order["id"]] = order
+        return dict(order)
+
+    async def create_limit_order(self, symbol: str, side: str, amount: float, price: float, params=None) -> dict:
+        self.calls.append(("create_limit_order", symbol, side, amount, price))
+        return await self._submit(symbol, side, amount, price, "limit", amount * self.fill_ratio, params)
+
+    async def create_market_order(self, symbol: str, side: str, amount: float, price=None, params=None) -> dict:
+        self.calls.append(("create_market_order", symbol, side, amount))
+        return await self._submit(symbol, side, amount, None, "market", amount, params)
+
+    async def cancel_order(self, order_id: str, symbol: Optional[str] = None, params=None) -> dict:
+        self.calls.append(("cancel_order", order_id, symbol))
+        await self._delay()
+        order = self.orders.get(order_id)
+        if order is None or order["status"] != "open":
+            raise FakeExchangeError(f"{self.name}: order {order_id} is not open")
+        order["status"] = "canceled"
+        return dict(order)
+
+    async def fetch_order(self, order_id: str, symbol: Optional[str] = None, params=None) -> dict:
+        self.calls.append(("fetch_order", order_id, symbol))
+        await self._delay()
+        if order_id not in self.orders:
+            raise FakeExchangeError(f"{self.name}: unknown order {order_id}")
+        return dict(self.orders[order_id])
+
+    async def _list_orders(self, symbol: Optional[str], open_: bool) -> List[dict]:
+        await self._delay()
+        if self.fail_lookups:
+            raise FakeExchangeError(f"{self.name}: order lookup failed")
+        return [dict(o) for o in self.orders.values()
+                if (symbol is None or o["symbol"] == symbol) and (o["status"] == "open") == open_]
+
+    async def fetch_open_orders(self, symbol: Optional[str] = None, since=None, limit=None, params=None) -> List[dict]:
+        self.calls.append(("fetch_open_orders", symbol))
+        return await self._list_orders(symbol, True)
+
+    async def fetch_closed_orders(self, symbol: Optional[str] = None, since=None, limit=None, params=None) -> List[dict]:
+        self.calls.append(("fetch_closed_orders", symbol))
+        return await self._list_orders(symbol, False)
+
+    async def close(self) -> None:
+        pass
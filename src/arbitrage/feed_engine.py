@@ -0,0 +1,405 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import websockets
+
+from .decoding import decode_binance_trade
+
+BINANCE_STREAM_URL = "wss://stream.binance.com:9443/stream"
+KRAKEN_WS_URL = "wss://ws.kraken.com/v2"
+
+
+@dataclass(frozen=True)
+class Quote:
+    """Best bid/ask for one symbol on one venue.
+
+    Quotes are immutable, so a reader holding one always sees a bid and an
+    ask that arrived together.
+    """
+    venue: str
+    symbol: str
+    bid: float
+    ask: float
+    bid_size: float
+    ask_size: float
+    recv_ts: float
+    exchange_ts: Optional[float] = None
+
+
+def parse_rfc3339(value: Optional[str]) -> Optional[float]:
+    """Convert an RFC3339 timestamp (as sent by Kraken) to epoch seconds."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+class VenueFeed:
+    """One WebSocket connection to a venue, turning raw messages into quotes."""
+
+    venue = ""
+
+    def __init__(self, symbols: Iterable[str]):
+        self.symbols = list(symbols)
+        # False during replay: books wait for recorded snapshots instead of fetching
+        self.fetch_snapshots = True
+        # Called with (feed, symbol, snapshot) whenever a book is seeded out of band
+        self.on_snapshot: Optional[Callable[["VenueFeed", str, dict], None]] = None
+
+    @property
+    def url(self) -> str:
+        raise NotImplementedError
+
+    def subscribe_messages(self) -> List[dict]:
+        """Messages sent right after the socket opens."""
+        return []
+
+    async def on_open(self, ws) -> None:
+        for message in self.subscribe_messages():
+            await ws.send(json.dumps(message))
+
+    def on_close(self) -> None:
+        """Called when the connection drops, before reconnecting."""
+
+    def handle(self, message, recv_ts: float) -> List[Quote]:
+        raise NotImplementedError
+
+    def stream_name(self, symbol: str) -> str:
+        """Binance combined-stream name carrying ``symbol`` (feeds used with a stream manager)."""
+        raise NotImplementedError
+
+    def add_symbol(self, symbol: str) -> None:
+        """Start tracking ``symbol`` at runtime; subclasses add their per-symbol state."""
+        if symbol not in self.symbols:
+            self.symbols.append(symbol)
+
+    def on_symbol_open(self, symbol: str) -> None:
+        """A shared connection started delivering ``symbol``."""
+
+    def on_symbol_close(self, symbol: str) -> None:
+        """A shared connection stopped delivering ``symbol``."""
+
+
+class BinanceBookTickerFeed(VenueFeed):
+    """Top of book for many symbols over one Binance combined stream."""
+
+    venue = "binance"
+
+    def __init__(self, symbols: Iterable[str]):
+        super().__init__(symbols)
+        self._by_stream_symbol = {s.replace("/", "").upper(): s for s in self.symbols}
+
+    @property
+    def url(self) -> str:
+        streams = "/".join(self.stream_name(s) for s in self.symbols)
+        return f"{BINANCE_STREAM_URL}?streams={streams}"
+
+    def stream_name(self, symbol: str) -> str:
+        return f"{symbol.replace('/', '').lower()}@bookTicker"
+
+    def add_symbol(self, symbol: str) -> None:
+        super().add_symbol(symbol)
+        self._by_stream_symbol[symbol.replace("/", "").upper()] = symbol
+
+    def handle(self, message, recv_ts: float) -> List[Quote]:
+        data = json.loads(message)
+        payload = data.get("data", data)
+        symbol = self._by_stream_symbol.get(payload.get("s"))
+        if symbol is None or "b" not in payload or "a" not in payload:
+            return []
+        return [Quote(
+            venue=self.venue,
+            symbol=symbol,
+            bid=float(payload["b"]),
+            ask=float(payload["a"]),
+            bid_size=float(payload["B"]),
+            ask_size=float(payload["A"]),
+            recv_ts=recv_ts,
+        )]
+
+
+class KrakenTickerFeed(VenueFeed):
+    """Top of book from the Kraken v2 ticker channel, triggered on every BBO change."""
+
+    venue = "kraken"
+
+    @property
+    def url(self) -> str:
+        return KRAKEN_WS_URL
+
+    def subscribe_messages(self) -> List[dict]:
+        return [{
+            "method": "subscribe",
+            "params": {"channel": "ticker", "symbol": self.symbols, "event_trigger": "bbo"},
+        }]
+
+    def handle(self, message, recv_ts: float) -> List[Quote]:
+        data = json.loads(message)
+        if not isinstance(data, dict) or data.get("channel") != "ticker":
+            return []
+        quotes = []
+        for tick in data.get("data", []):
+            if tick.get("bid") is None or tick.get("ask") is None:
+                continue
+            quotes.append(Quote(
+                venue=self.venue,
+                symbol=tick["symbol"],
+                bid=float(tick["bid"]),
+                ask=float(tick["ask"]),
+                bid_size=float(tick.get("bid_qty") or 0.0),
+                ask_size=float(tick.get("ask_qty") or 0.0),
+                recv_ts=recv_ts,
+                exchange_ts=parse_rfc3339(tick.get("timestamp")),
+            ))
+        return quotes
+
+
+@dataclass(frozen=True)
+class Trade:
+    """One public trade; ``buyer_maker`` means the aggressor sold into resting bids."""
+    venue: str
+    symbol: str
+    price: float
+    qty: float
+    buyer_maker: bool
+    recv_ts: float
+    exchange_ts: Optional[float] = None
+
+
+class BinanceTradeFeed(VenueFeed):
+    """Public trades over one Binance combined stream, passed to ``on_trade``.
+
+    Trades are not quotes, so ``handle`` always returns an empty list; the
+    engine still records the raw messages for replay.
+    """
+
+    venue = "binance"
+
+    def __init__(self, symbols: Iterable[str], on_trade: Optional[Callable[[Trade], None]] = None):
+        super().__init__(symbols)
+        self.on_trade = on_trade
+        self._by_stream_symbol = {s.replace("/", "").upper(): s for s in self.symbols}
+
+    @property
+    def url(self) -> str:
+        streams = "/".join(self.stream_name(s) for s in self.symbols)
+        return f"{BINANCE_STREAM_URL}?streams={streams}"
+
+    def stream_name(self, symbol: str) -> str:
+        return f"{symbol.replace('/', '').lower()}@trade"
+
+    def add_symbol(self, symbol: str) -> None:
+        super().add_symbol(symbol)
+        self._by_stream_symbol[symbol.replace("/", "").upper()] = symbol
+
+    def handle(self, message, recv_ts: float) -> List[Quote]:
+        if self.on_trade is None:
+            return []
+        decoded = decode_binance_trade(message)
+        if decoded is not None:
+            stream_symbol, ts, price, qty, buyer_maker = decoded
+        else:
+            # Anything the regex does not recognise goes through the generic parser
+            data = json.loads(message)
+            payload = data.get("data", data)
+            if payload.get("e") != "trade":
+                return []
+            stream_symbol, ts, price, qty, buyer_maker = (payload.get("s"), payload["T"] / 1000, float(payload["p"]),
+                                                          float(payload["q"]), bool(payload["m"]))
+        symbol = self._by_stream_symbol.get(stream_symbol)
+        if symbol is None:
+            return []
+        self.on_trade(Trade(self.venue, symbol, price, qty, buyer_maker, recv_ts, ts))
+        return []
+
+
+class KrakenTradeFeed(VenueFeed):
+    """Public trades from the Kraken v2 trade channel, passed to ``on_trade``."""
+
+    venue = "kraken"
+
+    def __init__(self, symbols: Iterable[str], on_trade: Optional[Callable[[Trade], None]] = None):
+        super().__init__(symbols)
+        self.on_trade = on_trade
+
+    @property
+    def url(self) -> str:
+        return KRAKEN_WS_URL
+
+    def subscribe_messages(self) -> List[dict]:
+        return [{"method": "subscribe", "params": {"channel": "trade", "symbol": self.symbols}}]
+
+    def handle(self, message, recv_ts: float) -> List[Quote]:
+        data = json.loads(message)
+        if not isinstance(data, dict) or data.get("channel") != "trade" or self.on_trade is None:
+            return []
+        if data.get("type") == "snapshot":
+            return []  # recent history sent on subscribe, not new trades
+        for trade in data.get("data", []):
+            # A Kraken "sell" trade hit a resting buy order, i.e. the buyer was the maker
+            self.on_trade(Trade(self.venue, trade["symbol"], float(trade["price"]), float(trade["qty"]),
+                                trade.get("side") == "sell", recv_ts, parse_rfc3339(trade.get("timestamp"))))
+        return []
+
+
+class FeedEngine:
+    """Runs many venue feeds in a single event loop and fans quotes out to subscribers.
+
+    Listeners are plain callables invoked in the loop for every quote.
+    Queue subscribers get their own bounded ``asyncio.Queue``; when a slow
+    consumer falls behind, its oldest quote is dropped rather than blocking
+    the feeds.
+    """
+
+    def __init__(self, feeds: Iterable[VenueFeed] = (), reconnect_delay: float = 1.0,
+                 max_reconnect_delay: float = 30.0, recorder=None):
+        self.feeds: List[VenueFeed] = []
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.recorder = None
+        self._latest: Dict[Tuple[str, str], Quote] = {}
+        self._listeners: List[Callable[[Quote], None]] = []
+        self._queues: List[asyncio.Queue] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._running = threading.Event()  # set while ``_loop`` accepts work
+        self._tasks: List[asyncio.Task] = []
+        for feed in feeds:
+            self.add_feed(feed)
+        if recorder is not None:
+            self.set_recorder(recorder)
+
+    def add_feed(self, feed: VenueFeed) -> None:
+        self.feeds.append(feed)
+        if self.recorder is not None:
+            feed.on_snapshot = self.recorder.record_snapshot
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._start_feed, feed)
+
+    def set_recorder(self, recorder) -> None:
+        """Append every raw message (and book snapshot) to a ``TickRecorder``."""
+        self.recorder = recorder
+        for feed in self.feeds:
+            feed.on_snapshot = recorder.record_snapshot if recorder is not None else None
+
+    def add_listener(self, callback: Callable[[Quote], None]) -> None:
+        self._listeners.append(callback)
+
+    def subscribe(self, maxsize: int = 1000) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._queues.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        if queue in self._queues:
+            self._queues.remove(queue)
+
+    def latest(self, venue: str, symbol: str) -> Optional[Quote]:
+        return self._latest.get((venue, symbol))
+
+    def quotes(self) -> Dict[Tuple[str, str], Quote]:
+        return dict(self._latest)
+
+    def publish(self, quote: Quote) -> None:
+        """Record a quote and deliver it to every subscriber. Must run in the loop thread."""
+        self._latest[(quote.venue, quote.symbol)] = quote
+        for callback in self._listeners:
+            try:
+                callback(quote)
+            except Exception as e:
+                logging.error(f"Quote listener failed: {e}")
+        for queue in self._queues:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(quote)
+
+    def publish_threadsafe(self, quote: Quote) -> None:
+        if self._loop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self.publish, quote)
+        else:
+            self.publish(quote)
+
+    def dispatch(self, feed: VenueFeed, message, recv_ts: float) -> None:
+        try:
+            if self.recorder is not None:
+                self.recorder.record(feed, message, recv_ts)
+            quotes = feed.handle(message, recv_ts)
+        except Exception as e:
+            logging.error(f"Error handling {feed.venue} message: {e}")
+            return
+        for quote in quotes:
+            self.publish(quote)
+
+    async def run(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._running.set()
+        try:
+            for feed in self.feeds:
+                self._start_feed(feed)
+            while self._tasks:
+                await asyncio.gather(*list(self._tasks), return_exceptions=True)
+                self._tasks = [t for t in self._tasks if not t.done()]
+        finally:
+            self._running.clear()
+            self._loop = None
+
+    def _start_feed(self, feed: VenueFeed) -> None:
+        self._tasks.append(asyncio.get_running_loop().create_task(self._run_feed(feed)))
+
+    async def _run_feed(self, feed: VenueFeed) -> None:
+        delay = self.reconnect_delay
+        while True:
+            try:
+                async with websockets.connect(feed.url, ping_interval=20, max_size=None) as ws:
+                    logging.info(f"Connected to {feed.venue} feed ({len(feed.symbols)} symbols)")
+                    delay = self.reconnect_delay
+                    await feed.on_open(ws)
+                    async for message in ws:
+                        self.dispatch(feed, message, time.time())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.warning(f"{feed.venue} feed disconnected: {e}; reconnecting in {delay:.1f}s")
+            feed.on_close()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+
+    def start_in_thread(self, timeout: float = 5.0) -> threading.Thread:
+        """Run the engine's event loop in one daemon thread for synchronous callers.
+
+        Returns once the loop is up, so ``run_coroutine_threadsafe`` can be
+        called straight away.
+        """
+        thread = threading.Thread(target=asyncio.run, args=(self.run(),), daemon=True)
+        thread.start()
+        if not self._running.wait(timeout):
+            raise RuntimeError(f"Feed engine did not start within {timeout}s")
+        return thread
+
+    def run_coroutine_threadsafe(self, coro, timeout: float = 5.0):
+        """Schedule ``coro`` on the engine loop from another thread; returns a concurrent future.
+
+        Waits up to ``timeout`` for a loop that is still starting.
+        """
+        loop = self._loop
+        if loop is None and self._running.wait(timeout):
+            loop = self._loop
+        if loop is None:
+            coro.close()
+            raise RuntimeError("Feed engine is not running")
+        return asyncio.run_coroutine_threadsafe(coro, loop)
+
+    def stop_threadsafe(self) -> None:
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self.stop)
@@ -0,0 +1,70 @@
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from .feed_engine import Quote
+from .latency import LatencyHistogram
+
+
+class FeedStats:
+    """Per (venue, symbol) feed latency and freshness, recorded from every quote.
+
+    Register it with ``FeedEngine.add_listener``. Feed latency is receive
+    time minus the exchange's event timestamp, so it includes network
+    delay and any clock offset between the two hosts; quotes stamped in
+    the future are counted in ``clock_skew`` and recorded as zero. The gap
+    between consecutive quotes is tracked too, which is what reveals a feed
+    that silently stopped.
+    """
+
+    def __init__(self, max_age: float = 2.0):
+        self.max_age = max_age
+        self.latency: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self.interarrival: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self.last_recv: Dict[Tuple[str, str], float] = {}
+        self.last_exchange: Dict[Tuple[str, str], float] = {}
+        self.messages: Counter = Counter()
+        self.clock_skew: Counter = Counter()
+
+    def __call__(self, quote: Quote) -> None:
+        key = (quote.venue, quote.symbol)
+        last = self.last_recv.get(key)
+        if last is None:
+            self.latency[key] = LatencyHistogram()
+            self.interarrival[key] = LatencyHistogram()
+        else:
+            self.interarrival[key].record(quote.recv_ts - last)
+        self.last_recv[key] = quote.recv_ts
+        self.messages[key] += 1
+        if quote.exchange_ts is not None:
+            delay = quote.recv_ts - quote.exchange_ts
+            if delay < 0:
+                self.clock_skew[key] += 1
+            self.latency[key].record(delay)
+            self.last_exchange[key] = quote.exchange_ts
+
+    def age(self, venue: str, symbol: str, now: Optional[float] = None) -> Optional[float]:
+        """Seconds since the last quote for ``(venue, symbol)`` was received."""
+        last = self.last_recv.get((venue, symbol))
+        if last is None:
+            return None
+        return (time.time() if now is None else now) - last
+
+    def stale(self, now: Optional[float] = None) -> List[Tuple[str, str]]:
+        now = time.time() if now is None else now
+        return [key for key, last in self.last_recv.items() if now - last > self.max_age]
+
+    def summary(self, now: Optional[float] = None) -> dict:
+        now = time.time() if now is None else now
+        feeds = {}
+        for key, last in self.last_recv.items():
+            age = now - last
+            feeds[f"{key[0]}:{key[1]}"] = {
+                "messages": self.messages[key],
+                "age_s": round(age, 3),
+                "stale": age > self.max_age,
+                "feed_latency": self.latency[key].summary(),
+                "interarrival": self.interarrival[key].summary(),
+                "clock_skew": self.clock_skew[key],
+            }
+        return {"max_age_s": self.max_age, "feeds": feeds}
@@ -1,10 +1,11 @@
-import ccxt
+import asyncio
 
-# Initialize Binance
-binance = ccxt.binance({
-    'rateLimit': 1200,
-    'enableRateLimit': True
-})
+from .exchange_registry import get_registry
+from .snapshot_service import SnapshotService
+from .triangular import TriangularArbitrageDetector
+
+# Shared public Binance client, paced by the process-wide request-weight budget
+binance = get_registry().client('binance')
 
 # Function to fetch order book
 def get_order_book(pair):
@@ -13,9 +14,23 @@ def get_order_book(pair):
     best_ask = order_book['asks'][0][0] if order_book['asks'] else None
     return best_bid, best_ask
 
+# Best bid/ask for every pair from one bulk ticker request
+async def get_best_quotes(pairs):
+    service = SnapshotService('binance')
+    try:
+        tickers = await service.tickers(pairs)
+    finally:
+        await service.close()
+    return {pair: (tickers[pair].get('bid'), tickers[pair].get('ask')) for pair in pairs if pair in tickers}
+
 # Example pairs
 pairs = ['BTC/USDT', 'ETH/USDT', 'ETH/BTC']
 
-for pair in pairs:
-    bid, ask = get_order_book(pair)
+# Look for profitable conversion cycles across the pairs (0.1% taker fee per leg)
+detector = TriangularArbitrageDetector(fee=0.001)
+
+for pair, (bid, ask) in asyncio.run(get_best_quotes(pairs)).items():
     print(f"{pair} - Bid: {bid}, Ask: {ask}")
+    for cycle in detector.update(pair, bid, ask):
+        route = " -> ".join(cycle.assets)
+        print(f"🔺 Triangular opportunity {route}: {cycle.profit_bps:.1f} bps after fees via {cycle.legs}")
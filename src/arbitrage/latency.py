@@ -0,0 +1,91 @@
+import threading
+from typing import Dict, List
+
+
+class LatencyHistogram:
+    """Log-linear latency histogram in the spirit of HdrHistogram.
+
+    Values are recorded in whole microseconds. Each power-of-two range is
+    split into ``2 ** significant_bits`` linear sub-buckets, so the relative
+    error of any reported percentile is bounded by ``2 ** -significant_bits``
+    while memory stays a few KB regardless of how many samples are taken.
+    """
+
+    def __init__(self, significant_bits: int = 5, max_value_us: int = 60_000_000):
+        self.significant_bits = significant_bits
+        self.sub_bucket_count = 1 << significant_bits
+        self.max_value_us = max_value_us
+        self.counts: List[int] = [0] * (self._index(max_value_us) + 1)
+        self.total = 0
+        self.min_us = None
+        self.max_us = 0
+        self._sum_us = 0
+        self._lock = threading.Lock()
+
+    def _index(self, value: int) -> int:
+        s = self.sub_bucket_count
+        if value < 2 * s:
+            return value
+        shift = value.bit_length() - self.significant_bits - 1
+        return (shift + 1) * s + (value >> shift) - s
+
+    def _lowest_value(self, index: int) -> int:
+        s = self.sub_bucket_count
+        if index < 2 * s:
+            return index
+        shift = index // s - 1
+        return (index - shift * s) << shift
+
+    def record(self, seconds: float) -> None:
+        value = min(max(int(seconds * 1_000_000), 0), self.max_value_us)
+        with self._lock:
+            self.counts[self._index(value)] += 1
+            self.total += 1
+            self._sum_us += value
+            self.max_us = max(self.max_us, value)
+            self.min_us = value if self.min_us is None else min(self.min_us, value)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        if other.significant_bits != self.significant_bits:
+            raise ValueError("Cannot merge histograms with different precision")
+        with self._lock:
+            for i, count in enumerate(other.counts[:len(self.counts)]):
+                self.counts[i] += count
+            self.total += other.total
+            self._sum_us += other._sum_us
+            self.max_us = max(self.max_us, other.max_us)
+            if other.min_us is not None:
+                self.min_us = other.min_us if self.min_us is None else min(self.min_us, other.min_us)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counts = [0] * len(self.counts)
+            self.total = 0
+            self.min_us = None
+            self.max_us = 0
+            self._sum_us = 0
+
+    def percentile(self, q: float) -> float:
+        """Latency in seconds at percentile ``q`` (0-100)."""
+        if self.total == 0:
+            return 0.0
+        target = max(1, int(round(self.total * q / 100.0)))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(self._lowest_value(index), self.max_us) / 1_000_000
+        return self.max_us / 1_000_000
+
+    def summary(self) -> Dict[str, float]:
+        """Count plus mean/min/max and common percentiles, in milliseconds."""
+        return {
+            "count": self.total,
+            "mean_ms": (self._sum_us / self.total / 1000) if self.total else 0.0,
+            "min_ms": (self.min_us or 0) / 1000,
+            "p50_ms": self.percentile(50) * 1000,
+            "p90_ms": self.percentile(90) * 1000,
+            "p99_ms": self.percentile(99) * 1000,
+            "p999_ms": self.percentile(99.9) * 1000,
+            "max_ms": self.max_us / 1000,
+        }
@@ -0,0 +1,174 @@
+import asyncio
+import json
+import logging
+import time
+from typing import List, Optional
+
+from .binance_streams import BinanceStreamManager
+from .config import DEPTH_LEVELS, MAX_QUOTE_AGE, MAX_TRADE_SIZE, SYMBOL, TAKER_FEES, make_feeds, validate_symbol
+from .evaluator import ArbitrageEvaluator
+from .feed_engine import FeedEngine
+from .feed_stats import FeedStats
+from .profit import ExecutionPlan, find_best_plan
+from .spread_scanner import SpreadScanner
+
+
+def plan_to_dict(plan: ExecutionPlan) -> dict:
+    opportunity = plan.opportunity
+    return {
+        "symbol": opportunity.symbol,
+        "buy_venue": opportunity.buy_venue,
+        "sell_venue": opportunity.sell_venue,
+        "spread_bps": round(opportunity.spread_bps, 3),
+        "size": plan.size,
+        "buy_vwap": plan.buy_vwap,
+        "sell_vwap": plan.sell_vwap,
+        "net_profit": plan.net_profit,
+    }
+
+
+class ArbitrageStream:
+    """Feed engine and scanner embedded in a server's event loop, fanned out to many clients.
+
+    The engine starts with the first subscriber and stops ``idle_timeout``
+    seconds after the last one leaves, so exchange connections are shared
+    by every client and only held while someone is watching. Each event is
+    serialised once and put on every subscriber's bounded queue; a slow
+    client loses its oldest events instead of delaying the others.
+
+    Symbols can be added while it runs: Binance depth streams are
+    subscribed on the pooled combined-stream sockets and Kraken books on
+    the existing Kraken socket, so a new symbol never opens a connection.
+    """
+
+    def __init__(self, symbols: List[str], snapshot_interval: float = 1.0, min_interval: float = 0.1,
+                 idle_timeout: float = 30.0, threshold: float = 0.0):
+        self.symbols: List[str] = []
+        self.snapshot_interval = snapshot_interval
+        self.idle_timeout = idle_timeout
+        self.threshold = threshold
+        self.feeds = make_feeds([])
+        self.engine = FeedEngine([self.feeds["kraken"]])
+        self.binance_streams = BinanceStreamManager(self.engine)
+        self.feed_stats = FeedStats(max_age=MAX_QUOTE_AGE)
+        self.engine.add_listener(self.feed_stats)
+        self.scanner = SpreadScanner(self.feeds.keys(), max_age=MAX_QUOTE_AGE)
+        self.engine.add_listener(self.scanner.update_quote)
+        self.evaluator = ArbitrageEvaluator(self._check, min_interval=min_interval, on_opportunity=self._on_plan)
+        self.engine.add_listener(self.evaluator)
+        self.last_opportunity: Optional[dict] = None
+        self._subscribers: List[asyncio.Queue] = []
+        self._tasks: List[asyncio.Task] = []
+        self._idle_handle: Optional[asyncio.TimerHandle] = None
+        for symbol in symbols:
+            self.add_symbol(symbol)
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def add_symbol(self, symbol: str) -> None:
+        """Start streaming ``symbol``; call from the loop the stream runs on."""
+        if symbol in self.symbols:
+            return
+        self.symbols.append(symbol)
+        self.scanner.add_symbol(symbol)
+        self.binance_streams.add_symbol(self.feeds["binance"], symbol)
+        self.feeds["kraken"].add_symbol(symbol)
+        if self.running:
+            logging.info(f"Arbitrage stream now also watching {symbol}")
+
+    def _check(self, symbol: str) -> Optional[ExecutionPlan]:
+        get_book = lambda venue, s: self.feeds[venue].books[s]
+        return find_best_plan(self.scanner, get_book, symbol, threshold=self.threshold, fees=TAKER_FEES,
+                              max_size=MAX_TRADE_SIZE, depth=DEPTH_LEVELS)
+
+    def _on_plan(self, plan: ExecutionPlan) -> None:
+        self.last_opportunity = dict(plan_to_dict(plan), ts=time.time())
+        self.broadcast("opportunity", self.last_opportunity)
+
+    def snapshot(self, symbol: Optional[str] = None) -> dict:
+        """Latest quotes per venue and the best cross per symbol (or just ``symbol``), as plain JSON data."""
+        symbols = self.symbols if symbol is None else [s for s in self.symbols if s == symbol]
+        quotes = {}
+        for (venue, symbol), quote in self.engine.quotes().items():
+            if symbol not in symbols:
+                continue
+            quotes.setdefault(symbol, {})[venue] = {
+                "bid": quote.bid, "ask": quote.ask, "bid_size": quote.bid_size,
+                "ask_size": quote.ask_size, "recv_ts": quote.recv_ts,
+                "stale": self.feed_stats.age(venue, symbol) > MAX_QUOTE_AGE,
+            }
+        spreads = {}
+        for symbol in symbols:
+            best = self.scanner.scan(-1.0, symbol=symbol, limit=1)
+            if best:
+                o = best[0]
+                spreads[symbol] = {"buy_venue": o.buy_venue, "sell_venue": o.sell_venue,
+                                   "spread_bps": round(o.spread_bps, 3)}
+        return {"running": self.running, "clients": len(self._subscribers), "quotes": quotes,
+                "spreads": spreads, "last_opportunity": self.last_opportunity, "ts": time.time()}
+
+    def broadcast(self, event: str, data: dict) -> None:
+        frame = f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(frame)
+
+    async def _snapshots(self) -> None:
+        while True:
+            await asyncio.sleep(self.snapshot_interval)
+            if self._subscribers:
+                self.broadcast("spreads", self.snapshot())
+
+    def subscribe(self, maxsize: int = 100) -> asyncio.Queue:
+        """Bounded queue of ready-to-send SSE frames; starts the engine if it is not running."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._subscribers.append(queue)
+        if self._idle_handle is not None:
+            self._idle_handle.cancel()
+            self._idle_handle = None
+        if not self.running:
+            loop = asyncio.get_running_loop()
+            self._tasks = [loop.create_task(self.engine.run()), loop.create_task(self._snapshots())]
+            logging.info(f"Arbitrage stream started for {', '.join(self.symbols)}")
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        if queue in self._subscribers:
+            self._subscribers.remove(queue)
+        if not self._subscribers and self.running and self._idle_handle is None:
+            self._idle_handle = asyncio.get_running_loop().call_later(self.idle_timeout, self.stop)
+
+    def stop(self) -> None:
+        self._idle_handle = None
+        if self._subscribers:
+            return
+        self.engine.stop()
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        for feed in self.engine.feeds:
+            feed.on_close()
+        logging.info("Arbitrage stream stopped (no subscribers)")
+
+
+_stream: Optional[ArbitrageStream] = None
+
+
+def get_stream(symbol: Optional[str] = None) -> ArbitrageStream:
+    """The process-wide stream, created on first use.
+
+    With ``symbol`` it is also subscribed to that symbol, which must be one
+    of ``config.SYMBOLS`` (``ValueError`` otherwise); read-only callers
+    pass no symbol so they never change what the engine streams.
+    """
+    global _stream
+    if symbol is not None:
+        symbol = validate_symbol(symbol)
+    if _stream is None:
+        _stream = ArbitrageStream([symbol or SYMBOL])
+    elif symbol is not None:
+        _stream.add_symbol(symbol)
+    return _stream
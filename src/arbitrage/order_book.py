@@ -0,0 +1,412 @@
+import asyncio
+import bisect
+import json
+import logging
+import zlib
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+import numpy as np
+
+from .decoding import BinanceDepthDecoder, DepthUpdate
+from .exchange_registry import binance_depth_weight, get_registry
+from .feed_engine import BINANCE_STREAM_URL, KRAKEN_WS_URL, Quote, VenueFeed, parse_rfc3339
+
+BINANCE_REST_URL = "https://api.binance.com"
+BINANCE_SNAPSHOT_LIMIT = 1000
+MAX_BUFFERED_EVENTS = 10000
+RESYNC_DELAY = 1.0
+
+
+class L2Book:
+    """Full-depth price-level order book for one symbol on one venue.
+
+    Each side keeps a price -> quantity dict plus a sorted key list, so
+    level updates are O(log n) lookups and the best levels are always at
+    the front of the list.
+    """
+
+    def __init__(self, venue: str, symbol: str):
+        self.venue = venue
+        self.symbol = symbol
+        self.bids: Dict[float, float] = {}
+        self.asks: Dict[float, float] = {}
+        self._bid_keys: List[float] = []  # negated prices, ascending == best bid first
+        self._ask_keys: List[float] = []
+        self.last_update_id = 0
+        self.exchange_ts: Optional[float] = None
+        self.recv_ts = 0.0
+
+    def clear(self) -> None:
+        self.bids.clear()
+        self.asks.clear()
+        self._bid_keys.clear()
+        self._ask_keys.clear()
+        self.last_update_id = 0
+
+    def set_level(self, side: str, price: float, qty: float) -> None:
+        """Set one level; a zero quantity removes it."""
+        levels, keys, key = (self.bids, self._bid_keys, -price) if side == "bid" else (self.asks, self._ask_keys, price)
+        if qty == 0:
+            if levels.pop(price, None) is not None:
+                del keys[bisect.bisect_left(keys, key)]
+        else:
+            if price not in levels:
+                bisect.insort(keys, key)
+            levels[price] = qty
+
+    def apply(self, bids: Iterable[Tuple[float, float]], asks: Iterable[Tuple[float, float]]) -> None:
+        for price, qty in bids:
+            self.set_level("bid", float(price), float(qty))
+        for price, qty in asks:
+            self.set_level("ask", float(price), float(qty))
+
+    def apply_arrays(self, bids: np.ndarray, asks: np.ndarray) -> None:
+        """Apply ``(levels, 2)`` float arrays of (price, qty), as produced by the typed decoders.
+
+        Each side is converted to Python floats in one C call and the
+        level updates are inlined, so no per-level ``float()`` or method
+        call is paid.
+        """
+        for levels, keys, rows, sign in ((self.bids, self._bid_keys, bids, -1.0), (self.asks, self._ask_keys, asks, 1.0)):
+            for price, qty in rows.tolist():
+                if qty == 0:
+                    if levels.pop(price, None) is not None:
+                        del keys[bisect.bisect_left(keys, sign * price)]
+                else:
+                    if price not in levels:
+                        bisect.insort(keys, sign * price)
+                    levels[price] = qty
+
+    def truncate(self, depth: int) -> Tuple[List[float], List[float]]:
+        """Drop levels beyond ``depth`` on each side and return the removed prices."""
+        dropped_bids = [-k for k in self._bid_keys[depth:]]
+        dropped_asks = list(self._ask_keys[depth:])
+        for price in dropped_bids:
+            del self.bids[price]
+        for price in dropped_asks:
+            del self.asks[price]
+        del self._bid_keys[depth:]
+        del self._ask_keys[depth:]
+        return dropped_bids, dropped_asks
+
+    def best_bid(self) -> Optional[Tuple[float, float]]:
+        if not self._bid_keys:
+            return None
+        price = -self._bid_keys[0]
+        return price, self.bids[price]
+
+    def best_ask(self) -> Optional[Tuple[float, float]]:
+        if not self._ask_keys:
+            return None
+        price = self._ask_keys[0]
+        return price, self.asks[price]
+
+    def top(self, n: int) -> Tuple[List[Tuple[float, float]], List[Tuple[float, float]]]:
+        """Best ``n`` bids (descending) and asks (ascending) as (price, qty) pairs."""
+        bids = [(-k, self.bids[-k]) for k in self._bid_keys[:n]]
+        asks = [(k, self.asks[k]) for k in self._ask_keys[:n]]
+        return bids, asks
+
+    def depth_arrays(self, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Best ``n`` bids and asks as ``(levels, 2)`` float arrays of (price, qty)."""
+        bids, asks = self.top(n)
+        return np.array(bids, dtype=float).reshape(-1, 2), np.array(asks, dtype=float).reshape(-1, 2)
+
+    def to_quote(self) -> Optional[Quote]:
+        bid, ask = self.best_bid(), self.best_ask()
+        if bid is None or ask is None:
+            return None
+        return Quote(
+            venue=self.venue,
+            symbol=self.symbol,
+            bid=bid[0],
+            ask=ask[0],
+            bid_size=bid[1],
+            ask_size=ask[1],
+            recv_ts=self.recv_ts,
+            exchange_ts=self.exchange_ts,
+        )
+
+
+async def fetch_binance_snapshot(symbol: str, limit: int = BINANCE_SNAPSHOT_LIMIT) -> dict:
+    """Fetch a REST depth snapshot (``lastUpdateId``, ``bids``, ``asks``) from Binance."""
+    params = {"symbol": symbol.replace("/", "").upper(), "limit": limit}
+    await get_registry().budget("binance").acquire_async(binance_depth_weight(limit))
+    async with aiohttp.ClientSession() as session:
+        async with session.get(f"{BINANCE_REST_URL}/api/v3/depth", params=params,
+                               timeout=aiohttp.ClientTimeout(total=10)) as response:
+            response.raise_for_status()
+            return await response.json()
+
+
+class BinanceDepthFeed(VenueFeed):
+    """Binance full-depth books kept in sync from ``depthUpdate`` diff streams.
+
+    Follows Binance's documented procedure: buffer diffs, seed from one REST
+    snapshot, discard diffs older than the snapshot, then require every diff
+    to continue from the previous final update id. Any gap triggers a fresh
+    snapshot while new diffs keep buffering.
+    """
+
+    venue = "binance"
+
+    def __init__(self, symbols: Iterable[str],
+                 snapshot_fetcher: Callable[[str], Awaitable[dict]] = fetch_binance_snapshot):
+        super().__init__(symbols)
+        self.snapshot_fetcher = snapshot_fetcher
+        self.books: Dict[str, L2Book] = {s: L2Book(self.venue, s) for s in self.symbols}
+        self._by_stream_symbol = {s.replace("/", "").upper(): s for s in self.symbols}
+        self._synced: Dict[str, bool] = {s: False for s in self.symbols}
+        self._buffers: Dict[str, List[DepthUpdate]] = {s: [] for s in self.symbols}
+        self._resync_tasks: Dict[str, asyncio.Task] = {}
+        self._decoder = BinanceDepthDecoder()
+
+    @property
+    def url(self) -> str:
+        streams = "/".join(self.stream_name(s) for s in self.symbols)
+        return f"{BINANCE_STREAM_URL}?streams={streams}"
+
+    def stream_name(self, symbol: str) -> str:
+        return f"{symbol.replace('/', '').lower()}@depth@100ms"
+
+    def add_symbol(self, symbol: str) -> None:
+        if symbol in self.books:
+            return
+        super().add_symbol(symbol)
+        self.books[symbol] = L2Book(self.venue, symbol)
+        self._by_stream_symbol[symbol.replace("/", "").upper()] = symbol
+        self._synced[symbol] = False
+        self._buffers[symbol] = []
+
+    async def on_open(self, ws) -> None:
+        for symbol in self.symbols:
+            self.request_resync(symbol)
+
+    def on_close(self) -> None:
+        for symbol in self.symbols:
+            self.on_symbol_close(symbol)
+
+    def on_symbol_open(self, symbol: str) -> None:
+        self.request_resync(symbol)
+
+    def on_symbol_close(self, symbol: str) -> None:
+        task = self._resync_tasks.pop(symbol, None)
+        if task is not None:
+            task.cancel()
+        self._synced[symbol] = False
+        self._buffers[symbol].clear()
+
+    def request_resync(self, symbol: str) -> None:
+        self._synced[symbol] = False
+        if not self.fetch_snapshots:
+            return
+        task = self._resync_tasks.get(symbol)
+        if task is None or task.done():
+            self._resync_tasks[symbol] = asyncio.get_running_loop().create_task(self._resync(symbol))
+
+    async def _resync(self, symbol: str) -> None:
+        while not self._synced[symbol]:
+            try:
+                snapshot = await self.snapshot_fetcher(symbol)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.warning(f"Binance snapshot for {symbol} failed: {e}")
+                await asyncio.sleep(RESYNC_DELAY)
+                continue
+            if self.on_snapshot is not None:
+                self.on_snapshot(self, symbol, snapshot)
+            if not self.apply_snapshot(symbol, snapshot):
+                await asyncio.sleep(RESYNC_DELAY)
+
+    def apply_snapshot(self, symbol: str, snapshot: dict) -> bool:
+        """Seed a book from a REST snapshot and replay buffered diffs on top of it."""
+        book = self.books[symbol]
+        book.clear()
+        book.apply(snapshot["bids"], snapshot["asks"])
+        book.last_update_id = snapshot["lastUpdateId"]
+        buffered, self._buffers[symbol] = self._buffers[symbol], []
+        for event in buffered:
+            if not self._apply_event(book, event):
+                logging.warning(f"Binance {symbol} snapshot does not line up with buffered diffs; resyncing")
+                return False
+        self._synced[symbol] = True
+        logging.info(f"Binance {symbol} book synced at update id {book.last_update_id}")
+        return True
+
+    @staticmethod
+    def _apply_event(book: L2Book, update: DepthUpdate) -> bool:
+        """Apply one diff; return False when it reveals a sequence gap."""
+        if update.final_id <= book.last_update_id:
+            return True
+        if update.first_id > book.last_update_id + 1:
+            return False
+        book.apply_arrays(update.bids, update.asks)
+        book.last_update_id = update.final_id
+        book.exchange_ts = update.event_time / 1000
+        return True
+
+    def _decode(self, message) -> Optional[DepthUpdate]:
+        update = self._decoder.decode(message)
+        if update is not None:
+            return update
+        # Anything the byte decoder does not recognise goes through the generic parser
+        data = json.loads(message)
+        event = data.get("data", data)
+        if event.get("e") != "depthUpdate":
+            return None
+        update = DepthUpdate()
+        update.symbol, update.event_time, update.first_id, update.final_id = event["s"], event["E"], event["U"], event["u"]
+        update.bids = np.array(event["b"], dtype=float).reshape(-1, 2)
+        update.asks = np.array(event["a"], dtype=float).reshape(-1, 2)
+        return update
+
+    def handle(self, message, recv_ts: float) -> List[Quote]:
+        update = self._decode(message)
+        if update is None:
+            return []
+        symbol = self._by_stream_symbol.get(update.symbol)
+        if symbol is None:
+            return []
+        if not self._synced[symbol]:
+            buffer = self._buffers[symbol]
+            buffer.append(update.copy())  # the decoder reuses its arrays for the next message
+            if len(buffer) > MAX_BUFFERED_EVENTS:
+                del buffer[0]
+            return []
+        book = self.books[symbol]
+        if not self._apply_event(book, update):
+            logging.warning(f"Binance {symbol} sequence gap at {book.last_update_id} -> {update.first_id}; resyncing")
+            self._buffers[symbol].append(update.copy())
+            self.request_resync(symbol)
+            return []
+        book.recv_ts = recv_ts
+        quote = book.to_quote()
+        return [quote] if quote else []
+
+
+def kraken_checksum(asks: List[Tuple[str, str]], bids: List[Tuple[str, str]]) -> int:
+    """CRC32 over the top 10 asks then bids, as defined by Kraken's v2 book channel."""
+    parts = []
+    for price, qty in asks[:10] + bids[:10]:
+        parts.append(price.replace(".", "").lstrip("0"))
+        parts.append(qty.replace(".", "").lstrip("0"))
+    return zlib.crc32("".join(parts).encode())
+
+
+class KrakenBookFeed(VenueFeed):
+    """Kraken v2 ``book`` channel books, validated against the checksum on every message.
+
+    Kraken delivers its own snapshot on subscribe, so a checksum mismatch is
+    repaired by resubscribing the affected symbol.
+    """
+
+    venue = "kraken"
+
+    def __init__(self, symbols: Iterable[str], depth: int = 100):
+        super().__init__(symbols)
+        self.depth = depth
+        self.books: Dict[str, L2Book] = {s: L2Book(self.venue, s) for s in self.symbols}
+        # Price/qty exactly as sent, which the checksum is computed over.
+        self._text: Dict[str, Dict[Tuple[str, float], Tuple[str, str]]] = {s: {} for s in self.symbols}
+        self._synced: Dict[str, bool] = {s: False for s in self.symbols}
+        self._ws = None
+
+    @property
+    def url(self) -> str:
+        return KRAKEN_WS_URL
+
+    def _subscription(self, method: str, symbols: List[str]) -> dict:
+        return {"method": method, "params": {"channel": "book", "symbol": symbols, "depth": self.depth}}
+
+    def subscribe_messages(self) -> List[dict]:
+        return [self._subscription("subscribe", self.symbols)] if self.symbols else []
+
+    def add_symbol(self, symbol: str) -> None:
+        """Track another symbol, subscribing it on the open socket if there is one."""
+        if symbol in self.books:
+            return
+        super().add_symbol(symbol)
+        self.books[symbol] = L2Book(self.venue, symbol)
+        self._text[symbol] = {}
+        self._synced[symbol] = False
+        if self._ws is not None:
+            ws = self._ws
+            asyncio.get_running_loop().create_task(ws.send(json.dumps(self._subscription("subscribe", [symbol]))))
+
+    async def on_open(self, ws) -> None:
+        self._ws = ws
+        await super().on_open(ws)
+
+    def on_close(self) -> None:
+        self._ws = None
+        for symbol in self.symbols:
+            self._synced[symbol] = False
+
+    def request_resync(self, symbol: str) -> None:
+        self._synced[symbol] = False
+        if self._ws is None:
+            return
+        ws = self._ws
+
+        async def resubscribe():
+            await ws.send(json.dumps(self._subscription("unsubscribe", [symbol])))
+            await ws.send(json.dumps(self._subscription("subscribe", [symbol])))
+
+        asyncio.get_running_loop().create_task(resubscribe())
+
+    def _set_level(self, symbol: str, side: str, level: dict) -> None:
+        price_text, qty_text = level["price"], level["qty"]
+        price = float(price_text)
+        self.books[symbol].set_level(side, price, float(qty_text))
+        if float(qty_text) == 0:
+            self._text[symbol].pop((side, price), None)
+        else:
+            self._text[symbol][(side, price)] = (price_text, qty_text)
+
+    def _checksum(self, symbol: str) -> int:
+        book, text = self.books[symbol], self._text[symbol]
+        bids, asks = book.top(10)
+        return kraken_checksum(
+            [text[("ask", price)] for price, _ in asks],
+            [text[("bid", price)] for price, _ in bids],
+        )
+
+    def handle(self, message, recv_ts: float) -> List[Quote]:
+        # Keep numbers as text: the checksum is defined over the original digits.
+        data = json.loads(message, parse_float=str, parse_int=str)
+        if not isinstance(data, dict) or data.get("channel") != "book":
+            return []
+        snapshot = data.get("type") == "snapshot"
+        quotes = []
+        for entry in data.get("data", []):
+            symbol = entry.get("symbol")
+            if symbol not in self.books:
+                continue
+            book = self.books[symbol]
+            if snapshot:
+                book.clear()
+                self._text[symbol].clear()
+                self._synced[symbol] = True
+            elif not self._synced[symbol]:
+                continue
+            for level in entry.get("bids", []):
+                self._set_level(symbol, "bid", level)
+            for level in entry.get("asks", []):
+                self._set_level(symbol, "ask", level)
+            dropped_bids, dropped_asks = book.truncate(self.depth)
+            for price in dropped_bids:
+                self._text[symbol].pop(("bid", price), None)
+            for price in dropped_asks:
+                self._text[symbol].pop(("ask", price), None)
+            if "checksum" in entry and self._checksum(symbol) != int(entry["checksum"]):
+                logging.warning(f"Kraken {symbol} checksum mismatch; resubscribing")
+                self.request_resync(symbol)
+                continue
+            book.recv_ts = recv_ts
+            book.exchange_ts = parse_rfc3339(entry.get("timestamp")) or book.exchange_ts
+            quote = book.to_quote()
+            if quote:
+                quotes.append(quote)
+        return quotes
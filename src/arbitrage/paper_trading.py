@@ -0,0 +1,340 @@
+"""Paper trading against recorded (or live) books and trades.
+
+Usage:
+    python -m src.arbitrage.paper_trading --log ticks.bin --symbol BTC/USDT
+
+``PaperExchange`` simulates order entry latency, taker fills that walk the
+book, resting limit orders with a queue position, partial fills and
+maker/taker fees. ``replay`` drives it from a ``TickRecorder`` log on a
+simulated clock, so hours of market data run in seconds.
+
+Fill model for resting orders: an order joins the back of its price
+level. Trades at that price consume the quantity ahead of it first, then
+fill it; one trade's quantity is used up as it fills our orders in
+arrival order. A trade through the price fills it completely. When the level
+shrinks without trades, the shrink is treated as cancellations spread
+evenly through the queue, so the quantity ahead shrinks in proportion.
+The simulated orders do not move the replayed book (no market impact).
+"""
+import argparse
+import heapq
+import itertools
+import json
+import logging
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .feed_engine import BinanceTradeFeed, KrakenTradeFeed, Quote, Trade, VenueFeed
+from .order_book import L2Book
+from .tick_recorder import KIND_MESSAGE, KIND_SNAPSHOT, TickLog, channel_name
+
+TAKE_LEVELS = 200  # opposite-side levels a marketable order can walk
+
+
+@dataclass(frozen=True)
+class Fill:
+    order_id: str
+    ts: float
+    price: float
+    qty: float
+    fee: float
+    liquidity: str  # "maker" or "taker"
+
+
+@dataclass(eq=False)
+class PaperOrder:
+    """A simulated order; ``to_ccxt`` gives the same fields a ccxt order dict has."""
+    id: str
+    venue: str
+    symbol: str
+    side: str
+    amount: float
+    price: Optional[float]  # None for market orders
+    submit_ts: float
+    status: str = "pending"  # pending -> open -> closed/canceled
+    filled: float = 0.0
+    cost: float = 0.0
+    fee: float = 0.0
+    queue_ahead: float = 0.0
+    level_qty: float = 0.0  # book quantity at our price when last seen
+    cancel_pending: bool = False  # a cancel has been sent and not yet reached the venue
+    fills: List[Fill] = field(default_factory=list)
+
+    @property
+    def remaining(self) -> float:
+        return self.amount - self.filled
+
+    @property
+    def average(self) -> Optional[float]:
+        return self.cost / self.filled if self.filled else None
+
+    def to_ccxt(self) -> dict:
+        return {"id": self.id, "symbol": self.symbol, "side": self.side,
+                "type": "market" if self.price is None else "limit", "amount": self.amount,
+                "price": self.price, "filled": self.filled, "remaining": self.remaining,
+                "average": self.average, "cost": self.cost, "status": self.status,
+                "fee": {"cost": self.fee, "currency": self.symbol.split("/")[1]},
+                "timestamp": int(self.submit_ts * 1000)}
+
+
+class PaperExchange:
+    """Event-driven paper venue(s) on a simulated clock.
+
+    ``get_book(venue, symbol)`` returns the current ``L2Book`` (the same
+    callable ``find_best_plan`` takes). Submissions and cancels reach the
+    venue ``latency[venue]`` seconds after they are sent; ``advance`` runs
+    every scheduled event up to a timestamp and must be called before each
+    market-data update is applied. Balances start empty unless given and
+    go negative freely; they are a PnL ledger, not a constraint.
+    """
+
+    def __init__(self, get_book: Callable[[str, str], L2Book], taker_fees: Dict[str, float],
+                 maker_fees: Optional[Dict[str, float]] = None, latency: Optional[Dict[str, float]] = None,
+                 balances: Optional[Dict[str, Dict[str, float]]] = None,
+                 on_fill: Optional[Callable[[PaperOrder, Fill], None]] = None):
+        self.get_book = get_book
+        self.taker_fees = taker_fees
+        self.maker_fees = maker_fees if maker_fees is not None else taker_fees
+        self.latency = latency or {}
+        self.balances: Dict[str, Dict[str, float]] = balances if balances is not None else {}
+        self.on_fill = on_fill
+        self.clock = 0.0
+        self.orders: Dict[str, PaperOrder] = {}
+        self._live: Dict[str, PaperOrder] = {}  # pending or open
+        self.fills: List[Fill] = []
+        self._resting: Dict[Tuple[str, str], List[PaperOrder]] = {}
+        self._events: List[tuple] = []
+        self._seq = itertools.count()
+        self._ids = itertools.count(1)
+
+    # Order entry
+
+    def _schedule(self, ts: float, action: Callable[[PaperOrder], None], order: PaperOrder) -> None:
+        heapq.heappush(self._events, (ts, next(self._seq), action, order))
+
+    def submit(self, venue: str, symbol: str, side: str, amount: float, price: Optional[float] = None) -> PaperOrder:
+        order = PaperOrder(str(next(self._ids)), venue, symbol, side, amount, price, self.clock)
+        self.orders[order.id] = self._live[order.id] = order
+        self._schedule(self.clock + self.latency.get(venue, 0.0), self._arrive, order)
+        return order
+
+    def cancel(self, order_id: str) -> None:
+        """Send a cancel; repeated calls before it arrives are ignored."""
+        order = self.orders[order_id]
+        if order.cancel_pending:
+            return
+        order.cancel_pending = True
+        self._schedule(self.clock + self.latency.get(order.venue, 0.0), self._cancel, order)
+
+    def open_orders(self, venue: Optional[str] = None, symbol: Optional[str] = None) -> List[PaperOrder]:
+        return [o for o in self._live.values() if (venue is None or o.venue == venue) and (symbol is None or o.symbol == symbol)]
+
+    def advance(self, ts: float) -> None:
+        """Run order arrivals and cancels due by ``ts``, then move the clock there."""
+        events = self._events
+        while events and events[0][0] <= ts:
+            event_ts, _, action, order = heapq.heappop(events)
+            self.clock = event_ts
+            action(order)
+        self.clock = max(self.clock, ts)
+
+    # Matching
+
+    def _finish(self, order: PaperOrder, status: str) -> None:
+        order.status = status
+        self._live.pop(order.id, None)
+        resting = self._resting.get((order.venue, order.symbol))
+        if resting and order in resting:
+            resting.remove(order)
+
+    def _fill(self, order: PaperOrder, price: float, qty: float, liquidity: str) -> None:
+        fee_rate = (self.maker_fees if liquidity == "maker" else self.taker_fees).get(order.venue, 0.0)
+        notional = price * qty
+        fee = notional * fee_rate
+        order.filled += qty
+        order.cost += notional
+        order.fee += fee
+        fill = Fill(order.id, self.clock, price, qty, fee, liquidity)
+        order.fills.append(fill)
+        self.fills.append(fill)
+        base, quote = order.symbol.split("/")
+        balances = self.balances.setdefault(order.venue, {})
+        sign = 1 if order.side == "buy" else -1
+        balances[base] = balances.get(base, 0.0) + sign * qty
+        balances[quote] = balances.get(quote, 0.0) - sign * notional - fee
+        if order.remaining <= 1e-12:
+            self._finish(order, "closed")
+        if self.on_fill is not None:
+            self.on_fill(order, fill)
+
+    def _arrive(self, order: PaperOrder) -> None:
+        if order.status != "pending":
+            return
+        order.status = "open"
+        book = self.get_book(order.venue, order.symbol)
+        bids, asks = book.depth_arrays(TAKE_LEVELS)
+        levels = asks if order.side == "buy" else bids
+        for price, qty in levels:
+            if order.price is not None and (price > order.price if order.side == "buy" else price < order.price):
+                break
+            self._fill(order, float(price), min(float(qty), order.remaining), "taker")
+            if order.status == "closed":
+                return
+        if order.price is None:
+            self._finish(order, "canceled")  # market order ran out of book
+            return
+        side_levels = book.bids if order.side == "buy" else book.asks
+        order.level_qty = order.queue_ahead = side_levels.get(order.price, 0.0)
+        self._resting.setdefault((order.venue, order.symbol), []).append(order)
+
+    def _cancel(self, order: PaperOrder) -> None:
+        if order.status in ("pending", "open"):
+            self._finish(order, "canceled")
+
+    def on_book(self, book: L2Book) -> None:
+        """Update queue positions after a book change and fill orders the book traded through."""
+        resting = self._resting.get((book.venue, book.symbol))
+        if not resting:
+            return
+        best_bid, best_ask = book.best_bid(), book.best_ask()
+        for order in list(resting):
+            if order.side == "buy":
+                through = best_ask is not None and best_ask[0] < order.price
+                level = book.bids.get(order.price, 0.0)
+            else:
+                through = best_bid is not None and best_bid[0] > order.price
+                level = book.asks.get(order.price, 0.0)
+            if through:
+                self._fill(order, order.price, order.remaining, "maker")
+                continue
+            if level < order.level_qty and order.level_qty > 0:
+                order.queue_ahead *= level / order.level_qty
+            order.level_qty = level
+
+    def on_trade(self, trade: Trade) -> None:
+        resting = self._resting.get((trade.venue, trade.symbol))
+        if not resting:
+            return
+        # Sells hit resting buys (buyer is maker); buys lift resting sells
+        side = "buy" if trade.buyer_maker else "sell"
+        traded = trade.qty  # not yet given to one of our orders at the trade price
+        for order in list(resting):
+            if order.side != side:
+                continue
+            if (trade.price < order.price) if side == "buy" else (trade.price > order.price):
+                self._fill(order, order.price, order.remaining, "maker")
+            elif trade.price == order.price:
+                ahead = min(order.queue_ahead, traded)
+                order.queue_ahead -= ahead
+                order.level_qty = max(0.0, order.level_qty - trade.qty)
+                qty = min(traded - ahead, order.remaining)
+                if qty > 0:
+                    self._fill(order, order.price, qty, "maker")
+                    traded -= qty
+
+    def summary(self) -> dict:
+        maker = sum(f.qty for f in self.fills if f.liquidity == "maker")
+        taker = sum(f.qty for f in self.fills if f.liquidity == "taker")
+        statuses: Dict[str, int] = {}
+        for order in self.orders.values():
+            statuses[order.status] = statuses.get(order.status, 0) + 1
+        return {"orders": statuses, "fills": len(self.fills), "maker_qty": maker, "taker_qty": taker,
+                "fees": sum(f.fee for f in self.fills), "balances": self.balances}
+
+
+def replay(path, feeds: Iterable[VenueFeed], exchange: PaperExchange,
+           on_quote: Optional[Callable[[Quote], None]] = None) -> dict:
+    """Drive ``exchange`` (and an optional strategy callback) from a tick log as fast as possible.
+
+    ``feeds`` are the book and trade feeds the log was recorded with; each
+    record goes through its feed's own handler, and the exchange clock
+    follows the recorded receive times.
+    """
+    channels = {channel_name(feed): feed for feed in feeds}
+    for feed in channels.values():
+        feed.fetch_snapshots = False
+        if isinstance(feed, (BinanceTradeFeed, KrakenTradeFeed)):
+            feed.on_trade = exchange.on_trade
+    messages = 0
+    first_ts = last_ts = None
+    start = time.perf_counter()
+    for record in TickLog(path):
+        feed = channels.get(record.channel)
+        if feed is None:
+            continue
+        exchange.advance(record.recv_ts)
+        if first_ts is None:
+            first_ts = record.recv_ts
+        last_ts = record.recv_ts
+        if record.kind == KIND_SNAPSHOT:
+            data = json.loads(record.payload)
+            feed.apply_snapshot(data["symbol"], data["snapshot"])
+        elif record.kind == KIND_MESSAGE:
+            messages += 1
+            try:
+                quotes = feed.handle(record.payload, record.recv_ts)
+            except Exception as e:
+                logging.error(f"Error replaying {feed.venue} message: {e}")
+                continue
+            for quote in quotes:
+                exchange.on_book(feed.books[quote.symbol])
+                if on_quote is not None:
+                    on_quote(quote)
+    elapsed = time.perf_counter() - start
+    simulated = (last_ts - first_ts) if first_ts is not None else 0.0
+    return {"messages": messages, "elapsed_s": elapsed, "simulated_s": simulated,
+            "speedup": simulated / elapsed if elapsed > 0 else 0.0}
+
+
+def main(argv=None) -> None:
+    from .config import DEPTH_LEVELS, MAX_TRADE_SIZE, TAKER_FEES, make_feeds
+    from .profit import find_best_plan
+    from .spread_scanner import SpreadScanner
+
+    parser = argparse.ArgumentParser(description="Paper-trade the arbitrage strategy over a recorded tick log")
+    parser.add_argument("--log", required=True, help="Tick log written with `arbitrage --record`.")
+    parser.add_argument("--symbol", default="BTC/USDT")
+    parser.add_argument("--threshold", type=float, default=0.0, help="Minimum relative spread.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Order entry latency per venue, seconds.")
+    parser.add_argument("--order_ttl", type=float, default=2.0, help="Cancel unfilled legs after this many seconds.")
+    args = parser.parse_args(argv)
+
+    books = make_feeds([args.symbol])
+    feeds = list(books.values()) + [BinanceTradeFeed([args.symbol]), KrakenTradeFeed([args.symbol])]
+    get_book = lambda venue, symbol: books[venue].books[symbol]
+    exchange = PaperExchange(get_book, TAKER_FEES, latency={venue: args.latency for venue in books})
+    scanner = SpreadScanner(books.keys(), [args.symbol])
+    plans = 0
+
+    def on_quote(quote: Quote) -> None:
+        nonlocal plans
+        scanner.update_quote(quote)
+        open_orders = exchange.open_orders(symbol=quote.symbol)
+        for order in open_orders:
+            if exchange.clock - order.submit_ts > args.order_ttl:
+                exchange.cancel(order.id)
+        if open_orders:
+            return
+        plan = find_best_plan(scanner, get_book, quote.symbol, threshold=args.threshold, fees=TAKER_FEES,
+                              max_size=MAX_TRADE_SIZE, depth=DEPTH_LEVELS)
+        if plan is None:
+            return
+        plans += 1
+        o = plan.opportunity
+        exchange.submit(o.buy_venue, o.symbol, "buy", plan.size, plan.buy_limit)
+        exchange.submit(o.sell_venue, o.symbol, "sell", plan.size, plan.sell_limit)
+
+    stats = replay(args.log, feeds, exchange, on_quote)
+    summary = exchange.summary()
+    print(f"📼 Replayed {stats['messages']} messages ({stats['simulated_s']:.0f}s of market data) "
+          f"in {stats['elapsed_s']:.1f}s ({stats['speedup']:.0f}x)")
+    print(f"💼 {plans} plans, orders {summary['orders']}, {summary['fills']} fills "
+          f"(maker {summary['maker_qty']:.6f}, taker {summary['taker_qty']:.6f}), fees {summary['fees']:.4f}")
+    for venue, balances in summary["balances"].items():
+        print(f"💰 {venue}: " + ", ".join(f"{asset} {amount:+.6f}" for asset, amount in balances.items()))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,111 @@
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+from .spread_scanner import Opportunity, SpreadScanner
+
+
+@dataclass(frozen=True)
+class ExecutionPlan:
+    """Size and prices that maximise net profit when walking both books."""
+    opportunity: Opportunity
+    size: float
+    buy_vwap: float
+    sell_vwap: float
+    buy_limit: float  # worst ask touched; limit price for the buy leg
+    sell_limit: float  # worst bid touched; limit price for the sell leg
+    cost: float  # quote currency spent, including the buy fee
+    proceeds: float  # quote currency received, net of the sell fee
+
+    @property
+    def net_profit(self) -> float:
+        return self.proceeds - self.cost
+
+
+def _cumulative(levels: np.ndarray):
+    """Cumulative quantity and notional with a leading zero, for interpolation."""
+    qty = np.zeros(len(levels) + 1)
+    notional = np.zeros(len(levels) + 1)
+    levels[:, 1].cumsum(out=qty[1:])
+    (levels[:, 0] * levels[:, 1]).cumsum(out=notional[1:])
+    return qty, notional
+
+
+def profit_curve(asks: np.ndarray, bids: np.ndarray, buy_fee: float = 0.0, sell_fee: float = 0.0,
+                 max_size: Optional[float] = None):
+    """Net profit of buying into ``asks`` and selling into ``bids`` at every depth breakpoint.
+
+    ``asks`` and ``bids`` are ``(levels, 2)`` arrays of (price, qty), best
+    first. Cost and proceeds are piecewise linear in size with kinks at the
+    cumulative level quantities, so the profit maximum always lies on one
+    of those breakpoints and evaluating them is exact.
+
+    Returns ``(sizes, cost, proceeds)`` arrays.
+    """
+    ask_qty, ask_notional = _cumulative(asks)
+    bid_qty, bid_notional = _cumulative(bids)
+    return _curve(ask_qty, ask_notional, bid_qty, bid_notional, buy_fee, sell_fee, max_size)
+
+
+def _curve(ask_qty, ask_notional, bid_qty, bid_notional, buy_fee, sell_fee, max_size):
+    limit = min(ask_qty[-1], bid_qty[-1])
+    if max_size is not None:
+        limit = min(limit, max_size)
+    sizes = np.concatenate((ask_qty[1:], bid_qty[1:]))
+    np.minimum(sizes, limit, out=sizes)
+    cost = np.interp(sizes, ask_qty, ask_notional) * (1.0 + buy_fee)
+    proceeds = np.interp(sizes, bid_qty, bid_notional) * (1.0 - sell_fee)
+    return sizes, cost, proceeds
+
+
+def plan_execution(opportunity: Opportunity, asks: np.ndarray, bids: np.ndarray,
+                   buy_fee: float = 0.0, sell_fee: float = 0.0, max_size: Optional[float] = None,
+                   min_size: float = 0.0) -> Optional[ExecutionPlan]:
+    """Best fee-aware size for an opportunity, or None if no size is profitable."""
+    if not len(asks) or not len(bids):
+        return None
+    ask_qty, ask_notional = _cumulative(asks)
+    bid_qty, bid_notional = _cumulative(bids)
+    sizes, cost, proceeds = _curve(ask_qty, ask_notional, bid_qty, bid_notional, buy_fee, sell_fee, max_size)
+    net = proceeds - cost
+    best = int(net.argmax())
+    size = float(sizes[best])
+    if net[best] <= 0 or size <= min_size:
+        return None
+    # Deepest level each leg has to reach; searchsorted over the padded cumulative qty
+    buy_level = min(int(ask_qty.searchsorted(size)), len(asks)) - 1
+    sell_level = min(int(bid_qty.searchsorted(size)), len(bids)) - 1
+    return ExecutionPlan(
+        opportunity=opportunity,
+        size=size,
+        buy_vwap=float(cost[best] / (1.0 + buy_fee) / size),
+        sell_vwap=float(proceeds[best] / (1.0 - sell_fee) / size),
+        buy_limit=float(asks[buy_level, 0]),
+        sell_limit=float(bids[sell_level, 0]),
+        cost=float(cost[best]),
+        proceeds=float(proceeds[best]),
+    )
+
+
+def find_best_plan(scanner: SpreadScanner, get_book: Callable, symbol: str, threshold: float = 0.0,
+                   fees: Optional[Dict[str, float]] = None, max_size: Optional[float] = None,
+                   depth: int = 50) -> Optional[ExecutionPlan]:
+    """Size every scanner hit for ``symbol`` against the books and return the most profitable plan.
+
+    ``get_book(venue, symbol)`` must return an ``L2Book``.
+    """
+    fees = fees or {}
+    best = None
+    for opportunity in scanner.scan(threshold, symbol=symbol):
+        buy_fee = fees.get(opportunity.buy_venue, 0.0)
+        sell_fee = fees.get(opportunity.sell_venue, 0.0)
+        # Top of book is the best either leg can do; skip crosses that fees already erase
+        if (1.0 + opportunity.spread) * (1.0 - sell_fee) <= 1.0 + buy_fee:
+            continue
+        _, asks = get_book(opportunity.buy_venue, symbol).depth_arrays(depth)
+        bids, _ = get_book(opportunity.sell_venue, symbol).depth_arrays(depth)
+        plan = plan_execution(opportunity, asks, bids, buy_fee, sell_fee, max_size)
+        if plan and (best is None or plan.net_profit > best.net_profit):
+            best = plan
+    return best
@@ -0,0 +1,155 @@
+import logging
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from .profit import ExecutionPlan
+
+
+@dataclass(frozen=True)
+class RiskLimits:
+    """Pre-trade limits applied to every plan before it is sent unattended."""
+    max_notional: float = 1000.0  # quote currency per leg, at the worst limit price
+    max_open_exposure: float = 2000.0  # quote notional of all plans still in flight
+    min_net_edge: float = 0.0005  # net profit after fees / cost
+    check_balances: bool = True  # require free balances on both venues
+
+
+class RiskGate:
+    """In-process pre-trade checks plus the state they need (exposure, free balances).
+
+    ``check`` only does dict lookups and arithmetic, so approving a plan
+    costs microseconds. ``reserve`` books an approved plan's notional and
+    holds the funds both legs will use, so overlapping plans cannot spend
+    the same money twice. Only one plan per (symbol, buy venue, sell venue)
+    is in flight at a time; the same opportunity seen again on the next
+    book update is rejected until ``release``. Holds are kept apart from the venue-reported
+    ``balances``: a balance refresh replaces the latter but never drops a
+    hold. A finished plan's hold is kept until a refresh started after it
+    finished, so its fills are in the reported balances before the funds
+    are counted as free again. It is not thread-safe; use it from the
+    engine loop.
+    """
+
+    def __init__(self, limits: RiskLimits, balances: Optional[Dict[str, Dict[str, float]]] = None):
+        self.limits = limits
+        self.balances: Dict[str, Dict[str, float]] = balances if balances is not None else {}
+        # (venue, asset) -> amount held for plans still in flight
+        self.reserved: Dict[Tuple[str, str], float] = {}
+        # Holds of finished plans waiting for a balance refresh: (venue, asset, amount)
+        self._settling: List[Tuple[str, str, float]] = []
+        self._in_flight = set()  # (symbol, buy_venue, sell_venue) of plans not yet released
+        self.open_exposure = 0.0
+        self.approved = 0
+        self.rejected: Counter = Counter()
+
+    @staticmethod
+    def _notional(plan: ExecutionPlan) -> float:
+        return max(plan.cost, plan.size * plan.buy_limit)
+
+    @staticmethod
+    def _key(plan: ExecutionPlan) -> Tuple[str, str, str]:
+        opportunity = plan.opportunity
+        return opportunity.symbol, opportunity.buy_venue, opportunity.sell_venue
+
+    def in_flight(self, plan: ExecutionPlan) -> bool:
+        """True while a plan for the same opportunity is still executing."""
+        return self._key(plan) in self._in_flight
+
+    def set_balances(self, venue: str, free: Dict[str, Any]) -> None:
+        self.balances[venue] = {asset: float(amount or 0.0) for asset, amount in free.items()}
+
+    def free(self, venue: str, asset: str) -> float:
+        """Reported free balance less everything held for in-flight and settling plans."""
+        held = self.reserved.get((venue, asset), 0.0)
+        held += sum(amount for v, a, amount in self._settling if v == venue and a == asset)
+        return self.balances.get(venue, {}).get(asset, 0.0) - held
+
+    @staticmethod
+    def _holds(plan: ExecutionPlan, notional: float) -> Tuple[Tuple[str, str, float], ...]:
+        opportunity = plan.opportunity
+        base, quote = opportunity.symbol.split("/")
+        return ((opportunity.buy_venue, quote, notional), (opportunity.sell_venue, base, plan.size))
+
+    def _reject(self, reason: str) -> str:
+        self.rejected[reason.split(":")[0]] += 1
+        return reason
+
+    def check(self, plan: ExecutionPlan) -> Optional[str]:
+        """None if ``plan`` passes every limit, otherwise the reason it was rejected."""
+        limits = self.limits
+        if self.in_flight(plan):
+            return self._reject("in_flight: {} {} -> {}".format(*self._key(plan)))
+        notional = self._notional(plan)
+        if notional > limits.max_notional:
+            return self._reject(f"max_notional: {notional:.2f} > {limits.max_notional:.2f}")
+        if self.open_exposure + notional > limits.max_open_exposure:
+            return self._reject(f"max_open_exposure: {self.open_exposure + notional:.2f} > {limits.max_open_exposure:.2f}")
+        edge = plan.net_profit / plan.cost if plan.cost > 0 else 0.0
+        if edge < limits.min_net_edge:
+            return self._reject(f"min_net_edge: {edge * 1e4:.2f} bps < {limits.min_net_edge * 1e4:.2f} bps")
+        if limits.check_balances:
+            opportunity = plan.opportunity
+            base, quote = opportunity.symbol.split("/")
+            quote_free = self.free(opportunity.buy_venue, quote)
+            if quote_free < notional:
+                return self._reject(f"balance: {quote_free:.2f} {quote} on {opportunity.buy_venue} < {notional:.2f}")
+            base_free = self.free(opportunity.sell_venue, base)
+            if base_free < plan.size:
+                return self._reject(f"balance: {base_free} {base} on {opportunity.sell_venue} < {plan.size}")
+        self.approved += 1
+        return None
+
+    def reserve(self, plan: ExecutionPlan) -> None:
+        """Book an approved plan's exposure and hold the funds both legs will use."""
+        notional = self._notional(plan)
+        self.open_exposure += notional
+        self._in_flight.add(self._key(plan))
+        for venue, asset, amount in self._holds(plan, notional):
+            self.reserved[(venue, asset)] = self.reserved.get((venue, asset), 0.0) + amount
+
+    def release(self, plan: ExecutionPlan, settled: bool = True) -> None:
+        """Drop a finished plan's exposure once its orders are filled or cancelled.
+
+        Its funds stay held (the conservative side) until the next
+        ``refresh_balances`` reports what actually filled. With
+        ``settled=False`` (a leg's state on the venue is unknown) only the
+        opportunity is freed; exposure and holds stay booked.
+        """
+        self._in_flight.discard(self._key(plan))
+        if not settled:
+            return
+        notional = self._notional(plan)
+        self.open_exposure = max(0.0, self.open_exposure - notional)
+        for venue, asset, amount in self._holds(plan, notional):
+            left = self.reserved.get((venue, asset), 0.0) - amount
+            if left > 1e-12:
+                self.reserved[(venue, asset)] = left
+            else:
+                self.reserved.pop((venue, asset), None)
+            self._settling.append((venue, asset, amount))
+
+    async def refresh_balances(self, clients: Dict[str, Any]) -> None:
+        """Reload free balances from every venue (ccxt ``fetch_balance``).
+
+        In-flight holds are untouched. Holds of plans that finished before
+        this refresh started are dropped for the venues that answered.
+        """
+        settled = list(self._settling)
+        refreshed = set()
+        for venue, client in clients.items():
+            try:
+                balance = await client.fetch_balance()
+            except Exception as e:
+                logging.error(f"Balance refresh on {venue} failed: {e}")
+                continue
+            self.set_balances(venue, balance.get("free", {}))
+            refreshed.add(venue)
+        for hold in settled:
+            if hold[0] in refreshed:
+                self._settling.remove(hold)
+
+    def summary(self) -> dict:
+        return {"approved": self.approved, "rejected": dict(self.rejected), "open_exposure": self.open_exposure,
+                "in_flight": len(self._in_flight),
+                "reserved": {f"{venue}:{asset}": amount for (venue, asset), amount in self.reserved.items()}}
@@ -0,0 +1,245 @@
+"""Shard arbitrage scanning across worker processes.
+
+Usage:
+    python -m src.arbitrage.sharding --symbols BTC/USDT ETH/USDT SOL/USDT XRP/USDT --workers 4
+
+Each worker owns the feeds, books and scanner for its share of the
+symbols, so parsing and book maintenance run on separate cores. Workers
+only send back what the supervisor needs (opportunities and periodic
+stats), over one pipe per worker. Plans found while handling one batch
+of socket reads go out as a single message at the end of that loop
+iteration, so a burst costs one pipe write rather than one per plan.
+
+With ``--shared-books`` the workers only maintain books and publish them
+into shared memory (see ``shared_book``), and this process scans every
+symbol by reading those books in place.
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from multiprocessing.connection import Connection, wait
+from typing import Callable, Dict, List, Optional
+
+WORKER_STATS_INTERVAL = 5.0
+RESTART_DELAY = 1.0
+
+
+def shard_symbols(symbols: List[str], shards: int) -> List[List[str]]:
+    """Split symbols round robin into at most ``shards`` non-empty groups."""
+    shards = max(1, min(shards, len(symbols)))
+    return [symbols[i::shards] for i in range(shards)]
+
+
+def run_live_worker(shard: int, symbols: List[str], conn: Connection, threshold: float = 0.0) -> None:
+    """Worker entry point: full-depth Binance and Kraken books for ``symbols``."""
+    from .config import DEPTH_LEVELS, MAX_QUOTE_AGE, MAX_TRADE_SIZE, TAKER_FEES, make_feeds
+    from .evaluator import ArbitrageEvaluator
+    from .feed_engine import FeedEngine
+    from .profit import find_best_plan
+    from .spread_scanner import SpreadScanner
+
+    feeds = make_feeds(symbols)
+    engine = FeedEngine(feeds.values())
+    scanner = SpreadScanner(feeds.keys(), symbols, max_age=MAX_QUOTE_AGE)
+    engine.add_listener(scanner.update_quote)
+
+    def check(symbol):
+        return find_best_plan(scanner, lambda venue, s: feeds[venue].books[s], symbol, threshold=threshold,
+                              fees=TAKER_FEES, max_size=MAX_TRADE_SIZE, depth=DEPTH_LEVELS)
+
+    pending = []
+
+    def flush_plans():
+        conn.send(("plans", shard, list(pending)))
+        pending.clear()
+
+    def send_plan(plan):
+        if not pending:
+            asyncio.get_running_loop().call_soon(flush_plans)
+        pending.append(plan)
+
+    evaluator = ArbitrageEvaluator(check, on_opportunity=send_plan)
+    engine.add_listener(evaluator)
+
+    async def report_stats():
+        while True:
+            await asyncio.sleep(WORKER_STATS_INTERVAL)
+            conn.send(("stats", shard, evaluator.histogram.summary()))
+
+    async def main():
+        asyncio.get_running_loop().create_task(report_stats())
+        await engine.run()
+
+    asyncio.run(main())
+
+
+def run_feed_worker(shard: int, symbols: List[str], conn: Connection, store=None) -> None:
+    """Worker entry point for shared-book mode: keep books for ``symbols`` and publish them to ``store``."""
+    from .config import make_feeds
+    from .feed_engine import FeedEngine
+
+    feeds = make_feeds(symbols)
+    engine = FeedEngine(feeds.values())
+    engine.add_listener(store.listener(feeds))
+    asyncio.run(engine.run())
+
+
+class ShardSupervisor:
+    """Starts one process per shard and merges what they report.
+
+    ``worker`` is a top-level function ``worker(shard, symbols, conn, **kwargs)``
+    that sends ``(kind, shard, payload)`` tuples on ``conn``. Each plan in
+    a ``"plans"`` payload goes to ``on_opportunity``, ``"stats"`` payloads
+    are kept in ``stats``, and ``"ready"`` adds the shard to ``ready``. A
+    worker that dies is restarted with the same symbols.
+    """
+
+    def __init__(self, symbols: List[str], workers: Optional[int] = None,
+                 on_opportunity: Optional[Callable] = None, worker: Callable = run_live_worker,
+                 restart: bool = True, **worker_kwargs):
+        self.shards = shard_symbols(symbols, workers or os.cpu_count() or 1)
+        self.on_opportunity = on_opportunity
+        self.worker = worker
+        self.restart = restart
+        self.worker_kwargs = worker_kwargs
+        self.stats: Dict[int, dict] = {}
+        self.ready = set()
+        self.processes: Dict[int, multiprocessing.Process] = {}
+        self._conns: Dict[Connection, int] = {}
+        self._stopping = False
+
+    def _start(self, shard: int) -> None:
+        reader, writer = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(target=self.worker, args=(shard, self.shards[shard], writer),
+                                          kwargs=self.worker_kwargs, daemon=True, name=f"arbitrage-shard-{shard}")
+        process.start()
+        writer.close()  # the child holds the only write end, so EOF means it exited
+        self.processes[shard] = process
+        self._conns[reader] = shard
+        logging.info(f"Shard {shard} (pid {process.pid}) scanning {', '.join(self.shards[shard])}")
+
+    def start(self) -> None:
+        for shard in range(len(self.shards)):
+            self._start(shard)
+
+    def _handle(self, message) -> None:
+        kind, shard, payload = message
+        if kind == "plans":
+            if self.on_opportunity is not None:
+                for plan in payload:
+                    self.on_opportunity(plan)
+        elif kind == "stats":
+            self.stats[shard] = payload
+        elif kind == "ready":
+            self.ready.add(shard)
+
+    @property
+    def alive(self) -> bool:
+        """True while any worker is still connected."""
+        return bool(self._conns)
+
+    def poll(self, timeout: Optional[float] = None) -> None:
+        """Process whatever the workers have sent, waiting up to ``timeout`` for the first message."""
+        for conn in wait(list(self._conns), timeout):
+            shard = self._conns[conn]
+            try:
+                while True:
+                    self._handle(conn.recv())
+                    if not conn.poll():
+                        break
+            except EOFError:
+                del self._conns[conn]
+                conn.close()
+                self.processes[shard].join()
+                exitcode = self.processes[shard].exitcode
+                if self._stopping or not self.restart:
+                    continue
+                logging.warning(f"Shard {shard} exited with code {exitcode}; restarting")
+                time.sleep(RESTART_DELAY)
+                self._start(shard)
+
+    def run(self) -> None:
+        self.start()
+        try:
+            while self.alive:
+                self.poll()
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        self._stopping = True
+        for process in self.processes.values():
+            if process.is_alive():
+                process.terminate()
+        for process in self.processes.values():
+            process.join()
+        for conn in self._conns:
+            conn.close()
+        self._conns.clear()
+
+
+def run_shared(symbols: List[str], workers: Optional[int] = None, on_opportunity: Optional[Callable] = None,
+               threshold: float = 0.0, poll_interval: float = 0.001) -> None:
+    """Feed workers write shared-memory books; this process scans them without any message passing."""
+    from .config import DEPTH_LEVELS, MAX_QUOTE_AGE, MAX_TRADE_SIZE, TAKER_FEES
+    from .evaluator import ArbitrageEvaluator
+    from .profit import find_best_plan
+    from .shared_book import SharedBookStore
+    from .spread_scanner import SpreadScanner
+
+    store = SharedBookStore(["binance", "kraken"], symbols, depth=DEPTH_LEVELS)
+    scanner = SpreadScanner(store.venues, symbols, max_age=MAX_QUOTE_AGE)
+
+    def check(symbol):
+        return find_best_plan(scanner, store.book, symbol, threshold=threshold, fees=TAKER_FEES,
+                              max_size=MAX_TRADE_SIZE, depth=DEPTH_LEVELS)
+
+    evaluator = ArbitrageEvaluator(check, on_opportunity=on_opportunity)
+    supervisor = ShardSupervisor(symbols, workers, worker=run_feed_worker, store=store)
+    supervisor.start()
+    try:
+        while True:
+            supervisor.poll(poll_interval)
+            latest = {}
+            for venue, symbol in store.changed():
+                quote = store.book(venue, symbol).to_quote()
+                if quote is not None:
+                    scanner.update_quote(quote)
+                    latest[symbol] = quote
+            for quote in latest.values():
+                evaluator(quote)
+    finally:
+        supervisor.stop()
+        store.close()
+        store.unlink()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Sharded arbitrage scanner")
+    parser.add_argument("--symbols", nargs="+", required=True, help="Symbols to scan, e.g. BTC/USDT ETH/USDT.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    parser.add_argument("--threshold", type=float, default=0.0, help="Minimum relative spread.")
+    parser.add_argument("--shared-books", action="store_true",
+                        help="Workers publish books to shared memory and this process scans them.")
+    args = parser.parse_args(argv)
+
+    def on_opportunity(plan):
+        o = plan.opportunity
+        print(f"💰 {o.symbol}: buy {plan.size} on {o.buy_venue} at {plan.buy_vwap:.2f}, sell on {o.sell_venue} "
+              f"at {plan.sell_vwap:.2f} (net {plan.net_profit:.2f} after fees)")
+
+    try:
+        if args.shared_books:
+            run_shared(args.symbols, args.workers, on_opportunity, threshold=args.threshold)
+        else:
+            ShardSupervisor(args.symbols, args.workers, on_opportunity, threshold=args.threshold).run()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
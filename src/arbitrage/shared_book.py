@@ -0,0 +1,194 @@
+"""Order books in shared memory, written by feed processes and read in place by strategies.
+
+Each (venue, symbol) slot holds the best ``depth`` bids and asks as fixed
+float arrays plus a sequence counter used as a seqlock: the single writer
+makes it odd before touching the slot and even again afterwards, and a
+reader retries if the counter was odd or changed while it copied. Nothing
+is pickled or sent through a pipe; a reader copies at most ``depth``
+levels per side into buffers it reuses.
+
+The protocol relies on the writer's stores becoming visible in program
+order, which holds on x86-64. Give each slot exactly one writer process.
+"""
+import math
+import os
+import sys
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .feed_engine import Quote
+from .order_book import L2Book
+
+DEFAULT_DEPTH = 50
+MAX_READ_RETRIES = 100_000
+
+# Per-slot metadata columns
+_RECV_TS, _EXCHANGE_TS, _N_BIDS, _N_ASKS = range(4)
+
+
+def _layout(slots: int, depth: int) -> Tuple[int, int, int]:
+    """Byte offsets of the meta and level arrays, and the total size."""
+    meta = slots * 8
+    levels = meta + slots * 4 * 8
+    return meta, levels, levels + slots * 2 * depth * 2 * 8
+
+
+class SharedBookStore:
+    """Fixed-layout shared-memory books for every (venue, symbol) pair.
+
+    Create it once in the parent with ``SharedBookStore(venues, symbols)``
+    and hand it to child processes; pickling only carries the segment name
+    and layout, and the child attaches to the same memory. The creator
+    should ``unlink`` it when every process is done.
+    """
+
+    def __init__(self, venues: Iterable[str], symbols: Iterable[str], depth: int = DEFAULT_DEPTH,
+                 name: Optional[str] = None, create: bool = True):
+        self.venues = list(venues)
+        self.symbols = list(symbols)
+        self.depth = depth
+        self.keys: List[Tuple[str, str]] = [(v, s) for v in self.venues for s in self.symbols]
+        self._slot: Dict[Tuple[str, str], int] = {key: i for i, key in enumerate(self.keys)}
+        meta, levels, size = _layout(len(self.keys), depth)
+        if create:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            self.shm.buf[:size] = bytes(size)
+        else:
+            self.shm = self._attach(name)
+            if self.shm.size < size:
+                raise ValueError(f"Shared book segment {name} is {self.shm.size} bytes, expected {size}")
+        buf = self.shm.buf
+        self.seq = np.ndarray((len(self.keys),), dtype=np.int64, buffer=buf)
+        self.meta = np.ndarray((len(self.keys), 4), dtype=np.float64, buffer=buf, offset=meta)
+        self.levels = np.ndarray((len(self.keys), 2, depth, 2), dtype=np.float64, buffer=buf, offset=levels)
+        self._seen = np.zeros(len(self.keys), dtype=np.int64)
+        self._books: Dict[Tuple[str, str], SharedBook] = {}
+
+    @staticmethod
+    def _attach(name: str) -> shared_memory.SharedMemory:
+        # Child processes share the creator's resource tracker, so attaching
+        # there needs no special handling; 3.13+ can skip tracking outright.
+        if sys.version_info >= (3, 13):
+            return shared_memory.SharedMemory(name=name, track=False)
+        return shared_memory.SharedMemory(name=name)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def __getstate__(self):
+        return {"venues": self.venues, "symbols": self.symbols, "depth": self.depth, "name": self.name}
+
+    def __setstate__(self, state):
+        self.__init__(state["venues"], state["symbols"], state["depth"], name=state["name"], create=False)
+
+    def slot(self, venue: str, symbol: str) -> int:
+        return self._slot[(venue, symbol)]
+
+    # Writer side
+
+    def write(self, venue: str, symbol: str, bids, asks, recv_ts: float,
+              exchange_ts: Optional[float] = None) -> None:
+        """Publish up to ``depth`` (price, qty) levels per side for one book."""
+        i = self._slot[(venue, symbol)]
+        n_bids, n_asks = min(len(bids), self.depth), min(len(asks), self.depth)
+        self.seq[i] += 1
+        if n_bids:
+            self.levels[i, 0, :n_bids] = bids[:n_bids]
+        if n_asks:
+            self.levels[i, 1, :n_asks] = asks[:n_asks]
+        self.meta[i] = (recv_ts, math.nan if exchange_ts is None else exchange_ts, n_bids, n_asks)
+        self.seq[i] += 1
+
+    def publish(self, book: L2Book) -> None:
+        bids, asks = book.top(self.depth)
+        self.write(book.venue, book.symbol, bids, asks, book.recv_ts, book.exchange_ts)
+
+    def listener(self, feeds: Dict[str, object]):
+        """``FeedEngine`` listener publishing the book behind every quote from ``feeds``."""
+        def publish(quote: Quote) -> None:
+            self.publish(feeds[quote.venue].books[quote.symbol])
+        return publish
+
+    # Reader side
+
+    def book(self, venue: str, symbol: str) -> "SharedBook":
+        """Read-only view of one slot with the ``L2Book`` methods the strategies use."""
+        key = (venue, symbol)
+        view = self._books.get(key)
+        if view is None:
+            view = self._books[key] = SharedBook(self, venue, symbol)
+        return view
+
+    def changed(self) -> List[Tuple[str, str]]:
+        """Books written since the previous call (one vectorised compare of the counters)."""
+        seq = self.seq.copy()
+        seq &= ~1  # a write in progress shows up on the next call
+        updated = np.flatnonzero(seq != self._seen)
+        self._seen = seq
+        return [self.keys[i] for i in updated]
+
+    def close(self) -> None:
+        self._books.clear()
+        del self.seq, self.meta, self.levels
+        self.shm.close()
+
+    def unlink(self) -> None:
+        self.shm.unlink()
+
+
+class SharedBook:
+    """Consistent reads of one shared slot, copied into buffers owned by this view.
+
+    Arrays returned by ``depth_arrays`` are valid until the next read
+    through the same view.
+    """
+
+    def __init__(self, store: SharedBookStore, venue: str, symbol: str):
+        self.store = store
+        self.venue = venue
+        self.symbol = symbol
+        self.recv_ts = 0.0
+        self.exchange_ts: Optional[float] = None
+        self._i = store.slot(venue, symbol)
+        self._levels = np.empty((2, store.depth, 2))
+        self._meta = np.empty(4)
+        self.version = 0
+
+    def read(self) -> int:
+        """Copy the slot under the seqlock; returns its version (0 if never written)."""
+        seq, i = self.store.seq, self._i
+        for _ in range(MAX_READ_RETRIES):
+            before = int(seq[i])
+            if before & 1:
+                os.sched_yield()
+                continue
+            np.copyto(self._meta, self.store.meta[i])
+            np.copyto(self._levels, self.store.levels[i])
+            if int(seq[i]) == before:
+                break
+        else:
+            raise RuntimeError(f"Shared book {self.venue} {self.symbol} is stuck mid-write")
+        self.version = before // 2
+        self.recv_ts = float(self._meta[_RECV_TS])
+        exchange_ts = float(self._meta[_EXCHANGE_TS])
+        self.exchange_ts = None if math.isnan(exchange_ts) else exchange_ts
+        return self.version
+
+    def depth_arrays(self, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Best ``n`` bids and asks as ``(levels, 2)`` arrays, like ``L2Book.depth_arrays``."""
+        self.read()
+        n_bids = min(n, int(self._meta[_N_BIDS]))
+        n_asks = min(n, int(self._meta[_N_ASKS]))
+        return self._levels[0, :n_bids], self._levels[1, :n_asks]
+
+    def to_quote(self) -> Optional[Quote]:
+        self.read()
+        if not self._meta[_N_BIDS] or not self._meta[_N_ASKS]:
+            return None
+        (bid, bid_size), (ask, ask_size) = self._levels[0, 0], self._levels[1, 0]
+        return Quote(venue=self.venue, symbol=self.symbol, bid=float(bid), ask=float(ask),
+                     bid_size=float(bid_size), ask_size=float(ask_size), recv_ts=self.recv_ts,
+                     exchange_ts=self.exchange_ts)
@@ -0,0 +1,89 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+from .exchange_registry import ExchangeRegistry, get_registry
+
+
+class SnapshotService:
+    """Cached tickers and order-book snapshots for many symbols on one venue.
+
+    Every ticker comes from a single bulk ``fetch_tickers`` call, so
+    scanning hundreds of pairs costs one request per ``ticker_ttl``. Depth
+    requests run concurrently, up to ``max_concurrency`` at a time. They
+    are paced by the registry's shared weight budget, and concurrent callers
+    asking for the same book share one in-flight request.
+    """
+
+    def __init__(self, venue: str = "binance", ticker_ttl: float = 1.0, book_ttl: float = 1.0,
+                 max_concurrency: int = 8, registry: Optional[ExchangeRegistry] = None):
+        self.venue = venue
+        self.ticker_ttl = ticker_ttl
+        self.book_ttl = book_ttl
+        self.max_concurrency = max_concurrency
+        self.registry = registry or get_registry()
+        self._tickers: Dict[str, dict] = {}
+        self._tickers_at = 0.0
+        self._tickers_task: Optional[asyncio.Task] = None
+        self._books: Dict[Tuple[str, int], Tuple[float, dict]] = {}
+        self._inflight: Dict[Tuple[str, int], asyncio.Task] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def client(self):
+        return self.registry.client(self.venue, async_=True)
+
+    async def _fetch_tickers(self) -> Dict[str, dict]:
+        tickers = await self.client.fetch_tickers()
+        self._tickers, self._tickers_at = tickers, time.monotonic()
+        return tickers
+
+    async def tickers(self, symbols: Optional[Iterable[str]] = None) -> Dict[str, dict]:
+        """All tickers (or just ``symbols``) from at most one bulk request per TTL."""
+        if time.monotonic() - self._tickers_at >= self.ticker_ttl:
+            if self._tickers_task is None or self._tickers_task.done():
+                self._tickers_task = asyncio.get_running_loop().create_task(self._fetch_tickers())
+            await self._tickers_task
+        if symbols is None:
+            return self._tickers
+        return {s: self._tickers[s] for s in symbols if s in self._tickers}
+
+    async def ticker(self, symbol: str) -> Optional[dict]:
+        return (await self.tickers([symbol])).get(symbol)
+
+    async def _fetch_book(self, symbol: str, limit: int) -> dict:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            book = await self.client.fetch_order_book(symbol, limit)
+        self._books[(symbol, limit)] = (time.monotonic(), book)
+        return book
+
+    async def order_book(self, symbol: str, limit: int = 100) -> dict:
+        key = (symbol, limit)
+        cached = self._books.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self.book_ttl:
+            return cached[1]
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(self._fetch_book(symbol, limit))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await task
+
+    async def order_books(self, symbols: Iterable[str], limit: int = 100) -> Dict[str, dict]:
+        """Books for every symbol, fetched concurrently; failed symbols are logged and left out."""
+        symbols = list(symbols)
+        results = await asyncio.gather(*(self.order_book(s, limit) for s in symbols), return_exceptions=True)
+        books = {}
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, Exception):
+                logging.error(f"Order book for {symbol} on {self.venue} failed: {result}")
+            else:
+                books[symbol] = result
+        return books
+
+    async def close(self) -> None:
+        # ccxt reopens its HTTP session on the next request, so this is safe for a shared client
+        await self.client.close()
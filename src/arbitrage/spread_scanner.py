@@ -0,0 +1,140 @@
+import time
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+from .feed_engine import Quote
+
+
+@dataclass(frozen=True)
+class Opportunity:
+    """Buy ``symbol`` at ``buy_price`` on one venue and sell at ``sell_price`` on another."""
+    symbol: str
+    buy_venue: str
+    buy_price: float
+    sell_venue: str
+    sell_price: float
+    spread: float  # sell_price / buy_price - 1
+
+    @property
+    def spread_bps(self) -> float:
+        return self.spread * 10_000
+
+    @property
+    def profit_per_unit(self) -> float:
+        return self.sell_price - self.buy_price
+
+
+class SpreadScanner:
+    """Best bid/ask for every (venue, symbol) kept in NumPy arrays.
+
+    ``spread_matrix`` computes ``bid[sell] / ask[buy] - 1`` for every pair
+    of venues in one broadcast, so evaluating a symbol costs the same NumPy
+    call whether there are 2 venues or 20, and a full scan over all symbols
+    never loops in Python.
+
+    With ``max_age`` set, a quote received more than ``max_age`` seconds
+    ago is treated as missing, so a venue that went quiet after a silent
+    disconnect is never compared against a fresh one.
+    """
+
+    def __init__(self, venues: Iterable[str], symbols: Iterable[str] = (), max_age: Optional[float] = None):
+        self.venues = list(venues)
+        self.symbols: List[str] = []
+        self._venue_index = {v: i for i, v in enumerate(self.venues)}
+        self._symbol_index = {}
+        self.bids = np.full((len(self.venues), 0), np.nan)
+        self.asks = np.full((len(self.venues), 0), np.nan)
+        self.recv_ts = np.zeros((len(self.venues), 0))
+        self.max_age = max_age
+        self._off_diagonal = ~np.eye(len(self.venues), dtype=bool)
+        for symbol in symbols:
+            self.add_symbol(symbol)
+
+    def add_symbol(self, symbol: str) -> int:
+        if symbol in self._symbol_index:
+            return self._symbol_index[symbol]
+        index = len(self.symbols)
+        self.symbols.append(symbol)
+        self._symbol_index[symbol] = index
+        column = np.full((len(self.venues), 1), np.nan)
+        self.bids = np.hstack([self.bids, column])
+        self.asks = np.hstack([self.asks, column])
+        self.recv_ts = np.hstack([self.recv_ts, np.zeros((len(self.venues), 1))])
+        return index
+
+    def update(self, venue: str, symbol: str, bid: Optional[float], ask: Optional[float],
+               recv_ts: Optional[float] = None) -> None:
+        v = self._venue_index.get(venue)
+        if v is None:
+            return
+        s = self._symbol_index.get(symbol)
+        if s is None:
+            s = self.add_symbol(symbol)
+        self.bids[v, s] = np.nan if bid is None else bid
+        self.asks[v, s] = np.nan if ask is None else ask
+        self.recv_ts[v, s] = time.time() if recv_ts is None else recv_ts
+
+    def update_quote(self, quote: Quote) -> None:
+        self.update(quote.venue, quote.symbol, quote.bid, quote.ask, quote.recv_ts)
+
+    def clear(self, venue: str, symbol: Optional[str] = None) -> None:
+        """Forget quotes for a venue (e.g. after a disconnect)."""
+        v = self._venue_index[venue]
+        if symbol is None:
+            self.bids[v, :] = np.nan
+            self.asks[v, :] = np.nan
+        elif symbol in self._symbol_index:
+            s = self._symbol_index[symbol]
+            self.bids[v, s] = np.nan
+            self.asks[v, s] = np.nan
+
+    def spread_matrix(self, symbol: Optional[str] = None, now: Optional[float] = None) -> np.ndarray:
+        """Relative spreads indexed ``[buy_venue, sell_venue(, symbol)]``; NaN where unquoted or stale."""
+        if symbol is None:
+            bids, asks, recv_ts = self.bids, self.asks, self.recv_ts
+        else:
+            s = self._symbol_index[symbol]
+            bids, asks, recv_ts = self.bids[:, s], self.asks[:, s], self.recv_ts[:, s]
+        if self.max_age is not None:
+            fresh = (time.time() if now is None else now) - recv_ts <= self.max_age
+            bids = np.where(fresh, bids, np.nan)
+            asks = np.where(fresh, asks, np.nan)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return bids[None, :] / asks[:, None] - 1.0
+
+    def scan(self, threshold: float = 0.0, symbol: Optional[str] = None,
+             limit: Optional[int] = None) -> List[Opportunity]:
+        """Every cross-venue opportunity with spread above ``threshold``, best first.
+
+        With ``symbol`` only that column is evaluated, which is what a
+        per-update check needs; without it all symbols are scanned at once.
+        ``limit`` keeps only the best N.
+        """
+        if symbol is not None and symbol not in self._symbol_index:
+            return []
+        spreads = self.spread_matrix(symbol)
+        mask = spreads > threshold
+        mask &= self._off_diagonal if symbol is not None else self._off_diagonal[:, :, None]
+        hits = np.nonzero(mask)
+        if not hits[0].size:
+            return []
+        values = spreads[hits]
+        if limit is not None and limit < values.size:
+            top = np.argpartition(-values, limit)[:limit]
+            order = top[np.argsort(-values[top])]
+        else:
+            order = np.argsort(-values)
+        buy, sell = hits[0][order], hits[1][order]
+        if symbol is not None:
+            cols = np.full(order.size, self._symbol_index[symbol])
+        else:
+            cols = hits[2][order]
+        buy_prices = self.asks[buy, cols].tolist()
+        sell_prices = self.bids[sell, cols].tolist()
+        return [
+            Opportunity(self.symbols[c], self.venues[b], bp, self.venues[s], sp, v)
+            for b, s, c, bp, sp, v in zip(buy.tolist(), sell.tolist(), cols.tolist(),
+                                          buy_prices, sell_prices, values[order].tolist())
+        ]
@@ -0,0 +1,158 @@
+import asyncio
+import json
+import mmap
+import struct
+import time
+from pathlib import Path
+from typing import Dict, Iterator, NamedTuple, Optional, Union
+
+from .feed_engine import FeedEngine, VenueFeed
+
+MAGIC = b"CPTICK01"
+
+# Record header: receive time (ns since epoch), channel id, record kind, payload length
+RECORD_HEADER = struct.Struct("<qHBI")
+
+KIND_MESSAGE = 0  # raw WebSocket message as received
+KIND_SNAPSHOT = 1  # JSON {"symbol": ..., "snapshot": ...} used to seed a book
+KIND_CHANNEL = 2  # declares the channel name for a channel id
+
+
+def channel_name(feed: VenueFeed) -> str:
+    """Stable name used to match recorded messages back to a feed on replay."""
+    return f"{feed.venue}:{type(feed).__name__}"
+
+
+class TickRecord(NamedTuple):
+    recv_ts: float
+    channel: str
+    kind: int
+    payload: bytes
+
+
+class TickRecorder:
+    """Appends raw feed messages with receive timestamps to a binary log.
+
+    Each record is a fixed 15-byte header followed by the message bytes,
+    so a log can be memory-mapped and walked without parsing any JSON.
+    """
+
+    def __init__(self, path: Union[str, Path], buffer_size: int = 1 << 20):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        is_new = not self.path.exists() or self.path.stat().st_size == 0
+        self._file = open(self.path, "ab", buffering=buffer_size)
+        if is_new:
+            self._file.write(MAGIC)
+        self._channels: Dict[str, int] = {}
+        self.records = 0  # every record written, including channel and snapshot records
+        self.messages = 0
+
+    def _channel_id(self, name: str, recv_ns: int) -> int:
+        channel = self._channels.get(name)
+        if channel is None:
+            channel = len(self._channels)
+            self._channels[name] = channel
+            self._write(recv_ns, channel, KIND_CHANNEL, name.encode())
+        return channel
+
+    def _write(self, recv_ns: int, channel: int, kind: int, payload: bytes) -> None:
+        self._file.write(RECORD_HEADER.pack(recv_ns, channel, kind, len(payload)))
+        self._file.write(payload)
+        self.records += 1
+
+    def record(self, feed: VenueFeed, message: Union[str, bytes], recv_ts: float) -> None:
+        recv_ns = int(recv_ts * 1e9)
+        payload = message.encode() if isinstance(message, str) else message
+        self._write(recv_ns, self._channel_id(channel_name(feed), recv_ns), KIND_MESSAGE, payload)
+        self.messages += 1
+
+    def record_snapshot(self, feed: VenueFeed, symbol: str, snapshot: dict) -> None:
+        recv_ns = time.time_ns()
+        payload = json.dumps({"symbol": symbol, "snapshot": snapshot}).encode()
+        self._write(recv_ns, self._channel_id(channel_name(feed), recv_ns), KIND_SNAPSHOT, payload)
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class TickLog:
+    """Memory-mapped reader for a ``TickRecorder`` log."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+
+    def __iter__(self) -> Iterator[TickRecord]:
+        with open(self.path, "rb") as f:
+            if self.path.stat().st_size <= len(MAGIC):
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if data[:len(MAGIC)] != MAGIC:
+                    raise ValueError(f"{self.path} is not a tick log")
+                channels: Dict[int, str] = {}
+                offset, end, header_size = len(MAGIC), len(data), RECORD_HEADER.size
+                while offset + header_size <= end:
+                    recv_ns, channel, kind, length = RECORD_HEADER.unpack_from(data, offset)
+                    offset += header_size
+                    if offset + length > end:
+                        break  # truncated final record from an interrupted writer
+                    payload = data[offset:offset + length]
+                    offset += length
+                    if kind == KIND_CHANNEL:
+                        channels[channel] = payload.decode()
+                        continue
+                    yield TickRecord(recv_ns / 1e9, channels.get(channel, ""), kind, payload)
+
+
+class ReplayEngine:
+    """Feeds a recorded log back through a ``FeedEngine``'s own feed handlers.
+
+    ``speed=None`` replays as fast as possible; ``speed=1.0`` reproduces the
+    recorded pacing and larger values compress it. With ``restamp`` each
+    message is stamped with the replay-time receive clock, so latency
+    measured downstream reflects processing time rather than log age.
+    """
+
+    def __init__(self, engine: FeedEngine, path: Union[str, Path]):
+        self.engine = engine
+        self.log = TickLog(path)
+
+    async def replay(self, speed: Optional[float] = None, restamp: bool = False) -> dict:
+        feeds = {channel_name(feed): feed for feed in self.engine.feeds}
+        for feed in feeds.values():
+            # Books are seeded from recorded snapshots, never from the network
+            feed.fetch_snapshots = False
+        messages = skipped = 0
+        first_ts = None
+        start = time.perf_counter()
+        for record in self.log:
+            feed = feeds.get(record.channel)
+            if feed is None:
+                skipped += 1
+                continue
+            if speed and first_ts is None:
+                first_ts = record.recv_ts
+            if speed:
+                delay = (record.recv_ts - first_ts) / speed - (time.perf_counter() - start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            if record.kind == KIND_SNAPSHOT:
+                data = json.loads(record.payload)
+                feed.apply_snapshot(data["symbol"], data["snapshot"])
+            elif record.kind == KIND_MESSAGE:
+                recv_ts = time.time() if restamp else record.recv_ts
+                self.engine.dispatch(feed, record.payload, recv_ts)
+                messages += 1
+        elapsed = time.perf_counter() - start
+        return {
+            "messages": messages,
+            "skipped": skipped,
+            "elapsed_s": elapsed,
+            "messages_per_s": messages / elapsed if elapsed > 0 else 0.0,
+        }
+
+    def run(self, speed: Optional[float] = None, restamp: bool = False) -> dict:
+        return asyncio.run(self.replay(speed, restamp))
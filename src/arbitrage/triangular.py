@@ -0,0 +1,176 @@
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class CycleOpportunity:
+    """A conversion cycle that ends with more of the start asset than it began with."""
+    assets: Tuple[str, ...]  # start asset repeated at the end, e.g. ("USDT", "BTC", "ETH", "USDT")
+    legs: Tuple[Tuple[str, str], ...]  # (symbol, side) for each conversion
+    profit: float  # relative, after fees
+
+    @property
+    def profit_bps(self) -> float:
+        return self.profit * 10_000
+
+
+class TriangularArbitrageDetector:
+    """Asset graph whose edges are ``-log(rate)`` conversions from best bid/ask.
+
+    Every listed pair contributes two edges: selling the base at the bid
+    and buying it at the ask, both net of ``fee``. A cycle with negative
+    total weight is a profitable conversion loop.
+
+    The graph is updated in place: a price change rewrites two weights, and
+    the directed triangles through those edges are indexed once, when the
+    pair is added, so ``update`` only sums the handful of triangles the new
+    price can affect. ``find_negative_cycle`` runs a vectorized
+    Bellman-Ford over the whole edge set for longer loops.
+    """
+
+    def __init__(self, fee: float = 0.001, min_profit: float = 0.0):
+        self.fee = fee
+        self.min_profit = min_profit
+        self.assets: List[str] = []
+        self._asset_index: Dict[str, int] = {}
+        self._pairs: Dict[str, Tuple[int, int]] = {}  # symbol -> (sell edge, buy edge)
+        self._out: List[Dict[int, int]] = []  # asset -> {neighbour asset: edge id}
+        self._edge_legs: List[Tuple[str, str]] = []
+        self._n_edges = 0
+        self._src = np.zeros(64, dtype=np.int64)
+        self._dst = np.zeros(64, dtype=np.int64)
+        self.weights = np.full(64, np.inf)
+        self._n_triangles = 0
+        self._triangles = np.zeros((64, 3), dtype=np.int64)
+        self._edge_triangles: List[List[int]] = []
+        self._pair_triangles: Dict[str, np.ndarray] = {}
+
+    @property
+    def _log_fee(self) -> float:
+        return -math.log1p(-self.fee)
+
+    def _asset(self, name: str) -> int:
+        index = self._asset_index.get(name)
+        if index is None:
+            index = len(self.assets)
+            self.assets.append(name)
+            self._asset_index[name] = index
+            self._out.append({})
+        return index
+
+    def _add_edge(self, u: int, v: int, leg: Tuple[str, str]) -> int:
+        edge = self._n_edges
+        if edge == self._src.size:
+            self._src = np.concatenate([self._src, np.zeros_like(self._src)])
+            self._dst = np.concatenate([self._dst, np.zeros_like(self._dst)])
+            self.weights = np.concatenate([self.weights, np.full(self.weights.size, np.inf)])
+        self._src[edge], self._dst[edge] = u, v
+        self._out[u][v] = edge
+        self._edge_legs.append(leg)
+        self._edge_triangles.append([])
+        self._n_edges += 1
+        return edge
+
+    def _add_triangle(self, edges: Tuple[int, int, int]) -> None:
+        if self._n_triangles == self._triangles.shape[0]:
+            self._triangles = np.concatenate([self._triangles, np.zeros_like(self._triangles)])
+        self._triangles[self._n_triangles] = edges
+        for edge in edges:
+            self._edge_triangles[edge].append(self._n_triangles)
+        self._n_triangles += 1
+
+    def add_pair(self, symbol: str) -> None:
+        """Register a ``BASE/QUOTE`` pair and index the triangles it closes."""
+        if symbol in self._pairs:
+            return
+        base_name, quote_name = symbol.split("/")
+        base, quote = self._asset(base_name), self._asset(quote_name)
+        sell = self._add_edge(base, quote, (symbol, "sell"))
+        buy = self._add_edge(quote, base, (symbol, "buy"))
+        self._pairs[symbol] = (sell, buy)
+        for edge, u, v in ((sell, base, quote), (buy, quote, base)):
+            for w, second in self._out[v].items():
+                third = self._out[w].get(u)
+                if w != u and third is not None:
+                    self._add_triangle((edge, second, third))
+        self._pair_triangles.clear()
+
+    def update(self, symbol: str, bid: Optional[float], ask: Optional[float]) -> List[CycleOpportunity]:
+        """Apply a new best bid/ask and return the profitable triangles it creates."""
+        if symbol not in self._pairs:
+            self.add_pair(symbol)
+        sell, buy = self._pairs[symbol]
+        # Selling 1 base yields bid quote; buying with 1 quote yields 1/ask base
+        self.weights[sell] = -math.log(bid) + self._log_fee if bid else np.inf
+        self.weights[buy] = math.log(ask) + self._log_fee if ask else np.inf
+        triangles = self._pair_triangles.get(symbol)
+        if triangles is None:
+            triangles = np.array(self._edge_triangles[sell] + self._edge_triangles[buy], dtype=np.int64)
+            self._pair_triangles[symbol] = triangles
+        if not triangles.size:
+            return []
+        totals = self.weights[self._triangles[triangles]].sum(axis=1)
+        hits = np.nonzero(totals < -math.log1p(self.min_profit))[0]
+        return sorted(
+            (self._cycle(self._triangles[triangles[i]].tolist(), totals[i]) for i in hits),
+            key=lambda c: -c.profit,
+        )
+
+    def scan_triangles(self) -> List[CycleOpportunity]:
+        """Check every indexed triangle at once."""
+        if not self._n_triangles:
+            return []
+        triangles = self._triangles[:self._n_triangles]
+        totals = self.weights[triangles].sum(axis=1)
+        hits = np.nonzero(totals < -math.log1p(self.min_profit))[0]
+        return sorted((self._cycle(triangles[i].tolist(), totals[i]) for i in hits), key=lambda c: -c.profit)
+
+    def find_negative_cycle(self) -> Optional[CycleOpportunity]:
+        """Vectorized Bellman-Ford from a virtual source; returns one negative cycle if any."""
+        n_assets, n = len(self.assets), self._n_edges
+        if not n:
+            return None
+        src, dst, weights = self._src[:n], self._dst[:n], self.weights[:n]
+        live = np.isfinite(weights)
+        src, dst, weights, edge_ids = src[live], dst[live], weights[live], np.nonzero(live)[0]
+        dist = np.zeros(n_assets)
+        pred = np.full(n_assets, -1, dtype=np.int64)
+        changed = np.empty(0, dtype=np.int64)
+        for _ in range(n_assets):
+            candidate = dist[src] + weights
+            improved = np.nonzero(candidate < dist[dst] - 1e-12)[0]
+            if not improved.size:
+                return None
+            # Keep the best improving edge per destination
+            order = improved[np.lexsort((candidate[improved], dst[improved]))]
+            _, first = np.unique(dst[order], return_index=True)
+            best = order[first]
+            dist[dst[best]] = candidate[best]
+            pred[dst[best]] = edge_ids[best]
+            changed = dst[best]
+        # Still relaxing after |V| rounds: walk predecessors back into the cycle
+        node = int(changed[0])
+        for _ in range(n_assets):
+            if pred[node] < 0:
+                return None
+            node = int(self._src[pred[node]])
+        cycle_edges, current = [], node
+        while len(cycle_edges) <= n_assets:
+            edge = int(pred[current])
+            cycle_edges.append(edge)
+            current = int(self._src[edge])
+            if current == node:
+                break
+        cycle_edges.reverse()
+        return self._cycle(cycle_edges, float(self.weights[cycle_edges].sum()))
+
+    def _cycle(self, edges: List[int], total_weight: float) -> CycleOpportunity:
+        assets = [self.assets[self._src[e]] for e in edges] + [self.assets[self._src[edges[0]]]]
+        return CycleOpportunity(
+            assets=tuple(assets),
+            legs=tuple(self._edge_legs[e] for e in edges),
+            profit=math.expm1(-float(total_weight)),
+        )
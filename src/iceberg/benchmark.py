@@ -0,0 +1,106 @@
+"""Benchmark the batch iceberg feature kernel against the per-snapshot pandas path.
+
+Usage:
+    python -m src.iceberg.benchmark --snapshots 2000 --depth 100
+
+Snapshots are synthetic Binance-style depth responses (string prices and
+quantities, some books shorter than ``depth``). The pandas reference is
+the original ``extract_features`` implementation; both paths are checked
+for identical features before timing.
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from .features import FEATURE_NAMES, extract_features_batch, stack_order_books
+
+
+def extract_features_pandas(order_book):
+    """Reference implementation: two DataFrames per snapshot, as ``extract_features`` used to do."""
+    bids = pd.DataFrame(order_book['bids'], columns=['price', 'quantity'], dtype=float)
+    asks = pd.DataFrame(order_book['asks'], columns=['price', 'quantity'], dtype=float)
+    features = {
+        "avg_bid_price": bids["price"].mean(),
+        "avg_ask_price": asks["price"].mean(),
+        "avg_bid_size": bids["quantity"].mean(),
+        "avg_ask_size": asks["quantity"].mean(),
+        "bid_ask_spread": asks["price"].min() - bids["price"].max(),
+        "bid_size_std": bids["quantity"].std(),
+        "ask_size_std": asks["quantity"].std(),
+        "bid_price_std": bids["price"].std(),
+        "ask_price_std": asks["price"].std(),
+        "bid_volume": bids["quantity"].sum(),
+        "ask_volume": asks["quantity"].sum(),
+        "volume_imbalance": (bids["quantity"].sum() - asks["quantity"].sum()) / (bids["quantity"].sum() + asks["quantity"].sum()),
+        "bid_levels": len(bids),
+        "ask_levels": len(asks),
+        "level_imbalance": (len(bids) - len(asks)) / (len(bids) + len(asks)),
+        "large_bid_orders": len(bids[bids["quantity"] > bids["quantity"].mean() * 2]),
+        "large_ask_orders": len(asks[asks["quantity"] > asks["quantity"].mean() * 2])
+    }
+    return list(features.values())
+
+
+def synthetic_order_books(count, depth, seed=7):
+    rng = np.random.default_rng(seed)
+    books = []
+    for _ in range(count):
+        mid = 60000 + rng.normal(0, 500)
+        n_bids, n_asks = depth - rng.integers(0, 3, size=2)
+        bid_prices = mid - 0.01 - np.cumsum(rng.exponential(0.5, n_bids))
+        ask_prices = mid + 0.01 + np.cumsum(rng.exponential(0.5, n_asks))
+        books.append({
+            "bids": [[f"{p:.2f}", f"{q:.5f}"] for p, q in zip(bid_prices, rng.lognormal(-2, 1.5, n_bids))],
+            "asks": [[f"{p:.2f}", f"{q:.5f}"] for p, q in zip(ask_prices, rng.lognormal(-2, 1.5, n_asks))],
+        })
+    return books
+
+
+def run(count, depth):
+    books = synthetic_order_books(count, depth)
+
+    start = time.perf_counter()
+    reference = np.array([extract_features_pandas(book) for book in books], dtype=float)
+    pandas_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    bids, asks = stack_order_books(books, depth)
+    stack_s = time.perf_counter() - start
+    start = time.perf_counter()
+    batch = extract_features_batch(bids, asks)
+    kernel_s = time.perf_counter() - start
+
+    mismatched = [name for i, name in enumerate(FEATURE_NAMES)
+                  if not np.allclose(batch[:, i], reference[:, i], rtol=1e-9, atol=0, equal_nan=True)]
+    return {
+        "snapshots": count,
+        "depth": depth,
+        "pandas_us_per_snapshot": pandas_s / count * 1e6,
+        "stack_us_per_snapshot": stack_s / count * 1e6,
+        "kernel_us_per_snapshot": kernel_s / count * 1e6,
+        "kernel_speedup": pandas_s / kernel_s if kernel_s > 0 else float("inf"),
+        "end_to_end_speedup": pandas_s / (stack_s + kernel_s),
+        "mismatched_features": mismatched,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Iceberg feature extraction benchmark")
+    parser.add_argument("--snapshots", type=int, default=2000)
+    parser.add_argument("--depth", type=int, default=100)
+    args = parser.parse_args(argv)
+    result = run(args.snapshots, args.depth)
+    print(f"{result['snapshots']} snapshots x {result['depth']} levels")
+    print(f"  pandas per snapshot: {result['pandas_us_per_snapshot']:.1f} us")
+    print(f"  stack (parse strings): {result['stack_us_per_snapshot']:.1f} us")
+    print(f"  batch kernel: {result['kernel_us_per_snapshot']:.2f} us ({result['kernel_speedup']:.0f}x)")
+    print(f"  end to end: {result['end_to_end_speedup']:.1f}x")
+    print(f"  features matching pandas: {len(FEATURE_NAMES) - len(result['mismatched_features'])}/{len(FEATURE_NAMES)}"
+          + (f" (mismatched: {', '.join(result['mismatched_features'])})" if result['mismatched_features'] else ""))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
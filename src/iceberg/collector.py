@@ -0,0 +1,233 @@
+"""Concurrent order-book snapshot collector for iceberg training data.
+
+Usage:
+    python -m src.iceberg.collector --symbols BTCUSDT ETHUSDT SOLUSDT --samples 10000
+    python -m src.iceberg.collector --symbols BTCUSDT ETHUSDT --samples 500 --out data/iceberg/run2.jsonl
+    python -m src.iceberg.collector --symbols BTCUSDT ETHUSDT SOLUSDT --samples 10000 --train
+
+Every symbol is sampled by its own task, with at most ``--concurrency``
+requests in flight. Each request first takes its depth weight from the
+process-wide Binance.US ``WeightBudget`` token bucket, so the collector
+stays inside the venue limit even alongside other clients in the same
+process. A 429/418 pauses every task for the ``Retry-After`` period; any
+other 4xx (an unknown symbol, say) stops sampling that symbol only.
+
+Snapshots are appended to a JSONL file as they arrive, one object per
+line with the raw book and its ``is_iceberg_order`` label. Running the
+same command again resumes: lines already on disk count towards each
+symbol's target, and a line cut short by an interruption is dropped.
+``load_training_data`` turns the file into the ``(X, y)`` arrays used by
+``train_model``; ``--train`` trains on the file once collection is done.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+import aiohttp
+import numpy as np
+
+from ..arbitrage.exchange_registry import binance_depth_weight, get_registry
+from .features import FEATURE_NAMES, extract_features_batch, stack_order_books
+from .iceberg_detector import BASE_URL, DATA_DIR, get_credentials, is_iceberg_order, setup_logging, train_model
+
+VENUE = "binanceus"
+DEFAULT_OUTPUT = DATA_DIR / "snapshots.jsonl"
+DEFAULT_CONCURRENCY = 16
+DEFAULT_INTERVAL = 1.0  # seconds between snapshots of one symbol; the book barely changes faster
+MAX_BACKOFF = 30.0
+FLUSH_EVERY = 50
+
+
+class SymbolRejected(Exception):
+    """The venue refused requests for a symbol with a client error that retrying will not fix."""
+
+
+def resume_counts(path: Path) -> Counter:
+    """Snapshots already collected per symbol, truncating a partial last line left by a crash."""
+    counts: Counter = Counter()
+    if not path.exists():
+        return counts
+    with open(path, "rb+") as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            logging.warning(f"Dropping {len(data) - end} bytes of an incomplete snapshot at the end of {path}")
+            f.truncate(end)
+    for line in data[:end].splitlines():
+        if line.strip():
+            counts[json.loads(line)["symbol"]] += 1
+    return counts
+
+
+class SnapshotWriter:
+    """Appends one JSON line per snapshot, flushing every ``flush_every`` lines and on close."""
+
+    def __init__(self, path: Path, flush_every: int = FLUSH_EVERY):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.flush_every = flush_every
+        self._file = open(path, "a", encoding="utf-8")
+        self._unflushed = 0
+
+    def write(self, record: dict) -> None:
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._unflushed += 1
+        if self._unflushed >= self.flush_every:
+            self._file.flush()
+            self._unflushed = 0
+
+    def close(self) -> None:
+        self._file.flush()
+        self._file.close()
+
+
+class SnapshotCollector:
+    """Samples depth snapshots for many symbols concurrently under the shared weight budget."""
+
+    def __init__(self, symbols: Iterable[str], samples: int, path: Path = DEFAULT_OUTPUT,
+                 depth: int = 100, concurrency: int = DEFAULT_CONCURRENCY,
+                 interval: float = DEFAULT_INTERVAL, api_key: Optional[str] = None):
+        self.symbols = [s.upper() for s in symbols]
+        self.samples = samples
+        self.path = Path(path)
+        self.depth = depth
+        self.interval = interval
+        self.weight = binance_depth_weight(depth)
+        self.budget = get_registry().budget(VENUE)
+        self.headers = {"X-MBX-APIKEY": api_key} if api_key else {}
+        self.counts: Counter = Counter()
+        self.icebergs = 0
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._started = 0.0
+        self._collected = 0
+
+    async def fetch(self, session: aiohttp.ClientSession, symbol: str) -> Optional[dict]:
+        """One budgeted depth request; None when it was rate limited and should be retried.
+
+        Raises ``SymbolRejected`` for any other 4xx response.
+        """
+        await self.budget.acquire_async(self.weight)
+        async with self._semaphore:
+            async with session.get(f"{BASE_URL}/api/v3/depth", params={"symbol": symbol, "limit": self.depth},
+                                   headers=self.headers, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                used = response.headers.get("X-MBX-USED-WEIGHT-1M")
+                if used is not None:
+                    self.budget.observe_used(float(used))
+                if response.status in (418, 429):
+                    retry_after = float(response.headers.get("Retry-After", 60))
+                    logging.warning(f"{VENUE} rate limit hit ({response.status}); pausing {retry_after}s")
+                    self.budget.pause(retry_after)
+                    return None
+                if 400 <= response.status < 500:
+                    raise SymbolRejected(f"{symbol}: HTTP {response.status} {await response.text()}")
+                response.raise_for_status()
+                return await response.json()
+
+    def record(self, symbol: str, book: dict) -> dict:
+        is_iceberg = is_iceberg_order(book)
+        self.icebergs += bool(is_iceberg)
+        return {"symbol": symbol, "ts": time.time(), "lastUpdateId": book.get("lastUpdateId"),
+                "bids": book["bids"], "asks": book["asks"], "label": 1 if is_iceberg else 0}
+
+    async def _sample_symbol(self, session: aiohttp.ClientSession, symbol: str, writer: SnapshotWriter) -> None:
+        backoff = 1.0
+        while self.counts[symbol] < self.samples:
+            started = time.monotonic()
+            try:
+                book = await self.fetch(session, symbol)
+            except SymbolRejected as e:
+                logging.error(f"Giving up on {e}")
+                return
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logging.error(f"Error fetching {symbol} order book: {e}; retrying in {backoff:.0f}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, MAX_BACKOFF)
+                continue
+            backoff = 1.0
+            if book is None:
+                continue  # rate limited; the budget holds the next request until the pause ends
+            if "bids" not in book or "asks" not in book:
+                logging.warning(f"Malformed {symbol} order book response; retrying in {self.interval}s")
+                await asyncio.sleep(self.interval)
+                continue
+            writer.write(self.record(symbol, book))
+            self.counts[symbol] += 1
+            self._collected += 1
+            if self._collected % 100 == 0:
+                self.log_progress()
+            await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def log_progress(self) -> None:
+        total = sum(min(self.counts[s], self.samples) for s in self.symbols)
+        target = self.samples * len(self.symbols)
+        rate = self._collected / max(time.monotonic() - self._started, 1e-9)
+        logging.info(f"Progress: {total}/{target} snapshots ({rate:.1f}/s this run, {self.icebergs} icebergs)")
+
+    async def run(self) -> Dict[str, int]:
+        """Collect until every symbol has ``samples`` snapshots in the file; returns the per-symbol counts."""
+        self.counts = resume_counts(self.path)
+        done = sum(min(self.counts[s], self.samples) for s in self.symbols)
+        if done:
+            logging.info(f"Resuming {self.path}: {done} snapshots already collected")
+        self._started = time.monotonic()
+        writer = SnapshotWriter(self.path)
+        try:
+            async with aiohttp.ClientSession() as session:
+                await asyncio.gather(*(self._sample_symbol(session, s, writer) for s in self.symbols))
+        finally:
+            writer.close()  # also on Ctrl-C, so everything fetched so far is kept for the next resume
+            self.log_progress()
+        return {s: self.counts[s] for s in self.symbols}
+
+
+def load_training_data(path: Path = DEFAULT_OUTPUT, depth: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """``(X, y)`` from a snapshot file: features from the batch kernel and the stored labels."""
+    books, labels = [], []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                break  # incomplete last line of an interrupted run
+            snapshot = json.loads(line)
+            books.append(snapshot)
+            labels.append(snapshot["label"])
+    if not books:
+        return np.empty((0, len(FEATURE_NAMES))), np.empty(0, dtype=int)
+    bids, asks = stack_order_books(books, depth)
+    return extract_features_batch(bids, asks), np.array(labels)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Collect iceberg training snapshots from Binance.US")
+    parser.add_argument("--symbols", nargs="+", default=["BTCUSDT"], help="Symbols to sample.")
+    parser.add_argument("--samples", type=int, default=100, help="Target snapshots per symbol, including resumed ones.")
+    parser.add_argument("--out", type=Path, default=DEFAULT_OUTPUT, help="JSONL file to append to and resume from.")
+    parser.add_argument("--depth", type=int, default=100, help="Order book levels per snapshot.")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Maximum requests in flight.")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL,
+                        help="Minimum seconds between snapshots of the same symbol.")
+    parser.add_argument("--train", action="store_true", help="Train the iceberg model on the file afterwards.")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    api_key, _ = get_credentials()
+    collector = SnapshotCollector(args.symbols, args.samples, args.out, depth=args.depth,
+                                  concurrency=args.concurrency, interval=args.interval, api_key=api_key)
+    try:
+        counts = asyncio.run(collector.run())
+    except KeyboardInterrupt:
+        print(f"Interrupted; run the same command again to resume from {args.out}")
+        return
+    print(f"Collected {sum(counts.values())} snapshots into {args.out}: "
+          + ", ".join(f"{s} {n}" for s, n in counts.items()))
+    if args.train:
+        train_model(args.out)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
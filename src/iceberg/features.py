@@ -0,0 +1,78 @@
+"""Vectorised order-book features for the iceberg model.
+
+``extract_features_batch`` computes the same 17 features as the original
+per-snapshot pandas code for a whole stack of snapshots at once. Books
+with fewer levels than the stack depth are padded with NaN rows, which
+count as missing levels exactly as pandas skips NaN.
+"""
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+
+FEATURE_NAMES = [
+    "avg_bid_price", "avg_ask_price", "avg_bid_size", "avg_ask_size",
+    "bid_ask_spread", "bid_size_std", "ask_size_std", "bid_price_std",
+    "ask_price_std", "bid_volume", "ask_volume", "volume_imbalance",
+    "bid_levels", "ask_levels", "level_imbalance", "large_bid_orders",
+    "large_ask_orders"
+]
+
+
+def stack_order_books(order_books: Iterable[dict], depth: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Stack Binance-style ``{"bids": [[price, qty], ...], "asks": ...}`` snapshots into
+    two ``(n_snapshots, depth, 2)`` float arrays, NaN-padded to ``depth`` levels."""
+    order_books = list(order_books)
+    if depth is None:
+        depth = max([max(len(b["bids"]), len(b["asks"])) for b in order_books] or [0])
+    bids = np.full((len(order_books), depth, 2), np.nan)
+    asks = np.full((len(order_books), depth, 2), np.nan)
+    for i, book in enumerate(order_books):
+        for out, levels in ((bids, book["bids"][:depth]), (asks, book["asks"][:depth])):
+            if len(levels):
+                out[i, :len(levels)] = np.asarray(levels, dtype=float)
+    return bids, asks
+
+
+def _side_stats(side: np.ndarray):
+    """Count, sums, means and sample stds (ddof=1) of price and quantity over valid levels."""
+    price, qty = side[..., 0], side[..., 1]
+    valid = ~np.isnan(price)
+    count = valid.sum(axis=1)
+    price0 = np.where(valid, price, 0.0)
+    qty0 = np.where(valid, qty, 0.0)
+    volume = qty0.sum(axis=1)
+    mean_price = price0.sum(axis=1) / count
+    mean_qty = volume / count
+    dof = np.where(count > 1, count - 1, np.nan)
+    price_std = np.sqrt((np.where(valid, price - mean_price[:, None], 0.0) ** 2).sum(axis=1) / dof)
+    qty_std = np.sqrt((np.where(valid, qty - mean_qty[:, None], 0.0) ** 2).sum(axis=1) / dof)
+    large = (qty > 2 * mean_qty[:, None]).sum(axis=1)  # NaN levels compare False
+    return valid, count, volume, mean_price, mean_qty, price_std, qty_std, large
+
+
+def extract_features_batch(bids: np.ndarray, asks: np.ndarray) -> np.ndarray:
+    """Feature matrix ``(n_snapshots, 17)`` in ``FEATURE_NAMES`` order.
+
+    ``bids`` and ``asks`` are ``(n_snapshots, depth, 2)`` arrays of
+    (price, quantity). Statistics follow pandas: means over present
+    levels, sample standard deviations (ddof=1, NaN for a single level),
+    and large orders counted as quantity above twice the side's mean.
+    """
+    bids = np.asarray(bids, dtype=float)
+    asks = np.asarray(asks, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        b_valid, b_count, b_volume, b_price, b_qty, b_price_std, b_qty_std, b_large = _side_stats(bids)
+        a_valid, a_count, a_volume, a_price, a_qty, a_price_std, a_qty_std, a_large = _side_stats(asks)
+        best_bid = np.where(b_valid, bids[..., 0], -np.inf).max(axis=1)
+        best_ask = np.where(a_valid, asks[..., 0], np.inf).min(axis=1)
+        spread = best_ask - best_bid
+        spread[~np.isfinite(spread)] = np.nan
+        features = np.column_stack([
+            b_price, a_price, b_qty, a_qty,
+            spread,
+            b_qty_std, a_qty_std, b_price_std, a_price_std,
+            b_volume, a_volume, (b_volume - a_volume) / (b_volume + a_volume),
+            b_count, a_count, (b_count - a_count) / (b_count + a_count),
+            b_large, a_large,
+        ])
+    return features
@@ -1,19 +1,21 @@
-import requests
-import pandas as pd
-import numpy as np
-import tensorflow as tf
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
+"""Iceberg order detection on Binance.US order books.
+
+Importing this module is cheap and has no side effects: TensorFlow,
+scikit-learn, pandas, NumPy and requests are imported inside the functions
+that use them, directories are created just before they are written to,
+credentials are read from ``config/.env.iceberg`` on first use, and
+logging is only configured by ``setup_logging`` (called by the scripts,
+not on import). ``src/iceberg/import_budget.py`` checks this stays true.
+"""
 import hashlib
 import hmac
-import time
 import os
 from pathlib import Path
-from dotenv import load_dotenv
 import logging
 from datetime import datetime
 import json
 import pickle
+import threading
 
 # Define paths relative to project root
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
@@ -25,64 +27,104 @@ DATA_DIR = PROJECT_ROOT / "data" / "iceberg"
 LOG_DIR = PROJECT_ROOT / "logs"
 CONFIG_DIR = PROJECT_ROOT / "config"
 
-# Create necessary directories with error handling
-for directory in [DATA_DIR, LOG_DIR, MODEL_DIR]:
-    try:
-        directory.mkdir(parents=True, exist_ok=True)
-        logging.info(f"Directory created/verified: {directory}")
-    except Exception as e:
-        logging.error(f"Error creating directory {directory}: {e}")
-        raise
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(LOG_DIR / f'iceberg_detector_{datetime.now().strftime("%Y%m%d")}.log'),
-        logging.StreamHandler()
-    ]
-)
-
-# Load environment variables
-env_path = CONFIG_DIR / '.env.iceberg'
-load_dotenv(env_path)
-
-# Get API credentials from environment variables
-API_KEY = os.getenv('BINANCE_API_KEY')
-SECRET_KEY = os.getenv('BINANCE_API_SECRET')
-
-# Debug logging
-logging.info(f"Project root: {PROJECT_ROOT}")
-logging.info(f"Config directory: {CONFIG_DIR}")
-logging.info(f"Environment file path: {env_path}")
-logging.info(f"Environment file exists: {env_path.exists()}")
-logging.info(f"API_KEY present: {'Yes' if API_KEY else 'No'}")
-logging.info(f"SECRET_KEY present: {'Yes' if SECRET_KEY else 'No'}")
-
-if not API_KEY or not SECRET_KEY:
-    raise ValueError("API credentials not found in .env.iceberg file. Please check your configuration.")
+ENV_PATH = CONFIG_DIR / '.env.iceberg'
 
 # Binance API Base URL
 BASE_URL = "https://api.binance.us"
 
-# Configure TensorFlow for local machine
-tf.config.threading.set_inter_op_parallelism_threads(4)
-tf.config.threading.set_intra_op_parallelism_threads(4)
+
+def _ensure_dirs(*directories):
+    """Create output directories right before something is written to them."""
+    for directory in directories:
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+        except Exception as e:
+            logging.error(f"Error creating directory {directory}: {e}")
+            raise
+
+
+def setup_logging():
+    """Log to stderr and a dated file under ``logs/``; for scripts, not library use."""
+    _ensure_dirs(LOG_DIR)
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(LOG_DIR / f'iceberg_detector_{datetime.now().strftime("%Y%m%d")}.log'),
+            logging.StreamHandler()
+        ]
+    )
+
+
+_credentials = None
+_credentials_lock = threading.Lock()
+
+
+def get_credentials():
+    """(api_key, secret_key) from the environment or ``.env.iceberg``, loaded once; either may be None."""
+    global _credentials
+    with _credentials_lock:
+        if _credentials is None:
+            from dotenv import load_dotenv
+
+            load_dotenv(ENV_PATH)
+            _credentials = (os.getenv('BINANCE_API_KEY'), os.getenv('BINANCE_API_SECRET'))
+            logging.info(f"Environment file path: {ENV_PATH}")
+            logging.info(f"Environment file exists: {ENV_PATH.exists()}")
+            logging.info(f"API_KEY present: {'Yes' if _credentials[0] else 'No'}")
+            logging.info(f"SECRET_KEY present: {'Yes' if _credentials[1] else 'No'}")
+        return _credentials
+
+
+def require_credentials():
+    """Like ``get_credentials`` but raises ``ValueError`` when either key is missing."""
+    api_key, secret_key = get_credentials()
+    if not api_key or not secret_key:
+        raise ValueError("API credentials not found in .env.iceberg file. Please check your configuration.")
+    return api_key, secret_key
+
+
+def __getattr__(name):
+    # API_KEY / SECRET_KEY used to be module globals read at import time
+    if name == 'API_KEY':
+        return get_credentials()[0]
+    if name == 'SECRET_KEY':
+        return get_credentials()[1]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _configure_tensorflow():
+    """Import TensorFlow and configure it for a local machine."""
+    import tensorflow as tf
+
+    tf.config.threading.set_inter_op_parallelism_threads(4)
+    tf.config.threading.set_intra_op_parallelism_threads(4)
+    return tf
 
 def generate_signature(params):
     """Generate Binance API signature."""
+    _, secret_key = require_credentials()
     query_string = '&'.join([f"{key}={params[key]}" for key in sorted(params)])
-    return hmac.new(SECRET_KEY.encode(), query_string.encode(), hashlib.sha256).hexdigest()
+    return hmac.new(secret_key.encode(), query_string.encode(), hashlib.sha256).hexdigest()
 
 def get_order_book(symbol, depth=100):
     """Fetch order book data from Binance."""
+    import requests
+    from ..arbitrage.exchange_registry import binance_depth_weight, get_registry
+
+    try:
+        api_key, _ = require_credentials()
+    except ValueError as e:
+        logging.error(f"Error fetching order book: {e}")
+        return None
     url = f"{BASE_URL}/api/v3/depth"
     params = {"symbol": symbol.upper(), "limit": depth}
-    headers = {"X-MBX-APIKEY": API_KEY}
+    headers = {"X-MBX-APIKEY": api_key}
 
     try:
-        response = requests.get(url, params=params, headers=headers, timeout=5)
+        # Pooled session and shared Binance.US weight budget across the process
+        response = get_registry().request("binanceus", "GET", url, weight=binance_depth_weight(depth),
+                                          params=params, headers=headers, timeout=5)
         response.raise_for_status()  # Raise an exception for bad status codes
         data = response.json()
         return data if 'bids' in data and 'asks' in data else None
@@ -95,40 +137,12 @@ def extract_features(order_book):
     if order_book is None:
         return None
 
-    try:
-        bids = pd.DataFrame(order_book['bids'], columns=['price', 'quantity'], dtype=float)
-        asks = pd.DataFrame(order_book['asks'], columns=['price', 'quantity'], dtype=float)
+    from .features import extract_features_batch, stack_order_books
 
-        # Basic features
-        features = {
-            "avg_bid_price": bids["price"].mean(),
-            "avg_ask_price": asks["price"].mean(),
-            "avg_bid_size": bids["quantity"].mean(),
-            "avg_ask_size": asks["quantity"].mean(),
-            "bid_ask_spread": asks["price"].min() - bids["price"].max(),
-            
-            # Additional features for iceberg detection
-            "bid_size_std": bids["quantity"].std(),  # Standard deviation of bid sizes
-            "ask_size_std": asks["quantity"].std(),  # Standard deviation of ask sizes
-            "bid_price_std": bids["price"].std(),    # Standard deviation of bid prices
-            "ask_price_std": asks["price"].std(),    # Standard deviation of ask prices
-            
-            # Volume imbalance features
-            "bid_volume": bids["quantity"].sum(),
-            "ask_volume": asks["quantity"].sum(),
-            "volume_imbalance": (bids["quantity"].sum() - asks["quantity"].sum()) / (bids["quantity"].sum() + asks["quantity"].sum()),
-            
-            # Price level features
-            "bid_levels": len(bids),
-            "ask_levels": len(asks),
-            "level_imbalance": (len(bids) - len(asks)) / (len(bids) + len(asks)),
-            
-            # Large order features
-            "large_bid_orders": len(bids[bids["quantity"] > bids["quantity"].mean() * 2]),
-            "large_ask_orders": len(asks[asks["quantity"] > asks["quantity"].mean() * 2])
-        }
-
-        return list(features.values())
+    try:
+        # One-row batch through the vectorised kernel in features.py
+        bids, asks = stack_order_books([order_book])
+        return extract_features_batch(bids, asks)[0].tolist()
     except Exception as e:
         logging.error(f"Error extracting features: {e}")
         return None
@@ -138,6 +152,9 @@ def is_iceberg_order(order_book):
     if order_book is None:
         return False
 
+    import numpy as np
+    import pandas as pd
+
     try:
         bids = pd.DataFrame(order_book['bids'], columns=['price', 'quantity'], dtype=float)
         asks = pd.DataFrame(order_book['asks'], columns=['price', 'quantity'], dtype=float)
@@ -193,45 +210,48 @@ def is_iceberg_order(order_book):
         return False
 
 def generate_training_data(symbol="BTCUSDT", samples=100):
-    """Generate training data from order book with real iceberg labels."""
-    X, y = [], []
+    """Collect ``samples`` labelled snapshots of ``symbol`` and return their ``(X, y)`` features.
+
+    Sampling goes through ``collector.SnapshotCollector`` into
+    ``DATA_DIR/<symbol>_snapshots.jsonl``, so it shares the process-wide
+    request-weight budget and resumes from snapshots already on disk.
+    """
+    import asyncio
+    import numpy as np
+    from concurrent.futures import ThreadPoolExecutor
+    from .collector import SnapshotCollector, load_training_data
+
     logging.info(f"Generating training data for {symbol} with {samples} samples")
 
-    if not API_KEY or not SECRET_KEY:
+    api_key, secret_key = get_credentials()
+    if not api_key or not secret_key:
         logging.warning("API credentials not set. Generating dummy data for training.")
         # Generate dummy data for demonstration
         np.random.seed(42)
         X = np.random.rand(samples, 17)  # 17 features
         y = np.random.randint(0, 2, samples)  # Binary labels
         return X, y
-    
-    for i in range(samples):
-        if i % 100 == 0:
-            logging.info(f"Progress: {i}/{samples} samples collected")
-            
-        order_book = get_order_book(symbol)
-        if order_book is None:
-            continue
-
-        features = extract_features(order_book)
-        if features is None:
-            continue
 
-        # Use real iceberg detection instead of random labels
-        is_iceberg = is_iceberg_order(order_book)
-        
-        X.append(features)
-        y.append(1 if is_iceberg else 0)
-        
-        # Add a small delay to avoid rate limiting
-        time.sleep(0.1)
+    path = DATA_DIR / f"{symbol.lower()}_snapshots.jsonl"
+    collector = SnapshotCollector([symbol], samples, path, interval=0.1, api_key=api_key)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        asyncio.run(collector.run())
+    else:
+        # Called from a coroutine (the web demo): give the collector its own loop in a worker thread
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            pool.submit(asyncio.run, collector.run()).result()
+    X, y = load_training_data(path)
+    X, y = X[-samples:], y[-samples:]
 
     # Log the distribution of iceberg orders
-    iceberg_count = sum(y)
+    iceberg_count = int(y.sum())
     logging.info(f"Found {iceberg_count} iceberg orders out of {len(y)} total samples")
-    logging.info(f"Iceberg order percentage: {(iceberg_count/len(y))*100:.2f}%")
+    if len(y):
+        logging.info(f"Iceberg order percentage: {(iceberg_count/len(y))*100:.2f}%")
 
-    return np.array(X), np.array(y)
+    return X, y
 
 def save_model_metadata(model, scaler, feature_names, training_params):
     """Save model metadata and configuration."""
@@ -252,10 +272,23 @@ def save_model_metadata(model, scaler, feature_names, training_params):
     
     logging.info(f"Model metadata and scaler saved to {MODEL_DIR}")
 
-def train_model():
-    """Train and save the model."""
+def train_model(snapshots=None):
+    """Train and save the model, on a ``collector`` snapshot file when one is given."""
+    import numpy as np
+    import pandas as pd
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import StandardScaler
+    from .features import FEATURE_NAMES
+    from .model_registry import NUMPY_FILE
+    from .numpy_backend import export_numpy_model
+
+    tf = _configure_tensorflow()
     logging.info("Starting model training...")
-    X, y = generate_training_data()
+    if snapshots is not None:
+        from .collector import load_training_data
+        X, y = load_training_data(snapshots)
+    else:
+        X, y = generate_training_data()
     
     if len(X) == 0:
         logging.error("No training data collected. Check API response.")
@@ -323,18 +356,12 @@ def train_model():
     )
 
     # Save Model after training
+    _ensure_dirs(MODEL_DIR, DATA_DIR)
     model.save(MODEL_PATH)
     
-    # Get feature names from the extract_features function
-    feature_names = [
-        "avg_bid_price", "avg_ask_price", "avg_bid_size", "avg_ask_size",
-        "bid_ask_spread", "bid_size_std", "ask_size_std", "bid_price_std",
-        "ask_price_std", "bid_volume", "ask_volume", "volume_imbalance",
-        "bid_levels", "ask_levels", "level_imbalance", "large_bid_orders",
-        "large_ask_orders"
-    ]
-    
-    save_model_metadata(model, scaler, feature_names, training_params)
+    save_model_metadata(model, scaler, FEATURE_NAMES, training_params)
+    # Weights and scaler as arrays, so serving can run without TensorFlow
+    export_numpy_model(model, scaler, MODEL_DIR / NUMPY_FILE)
     
     # Save training history
     history_df = pd.DataFrame(history.history)
@@ -352,35 +379,31 @@ def train_model():
     logging.info(f"Test AUC: {test_auc:.4f}")
 
 def load_model():
-    """Load the trained model and its components."""
-    if not MODEL_PATH.exists():
+    """Load the trained model and its components (kept resident by the model registry)."""
+    from .model_registry import get_model_registry, model_signature
+
+    # Either artifact will do: model.npz + metadata, or the Keras model, scaler and metadata
+    if model_signature(MODEL_DIR) is None:
         logging.warning("No saved model found. Training a new one...")
         train_model()
     
     try:
-        # Load metadata
-        with open(METADATA_PATH, 'r') as f:
-            metadata = json.load(f)
-
-        # Rebuild the model from the architecture in the metadata
-        # Use tf.keras.Sequential.from_config for Sequential models
-        model = tf.keras.Sequential.from_config(metadata['model_architecture'])
-        model.load_weights(MODEL_PATH)
-        model.compile(optimizer='adam', loss='binary_crossentropy', metrics=['accuracy'])
-        
-        # Load scaler
-        with open(SCALER_PATH, 'rb') as f:
-            scaler = pickle.load(f)
-        
-        logging.info("Model, scaler, and metadata loaded successfully!")
-        return model, scaler, metadata
+        bundle = get_model_registry().current()
+        return bundle.model, bundle.scaler, bundle.metadata
     except Exception as e:
         logging.error(f"Error loading model components: {e}")
         raise
 
 def predict_iceberg(symbol="BTCUSDT"):
     """Predict iceberg orders."""
-    model, scaler, metadata = load_model()
+    import numpy as np
+    from .model_registry import get_model_registry, model_signature
+
+    if model_signature(MODEL_DIR) is None:
+        logging.warning("No saved model found. Training a new one...")
+        train_model()
+    # Loaded and warmed once per process; only the forward pass runs per call
+    registry = get_model_registry()
     order_book = get_order_book(symbol)
     features = extract_features(order_book)
 
@@ -388,11 +411,8 @@ def predict_iceberg(symbol="BTCUSDT"):
         logging.warning("No valid features extracted.")
         return
 
-    # Scale features
-    X_input = scaler.transform(np.array(features).reshape(1, -1))
-
-    # Predict
-    prediction = model.predict(X_input)[0][0]
+    # Scale and predict
+    prediction = registry.predict(np.array(features).reshape(1, -1))[0]
     
     # Print detailed prediction
     print("\n" + "="*50)
@@ -409,6 +429,7 @@ def predict_iceberg(symbol="BTCUSDT"):
     print("="*50 + "\n")
 
 if __name__ == "__main__":
+    setup_logging()
     try:
         # Train and save the model
         train_model()
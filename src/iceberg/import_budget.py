@@ -0,0 +1,84 @@
+"""Check that importing ``iceberg_detector`` stays fast and side-effect free.
+
+Usage:
+    python src/iceberg/import_budget.py --budget_ms 50 --runs 5
+
+Each run imports the module in a fresh interpreter under ``-X importtime``
+with the Binance credentials removed from the environment. The best
+cumulative import time across runs is compared with the budget. The
+script also checks that no heavy dependency was pulled in and that no
+logging handler was installed. It exits non-zero when any check fails.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+MODULE = "src.iceberg.iceberg_detector"
+HEAVY_MODULES = ["tensorflow", "sklearn", "pandas", "numpy", "requests", "dotenv", "ccxt"]
+
+_CHILD = f"""
+import json, logging, sys
+handlers = len(logging.getLogger().handlers)
+import {MODULE}
+print(json.dumps({{
+    "heavy": sorted(m for m in {HEAVY_MODULES!r} if m in sys.modules),
+    "handlers": len(logging.getLogger().handlers) - handlers,
+}}))
+"""
+
+
+def import_once():
+    """Import the module in a fresh interpreter; returns (cumulative_us, child report)."""
+    env = {k: v for k, v in os.environ.items() if k not in ("BINANCE_API_KEY", "BINANCE_API_SECRET")}
+    env["PYTHONPATH"] = str(PROJECT_ROOT)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", _CHILD],
+                          capture_output=True, text=True, env=env)
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {MODULE} failed:\n{proc.stderr[-2000:]}")
+    cumulative = None
+    for line in proc.stderr.splitlines():
+        # "import time: <self us> | <cumulative us> | <indented module name>"
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == MODULE:
+            cumulative = int(parts[1])
+    if cumulative is None:
+        raise RuntimeError(f"No -X importtime entry for {MODULE}")
+    return cumulative, json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def run(budget_ms, runs):
+    times, report = [], None
+    for _ in range(runs):
+        cumulative, report = import_once()
+        times.append(cumulative)
+    best_ms = min(times) / 1000
+    return {
+        "best_ms": best_ms,
+        "worst_ms": max(times) / 1000,
+        "budget_ms": budget_ms,
+        "heavy_modules": report["heavy"],
+        "handlers_added": report["handlers"],
+        "ok": best_ms <= budget_ms and not report["heavy"] and report["handlers"] == 0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=f"Import-time budget for {MODULE}")
+    parser.add_argument("--budget_ms", type=float, default=50.0, help="Maximum cumulative import time.")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to import in; the best is used.")
+    args = parser.parse_args(argv)
+    result = run(args.budget_ms, args.runs)
+    print(f"import {MODULE}: best {result['best_ms']:.1f} ms, worst {result['worst_ms']:.1f} ms "
+          f"(budget {result['budget_ms']:.0f} ms)")
+    print(f"  heavy modules imported: {', '.join(result['heavy_modules']) or 'none'}")
+    print(f"  logging handlers added: {result['handlers_added']}")
+    print("  OK" if result["ok"] else "  BUDGET EXCEEDED")
+    sys.exit(0 if result["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
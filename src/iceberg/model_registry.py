@@ -0,0 +1,195 @@
+"""Process-wide resident iceberg model.
+
+The model, scaler and metadata are loaded once, warmed up with one
+inference, and kept in memory. A watcher thread polls ``models/iceberg``;
+when a new model has landed and its files have stopped changing, the
+replacement is loaded and warmed off to the side, then swapped in with a
+single reference assignment. Requests in flight finish on the model they
+started with.
+
+When ``model.npz`` (see ``numpy_backend``) is present and at least as new
+as ``model.keras`` it is served instead of the Keras files, so TensorFlow
+is never imported. A Keras model dropped in later wins until it is
+exported again, so a stale export never shadows it.
+"""
+import json
+import logging
+import pickle
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional, Tuple
+
+import numpy as np
+
+from .features import FEATURE_NAMES
+
+MODEL_DIR = Path(__file__).resolve().parent.parent.parent / "models" / "iceberg"
+MODEL_FILE = "model.keras"
+SCALER_FILE = "scaler.pkl"
+METADATA_FILE = "metadata.json"
+NUMPY_FILE = "model.npz"
+POLL_INTERVAL = 5.0
+
+
+def _mtime_ns(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def model_files(model_dir: Path) -> Tuple[str, ...]:
+    """Files the served model is read from: the NumPy export unless the Keras model is newer."""
+    numpy_mtime = _mtime_ns(model_dir / NUMPY_FILE)
+    keras_mtime = _mtime_ns(model_dir / MODEL_FILE)
+    if numpy_mtime is not None and (keras_mtime is None or numpy_mtime >= keras_mtime):
+        return NUMPY_FILE, METADATA_FILE
+    return MODEL_FILE, SCALER_FILE, METADATA_FILE
+
+
+def model_signature(model_dir: Path) -> Optional[Tuple]:
+    """(name, mtime_ns, size) of every model file, or None while any is missing."""
+    signature = []
+    for name in model_files(model_dir):
+        try:
+            stat = (model_dir / name).stat()
+        except FileNotFoundError:
+            return None
+        signature.append((name, stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+@dataclass(frozen=True)
+class ModelBundle:
+    """A loaded model with the scaler and metadata it was trained with."""
+    model: Any
+    scaler: Any
+    metadata: dict
+    signature: Optional[Tuple]
+    loaded_at: float = field(default_factory=time.time)
+
+    def predict(self, features) -> np.ndarray:
+        """Iceberg probabilities for a ``(n, 17)`` feature matrix."""
+        X = self.scaler.transform(np.asarray(features, dtype=float).reshape(-1, len(FEATURE_NAMES)))
+        # Calling the model directly skips model.predict's per-call dataset setup
+        return np.asarray(self.model(X, training=False)).reshape(-1)
+
+
+def load_keras_bundle(model_dir: Path, signature: Optional[Tuple] = None) -> ModelBundle:
+    """Rebuild the Sequential model from its metadata, load weights and unpickle the scaler."""
+    import tensorflow as tf
+
+    with open(model_dir / METADATA_FILE, "r") as f:
+        metadata = json.load(f)
+    model = tf.keras.Sequential.from_config(metadata["model_architecture"])
+    model.load_weights(model_dir / MODEL_FILE)
+    with open(model_dir / SCALER_FILE, "rb") as f:
+        scaler = pickle.load(f)
+    return ModelBundle(model, scaler, metadata, signature)
+
+
+def load_bundle(model_dir: Path, signature: Optional[Tuple] = None) -> ModelBundle:
+    """NumPy backend when ``model.npz`` exists, otherwise the Keras model."""
+    if NUMPY_FILE in model_files(model_dir):
+        from .numpy_backend import load_numpy_bundle
+        return load_numpy_bundle(model_dir, signature)
+    return load_keras_bundle(model_dir, signature)
+
+
+class ModelRegistry:
+    """Keeps one warmed-up ``ModelBundle`` resident and hot-swaps it when the files change.
+
+    ``loader(model_dir, signature)`` builds a bundle.
+    """
+
+    def __init__(self, model_dir: Path = MODEL_DIR,
+                 loader: Callable[[Path, Optional[Tuple]], ModelBundle] = load_bundle,
+                 poll_interval: float = POLL_INTERVAL):
+        self.model_dir = Path(model_dir)
+        self.loader = loader
+        self.poll_interval = poll_interval
+        self.swaps = 0
+        self._bundle: Optional[ModelBundle] = None
+        self._pending: Optional[Tuple] = None
+        self._load_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+
+    def _load(self) -> ModelBundle:
+        signature = model_signature(self.model_dir)
+        if signature is None:
+            raise FileNotFoundError(f"No complete iceberg model in {self.model_dir}")
+        start = time.perf_counter()
+        bundle = self.loader(self.model_dir, signature)
+        bundle.predict(np.zeros((1, len(FEATURE_NAMES))))  # warm-up: builds the graph and allocates buffers
+        logging.info(f"Iceberg model loaded and warmed up in {time.perf_counter() - start:.2f}s")
+        return bundle
+
+    def current(self) -> ModelBundle:
+        """The resident bundle, loading it on first use."""
+        bundle = self._bundle
+        if bundle is None:
+            with self._load_lock:
+                if self._bundle is None:
+                    self._bundle = self._load()
+                bundle = self._bundle
+        return bundle
+
+    def predict(self, features) -> np.ndarray:
+        return self.current().predict(features)
+
+    def refresh(self) -> bool:
+        """Swap in a new model once its files are complete and unchanged since the last poll."""
+        signature = model_signature(self.model_dir)
+        loaded = self._bundle.signature if self._bundle is not None else None
+        if signature is None or signature == loaded:
+            self._pending = None
+            return False
+        if signature != self._pending:
+            self._pending = signature  # still being written, or just landed: check again next poll
+            return False
+        with self._load_lock:
+            try:
+                bundle = self._load()
+            except Exception as e:
+                logging.error(f"New iceberg model in {self.model_dir} failed to load; keeping the current one: {e}")
+                return False
+            if bundle.signature != model_signature(self.model_dir):
+                return False  # changed again while loading
+            self._bundle = bundle
+            self._pending = None
+            self.swaps += 1
+        logging.info(f"Iceberg model hot-swapped (swap {self.swaps})")
+        return True
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                logging.error(f"Iceberg model watcher error: {e}")
+
+    def start(self) -> ModelBundle:
+        """Start watching for new models, then load and warm up the current one."""
+        if self._watcher is None and self.poll_interval:
+            self._watcher = threading.Thread(target=self._watch, daemon=True, name="iceberg-model-watcher")
+            self._watcher.start()
+        return self.current()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """The process-wide registry for ``models/iceberg``."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry()
+        return _registry
@@ -0,0 +1,117 @@
+"""NumPy-only inference for the iceberg dense network.
+
+Usage:
+    python -m src.iceberg.numpy_backend    # export models/iceberg/model.npz and check it against Keras
+
+``export_numpy_model`` writes the Dense layer weights, their activations
+and the StandardScaler mean/scale to one ``.npz`` file. ``NumpyModel``
+and ``NumpyScaler`` reproduce the Keras forward pass and the scaler
+transform from that file, so serving processes need neither TensorFlow
+nor scikit-learn. Dropout layers are the identity at inference and are
+not exported.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .model_registry import METADATA_FILE, MODEL_DIR, NUMPY_FILE, ModelBundle, load_keras_bundle
+
+_ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0, out=x),
+    # Clipped so exp cannot overflow float32
+    "sigmoid": lambda x: np.reciprocal(1 + np.exp(-np.clip(x, -60, 60, out=x), out=x), out=x),
+    "tanh": lambda x: np.tanh(x, out=x),
+}
+
+
+def export_numpy_model(model, scaler, path: Path) -> Path:
+    """Write a Keras Sequential of Dense/Dropout layers plus a fitted StandardScaler to ``path``."""
+    arrays = {"scaler_mean": np.asarray(scaler.mean_, dtype=np.float32),
+              "scaler_scale": np.asarray(scaler.scale_, dtype=np.float32)}
+    activations = []
+    for layer in model.layers:
+        kind = type(layer).__name__
+        if kind in ("Dropout", "InputLayer"):
+            continue
+        if kind != "Dense":
+            raise ValueError(f"Cannot export {kind} layer {layer.name}; only Dense and Dropout are supported")
+        activation = layer.get_config()["activation"]
+        if activation not in _ACTIVATIONS:
+            raise ValueError(f"Unsupported activation {activation!r} in layer {layer.name}")
+        kernel, bias = layer.get_weights()
+        arrays[f"kernel_{len(activations)}"] = kernel.astype(np.float32)
+        arrays[f"bias_{len(activations)}"] = bias.astype(np.float32)
+        activations.append(activation)
+    arrays["activations"] = np.array(activations)
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp.npz")
+    np.savez(tmp, **arrays)
+    tmp.replace(path)  # readers never see a half-written file
+    return path
+
+
+class NumpyScaler:
+    """``StandardScaler.transform`` from exported mean and scale."""
+
+    def __init__(self, mean: np.ndarray, scale: np.ndarray):
+        self.mean = mean
+        self.scale = scale
+
+    def transform(self, X) -> np.ndarray:
+        return (np.asarray(X, dtype=np.float32) - self.mean) / self.scale
+
+
+class NumpyModel:
+    """Dense forward pass with the same call signature as a Keras model."""
+
+    def __init__(self, layers: List[Tuple[np.ndarray, np.ndarray, str]]):
+        self.layers = [(kernel, bias, _ACTIVATIONS[activation]) for kernel, bias, activation in layers]
+
+    def __call__(self, X, training: bool = False) -> np.ndarray:
+        x = np.asarray(X, dtype=np.float32)
+        for kernel, bias, activation in self.layers:
+            x = x @ kernel
+            x += bias
+            x = activation(x)
+        return x
+
+
+def load_numpy_model(path: Path) -> Tuple[NumpyModel, NumpyScaler]:
+    with np.load(path, allow_pickle=False) as data:
+        activations = [str(a) for a in data["activations"]]
+        layers = [(data[f"kernel_{i}"], data[f"bias_{i}"], a) for i, a in enumerate(activations)]
+        scaler = NumpyScaler(data["scaler_mean"], data["scaler_scale"])
+    return NumpyModel(layers), scaler
+
+
+def load_numpy_bundle(model_dir: Path, signature: Optional[Tuple] = None) -> ModelBundle:
+    """Registry loader for ``model.npz``; needs only NumPy."""
+    model, scaler = load_numpy_model(model_dir / NUMPY_FILE)
+    with open(model_dir / METADATA_FILE, "r") as f:
+        metadata = json.load(f)
+    return ModelBundle(model, scaler, metadata, signature)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Export the iceberg model for NumPy inference and check it")
+    parser.add_argument("--model_dir", type=Path, default=MODEL_DIR)
+    parser.add_argument("--samples", type=int, default=1000, help="Random inputs used for the parity check.")
+    args = parser.parse_args(argv)
+
+    keras_bundle = load_keras_bundle(args.model_dir)
+    path = export_numpy_model(keras_bundle.model, keras_bundle.scaler, args.model_dir / NUMPY_FILE)
+    numpy_bundle = load_numpy_bundle(args.model_dir)
+
+    X = np.random.default_rng(0).normal(size=(args.samples, len(keras_bundle.scaler.mean_)))
+    X = X * keras_bundle.scaler.scale_ + keras_bundle.scaler.mean_
+    diff = np.abs(keras_bundle.predict(X) - numpy_bundle.predict(X)).max()
+    print(f"Exported {path} ({path.stat().st_size} bytes); max |keras - numpy| over {args.samples} inputs: {diff:.2e}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,4 +1,5 @@
-from iceberg_detector import predict_iceberg
+from .iceberg_detector import predict_iceberg, setup_logging
 
 if __name__ == "__main__":
+    setup_logging()
     predict_iceberg("BTCUSDT") 
\ No newline at end of file
@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# Tests import the application as ``src.<package>.<module>``
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
@@ -0,0 +1,161 @@
+"""Offline checks of PairedExecutor against FakeExchange."""
+import asyncio
+import re
+import uuid
+
+from src.arbitrage.execution import PairedExecutor
+from src.arbitrage.fake_exchange import FakeExchange
+
+TIMEOUT = 0.05
+
+
+def make_executor(buy_fill=1.0, sell_fill=1.0):
+    buy = FakeExchange("binance", fill_ratio=buy_fill)
+    sell = FakeExchange("kraken", fill_ratio=sell_fill)
+    return PairedExecutor({"binance": buy, "kraken": sell}, timeout=TIMEOUT), buy, sell
+
+
+def submit(executor):
+    return asyncio.run(executor.submit_pair("BTC/USDT", 0.01, "binance", 100.0, "kraken", 101.0))
+
+
+def calls(exchange, name):
+    return [c for c in exchange.calls if c[0] == name]
+
+
+def test_both_legs_fill():
+    executor, buy, sell = make_executor()
+    result = submit(executor)
+    assert result.ok
+    assert result.recovery == []
+    assert result.buy.order["filled"] == 0.01
+    assert result.sell.order["filled"] == 0.01
+    assert result.buy.order["clientOrderId"] == result.buy.client_order_id
+
+
+def test_client_order_id_format_per_venue():
+    executor, buy, sell = make_executor()
+    result = submit(executor)
+    assert re.fullmatch(r"arb[0-9a-f]{24}", result.buy.client_order_id)
+    assert buy.orders["1"]["info"]["clientOrderId"] == result.buy.client_order_id
+    assert str(uuid.UUID(result.sell.client_order_id)) == result.sell.client_order_id
+    assert sell.orders["1"]["info"]["cl_ord_id"] == result.sell.client_order_id
+
+
+def test_timed_out_kraken_leg_found_by_cl_ord_id():
+    executor, buy, sell = make_executor()
+    sell.slow_next, sell.slow_latency = 1, TIMEOUT * 10
+    result = submit(executor)
+    assert result.ok and result.sell.timed_out
+    assert result.sell.order["info"]["cl_ord_id"] == result.sell.client_order_id
+
+
+def test_legs_sent_immediate_or_cancel():
+    executor, buy, sell = make_executor()
+    submit(executor)
+    assert buy.orders["1"]["info"]["timeInForce"] == "IOC"
+    assert sell.orders["1"]["info"]["timeInForce"] == "IOC"
+
+
+def test_unfilled_leg_hedged_instead_of_resting():
+    executor, buy, sell = make_executor(sell_fill=0.0)
+    result = submit(executor)
+    assert result.buy.ok and result.sell.ok and not result.ok
+    assert sell.orders["1"]["status"] == "canceled"
+    [hedge] = result.recovery
+    assert (hedge.venue, hedge.side, hedge.amount, hedge.ok) == ("binance", "sell", 0.01, True)
+
+
+def test_partly_filled_leg_hedges_the_difference():
+    executor, buy, sell = make_executor(buy_fill=0.4)
+    result = submit(executor)
+    [hedge] = result.recovery
+    assert (hedge.venue, hedge.side) == ("kraken", "buy")
+    assert abs(hedge.amount - 0.006) < 1e-12
+
+
+def test_bare_acknowledgement_settled_by_fetch_order():
+    executor, buy, sell = make_executor()
+    sell.bare_acks = True
+    result = submit(executor)
+    assert result.ok
+    assert calls(sell, "fetch_order") and not calls(buy, "fetch_order")
+    assert result.sell.filled == 0.01
+    assert result.recovery == []
+
+
+def test_partial_fill_unwound_when_other_leg_rejected():
+    executor, buy, sell = make_executor(buy_fill=0.5)
+    sell.fail_next = 1
+    result = submit(executor)
+    assert not result.ok
+    assert len(calls(buy, "cancel_order")) == 1
+    [hedge] = result.recovery
+    assert (hedge.venue, hedge.side, hedge.amount, hedge.ok) == ("binance", "sell", 0.005, True)
+
+
+def test_unfilled_survivor_cancelled_without_hedge():
+    executor, buy, sell = make_executor(buy_fill=0.0)
+    sell.fail_next = 1
+    result = submit(executor)
+    assert not result.ok
+    assert buy.orders["1"]["status"] == "canceled"
+    assert result.recovery == []
+
+
+def test_both_legs_rejected():
+    executor, buy, sell = make_executor()
+    buy.fail_next = sell.fail_next = 1
+    result = submit(executor)
+    assert not result.buy.ok and not result.sell.ok
+    assert result.recovery == []
+    assert calls(buy, "cancel_order") == [] and calls(sell, "cancel_order") == []
+
+
+def test_late_acknowledgement_counts_as_placed():
+    executor, buy, sell = make_executor()
+    sell.slow_next, sell.slow_latency = 1, TIMEOUT * 1.5
+    result = submit(executor)
+    assert result.ok
+    assert result.sell.timed_out
+    assert result.recovery == []
+
+
+def test_timed_out_leg_found_by_client_order_id():
+    executor, buy, sell = make_executor()
+    buy.slow_next, buy.slow_latency = 1, TIMEOUT * 10
+    result = submit(executor)
+    assert result.ok
+    assert result.buy.order["clientOrderId"] == result.buy.client_order_id
+    assert calls(buy, "fetch_open_orders")
+
+
+def test_timed_out_leg_that_never_landed_unwinds_other_leg():
+    executor, buy, sell = make_executor()
+    sell.lose_next = 1
+    result = submit(executor)
+    assert not result.sell.ok and not result.sell.unknown
+    assert result.unresolved == []
+    [hedge] = result.recovery
+    assert (hedge.venue, hedge.side, hedge.amount) == ("binance", "sell", 0.01)
+
+
+def test_unknown_leg_reported_and_survivor_flattened():
+    executor, buy, sell = make_executor()
+    sell.lose_next = 1
+    sell.fail_lookups = True
+    result = submit(executor)
+    assert result.unresolved == [result.sell]
+    [hedge] = result.recovery
+    assert hedge.venue == "binance"
+
+
+def test_both_legs_unknown():
+    executor, buy, sell = make_executor()
+    for exchange in (buy, sell):
+        exchange.lose_next = 1
+        exchange.fail_lookups = True
+    result = submit(executor)
+    assert not result.ok
+    assert result.unresolved == [result.buy, result.sell]
+    assert result.recovery == []
@@ -0,0 +1,46 @@
+"""The batch iceberg features against the original per-snapshot pandas code."""
+import numpy as np
+import pytest
+
+pytest.importorskip("pandas")
+
+from src.iceberg.benchmark import extract_features_pandas, synthetic_order_books
+from src.iceberg.features import FEATURE_NAMES, extract_features_batch, stack_order_books
+
+
+def book(bids, asks):
+    return {"bids": [[str(p), str(q)] for p, q in bids], "asks": [[str(p), str(q)] for p, q in asks]}
+
+
+EDGE_BOOKS = [
+    book([(100.0, 1.5)], [(101.0, 0.2)]),  # one level a side: NaN stds
+    book([(100.0, 1.0)], [(101.0, 0.1), (101.5, 0.4), (102.0, 3.0), (103.0, 0.05)]),  # uneven sides
+    book([(100.0, 0.3), (99.5, 0.3), (99.0, 9.0)], [(100.5, 2.0), (101.0, 2.0)]),  # short, one large bid
+    book([], [(101.0, 1.0), (102.0, 1.0)]),  # empty side
+]
+
+
+def assert_matches_pandas(books, depth=None):
+    bids, asks = stack_order_books(books, depth)
+    batch = extract_features_batch(bids, asks)
+    reference = np.array([extract_features_pandas(b) for b in books], dtype=float)
+    assert batch.shape == (len(books), len(FEATURE_NAMES))
+    np.testing.assert_allclose(batch, reference, rtol=1e-12, atol=1e-12, equal_nan=True)
+
+
+def test_short_single_level_and_uneven_books():
+    # Stacked with a deep book, so every edge book is NaN-padded
+    assert_matches_pandas(EDGE_BOOKS + synthetic_order_books(1, 20))
+
+
+def test_each_edge_book_on_its_own():
+    for edge in EDGE_BOOKS:
+        assert_matches_pandas([edge])
+
+
+def test_padding_beyond_every_book():
+    assert_matches_pandas(EDGE_BOOKS, depth=50)
+
+
+def test_synthetic_books_with_uneven_depths():
+    assert_matches_pandas(synthetic_order_books(200, 30, seed=3))
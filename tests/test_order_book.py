@@ -0,0 +1,127 @@
+"""Binance diff-sync and Kraken checksum handling from canned feed messages."""
+import asyncio
+import json
+import zlib
+
+from src.arbitrage.order_book import BinanceDepthFeed, KrakenBookFeed, kraken_checksum
+
+SYMBOL = "BTC/USDT"
+
+
+def depth_update(first_id, final_id, bids=(), asks=()):
+    event = {"e": "depthUpdate", "E": 1700000000000 + final_id, "s": "BTCUSDT", "U": first_id, "u": final_id,
+             "b": [[str(p), str(q)] for p, q in bids], "a": [[str(p), str(q)] for p, q in asks]}
+    return json.dumps({"stream": "btcusdt@depth@100ms", "data": event})
+
+
+def snapshot(last_update_id, bids=((100.0, 1.0),), asks=((101.0, 1.0),)):
+    return {"lastUpdateId": last_update_id, "bids": [[str(p), str(q)] for p, q in bids],
+            "asks": [[str(p), str(q)] for p, q in asks]}
+
+
+def synced_feed(last_update_id=100):
+    feed = BinanceDepthFeed([SYMBOL])
+    assert feed.apply_snapshot(SYMBOL, snapshot(last_update_id))
+    return feed
+
+
+def test_buffered_diffs_replayed_on_snapshot_and_stale_ones_dropped():
+    feed = BinanceDepthFeed([SYMBOL])
+    assert feed.handle(depth_update(90, 99, bids=[(99.0, 5.0)]), 0.0) == []  # before the snapshot
+    assert feed.handle(depth_update(100, 102, bids=[(100.0, 2.0)]), 0.0) == []
+    assert feed.apply_snapshot(SYMBOL, snapshot(100))
+    book = feed.books[SYMBOL]
+    assert book.bids == {100.0: 2.0}
+    assert book.last_update_id == 102
+    [quote] = feed.handle(depth_update(103, 104, asks=[(101.0, 0.0), (102.0, 3.0)]), 1.0)
+    assert (quote.bid, quote.ask, quote.ask_size) == (100.0, 102.0, 3.0)
+
+
+def test_stale_diff_after_sync_is_ignored():
+    feed = synced_feed(100)
+    [quote] = feed.handle(depth_update(95, 100, bids=[(100.0, 9.0)]), 0.0)
+    assert quote.bid_size == 1.0
+    book = feed.books[SYMBOL]
+    assert book.bids == {100.0: 1.0} and book.last_update_id == 100
+
+
+def test_snapshot_behind_buffered_diffs_is_rejected():
+    feed = BinanceDepthFeed([SYMBOL])
+    feed.handle(depth_update(105, 110), 0.0)
+    assert not feed.apply_snapshot(SYMBOL, snapshot(100))
+
+
+def test_sequence_gap_triggers_resync():
+    snapshots = [snapshot(112, bids=((100.5, 1.0),))]
+    fetched = []
+
+    async def fetcher(symbol):
+        fetched.append(symbol)
+        return snapshots.pop(0)
+
+    async def scenario():
+        feed = BinanceDepthFeed([SYMBOL], snapshot_fetcher=fetcher)
+        assert feed.apply_snapshot(SYMBOL, snapshot(100))
+        assert feed.handle(depth_update(105, 111, bids=[(99.0, 1.0)]), 0.0) == []  # 101-104 missing
+        assert feed.handle(depth_update(112, 113, bids=[(100.5, 2.0)]), 0.0) == []  # buffered while resyncing
+        for _ in range(5):
+            await asyncio.sleep(0)
+        return feed
+
+    feed = asyncio.run(scenario())
+    book = feed.books[SYMBOL]
+    assert fetched == [SYMBOL]
+    assert book.last_update_id == 113
+    assert 99.0 not in book.bids  # the gapped diff is covered by the new snapshot, not replayed
+    assert book.bids[100.5] == 2.0
+
+
+# Kraken's book checksum guide works through this 10-level book
+KRAKEN_ASKS = ["0.05005", "0.05010", "0.05015", "0.05020", "0.05025",
+               "0.05030", "0.05035", "0.05040", "0.05045", "0.05050"]
+KRAKEN_BIDS = ["0.05000", "0.04995", "0.04990", "0.04980", "0.04975",
+               "0.04970", "0.04965", "0.04960", "0.04955", "0.04950"]
+KRAKEN_QTY = "0.00000500"
+KRAKEN_CHECKSUM = 974947235
+
+
+def kraken_message(kind, asks, bids, checksum, symbol="BTC/USD"):
+    # Built as text so prices and quantities keep the digits the checksum is computed over
+    levels = lambda side: ",".join(f'{{"price":{p},"qty":{q}}}' for p, q in side)
+    return (f'{{"channel":"book","type":"{kind}","data":[{{"symbol":"{symbol}",'
+            f'"bids":[{levels(bids)}],"asks":[{levels(asks)}],"checksum":{checksum}}}]}}')
+
+
+def test_kraken_checksum_of_documented_book():
+    asks = [(p, KRAKEN_QTY) for p in KRAKEN_ASKS]
+    bids = [(p, KRAKEN_QTY) for p in KRAKEN_BIDS]
+    expected_input = "".join(p.replace(".", "").lstrip("0") + "500" for p in KRAKEN_ASKS + KRAKEN_BIDS)
+    assert expected_input.startswith("5005500501050050155005020500")
+    assert zlib.crc32(expected_input.encode()) == KRAKEN_CHECKSUM
+    assert kraken_checksum(asks, bids) == KRAKEN_CHECKSUM
+
+
+def test_kraken_snapshot_accepted_and_bad_update_resyncs():
+    feed = KrakenBookFeed(["BTC/USD"], depth=10)
+    asks = [(p, KRAKEN_QTY) for p in KRAKEN_ASKS]
+    bids = [(p, KRAKEN_QTY) for p in KRAKEN_BIDS]
+    [quote] = feed.handle(kraken_message("snapshot", asks, bids, KRAKEN_CHECKSUM), 1.0)
+    assert (quote.bid, quote.ask) == (0.05, 0.05005)
+
+    # Removing the best ask changes the top 10; a stale checksum must be caught
+    assert feed.handle(kraken_message("update", [("0.05005", "0")], [], KRAKEN_CHECKSUM), 2.0) == []
+    assert not feed._synced["BTC/USD"]
+    assert feed.handle(kraken_message("update", [("0.05010", "0.1")], [], 0), 3.0) == []  # ignored until resynced
+
+
+def test_kraken_update_checked_against_top_levels_after_truncation():
+    feed = KrakenBookFeed(["BTC/USD"], depth=10)
+    asks = [(p, KRAKEN_QTY) for p in KRAKEN_ASKS]
+    bids = [(p, KRAKEN_QTY) for p in KRAKEN_BIDS]
+    feed.handle(kraken_message("snapshot", asks, bids, KRAKEN_CHECKSUM), 1.0)
+    # A better bid pushes 0.04950 out of the 10-level book
+    new_bids = [("0.05001", "0.00100000")] + bids[:9]
+    checksum = kraken_checksum(asks, new_bids)
+    [quote] = feed.handle(kraken_message("update", [], [("0.05001", "0.00100000")], checksum), 2.0)
+    assert quote.bid == 0.05001
+    assert 0.0495 not in feed.books["BTC/USD"].bids
@@ -0,0 +1,121 @@
+"""PaperExchange fill model on hand-built books."""
+import pytest
+
+from src.arbitrage.feed_engine import Trade
+from src.arbitrage.order_book import L2Book
+from src.arbitrage.paper_trading import PaperExchange
+
+VENUE, SYMBOL = "binance", "BTC/USDT"
+TAKER, MAKER = 0.001, 0.0002
+
+
+def make_book(bids=((100.0, 2.0),), asks=((101.0, 1.0),)):
+    book = L2Book(VENUE, SYMBOL)
+    book.apply(bids, asks)
+    return book
+
+
+def make_exchange(book, latency=0.0):
+    return PaperExchange(lambda venue, symbol: book, {VENUE: TAKER}, maker_fees={VENUE: MAKER},
+                         latency={VENUE: latency})
+
+
+def sell_trade(price, qty):
+    """A trade whose aggressor sold, i.e. it hit resting bids."""
+    return Trade(VENUE, SYMBOL, price, qty, True, 0.0)
+
+
+def rest_buy(exchange, amount, price=100.0):
+    order = exchange.submit(VENUE, SYMBOL, "buy", amount, price)
+    exchange.advance(exchange.clock)
+    assert order.status == "open"
+    return order
+
+
+def test_queue_ahead_consumed_before_our_fill():
+    exchange = make_exchange(make_book())
+    order = rest_buy(exchange, 1.0)
+    assert order.queue_ahead == 2.0
+    exchange.on_trade(sell_trade(100.0, 1.5))
+    assert order.filled == 0.0 and order.queue_ahead == pytest.approx(0.5)
+    exchange.on_trade(sell_trade(100.0, 1.0))
+    assert order.filled == pytest.approx(0.5)
+    assert order.fills[-1].liquidity == "maker"
+
+
+def test_one_trade_is_shared_across_resting_orders():
+    exchange = make_exchange(make_book(bids=((100.0, 1.0),)))
+    first, second = rest_buy(exchange, 0.5), rest_buy(exchange, 0.5)
+    exchange.on_trade(sell_trade(100.0, 1.3))
+    assert first.filled == pytest.approx(0.3)
+    assert second.filled == 0.0
+    exchange.on_trade(sell_trade(100.0, 0.5))
+    assert first.filled == pytest.approx(0.5) and first.status == "closed"
+    assert second.filled == pytest.approx(0.3)
+
+
+def test_trade_through_fills_whole_order():
+    exchange = make_exchange(make_book())
+    order = rest_buy(exchange, 1.0)
+    exchange.on_trade(sell_trade(99.5, 0.01))
+    assert order.status == "closed"
+    assert [(f.price, f.qty) for f in order.fills] == [(100.0, 1.0)]
+
+
+def test_book_trading_through_fills_whole_order():
+    book = make_book()
+    exchange = make_exchange(book)
+    order = rest_buy(exchange, 1.0)
+    book.set_level("ask", 99.0, 1.0)
+    exchange.on_book(book)
+    assert order.status == "closed" and order.fills[-1].liquidity == "maker"
+
+
+def test_level_shrink_without_trades_moves_queue_pro_rata():
+    book = make_book(bids=((100.0, 4.0),))
+    exchange = make_exchange(book)
+    order = rest_buy(exchange, 1.0)
+    book.set_level("bid", 100.0, 2.0)
+    exchange.on_book(book)
+    assert order.queue_ahead == pytest.approx(2.0)
+    exchange.on_trade(sell_trade(100.0, 2.5))
+    assert order.filled == pytest.approx(0.5)
+
+
+def test_arrival_and_cancel_are_delayed_by_latency():
+    exchange = make_exchange(make_book(), latency=0.1)
+    order = exchange.submit(VENUE, SYMBOL, "buy", 1.0, 100.0)
+    exchange.advance(0.05)
+    assert order.status == "pending"
+    exchange.advance(0.1)
+    assert order.status == "open"
+    exchange.cancel(order.id)
+    exchange.cancel(order.id)  # repeated before it arrives: still one cancel event
+    assert len(exchange._events) == 1
+    exchange.advance(0.15)
+    assert order.status == "open"
+    exchange.advance(0.2)
+    assert order.status == "canceled"
+    assert exchange.open_orders() == []
+
+
+def test_marketable_order_walks_book_as_taker():
+    book = make_book(asks=((101.0, 1.0), (102.0, 1.0), (103.0, 1.0)))
+    exchange = make_exchange(book)
+    order = exchange.submit(VENUE, SYMBOL, "buy", 1.5, 102.0)
+    exchange.advance(0.0)
+    assert order.status == "closed"
+    assert [(f.price, f.qty, f.liquidity) for f in order.fills] == [(101.0, 1.0, "taker"), (102.0, 0.5, "taker")]
+
+
+def test_maker_and_taker_fees():
+    exchange = make_exchange(make_book())
+    taker = exchange.submit(VENUE, SYMBOL, "buy", 0.5, 101.0)
+    exchange.advance(0.0)
+    maker = rest_buy(exchange, 1.0)
+    exchange.on_trade(sell_trade(99.0, 1.0))
+    assert taker.fee == pytest.approx(0.5 * 101.0 * TAKER)
+    assert maker.fee == pytest.approx(1.0 * 100.0 * MAKER)
+    balances = exchange.balances[VENUE]
+    assert balances["BTC"] == pytest.approx(1.5)
+    assert balances["USDT"] == pytest.approx(-(0.5 * 101.0 + 100.0) - taker.fee - maker.fee)
@@ -0,0 +1,67 @@
+"""SharedBookStore seqlock: reads racing a writer in another process."""
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from src.arbitrage.shared_book import SharedBookStore
+
+VENUE, SYMBOL = "binance", "BTC/USDT"
+DEPTH = 8
+WRITES = 20000
+
+
+def levels_for(k):
+    """Write ``k`` fills 1..DEPTH levels with the value ``k``, so a torn read shows two values."""
+    return np.full((1 + k % DEPTH, 2), float(k))
+
+
+def write_books(store, writes):
+    for k in range(1, writes + 1):
+        levels = levels_for(k)
+        store.write(VENUE, SYMBOL, levels, levels, recv_ts=float(k))
+    store.close()
+
+
+@pytest.fixture
+def store():
+    store = SharedBookStore(["binance", "kraken"], [SYMBOL], depth=DEPTH)
+    yield store
+    store.close()
+    store.unlink()
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs fork")
+def test_reads_never_mix_levels_from_different_writes(store):
+    book = store.book(VENUE, SYMBOL)
+    writer = multiprocessing.get_context("fork").Process(target=write_books, args=(store, WRITES))
+    writer.start()
+    reads = 0
+    while writer.is_alive() or reads == 0:
+        bids, asks = book.depth_arrays(DEPTH)
+        k = int(book.recv_ts)
+        if k == 0:
+            continue  # nothing written yet
+        expected = levels_for(k)
+        assert book.version == k
+        assert np.array_equal(bids, expected) and np.array_equal(asks, expected)
+        reads += 1
+    writer.join()
+    assert writer.exitcode == 0
+    assert book.read() == WRITES
+    assert int(store.seq[store.slot(VENUE, SYMBOL)]) == 2 * WRITES
+
+
+def test_changed_follows_sequence_counter(store):
+    assert store.changed() == []
+    levels = levels_for(3)
+    store.write(VENUE, SYMBOL, levels, levels, recv_ts=1.0)
+    assert store.changed() == [(VENUE, SYMBOL)]
+    assert store.changed() == []
+
+    i = store.slot("kraken", SYMBOL)
+    store.seq[i] += 1  # writer is mid-write: not reported yet
+    assert store.changed() == []
+    store.seq[i] += 1
+    assert store.changed() == [("kraken", SYMBOL)]
+    assert store.book("kraken", SYMBOL).read() == 1